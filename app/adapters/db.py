@@ -1,25 +1,22 @@
 import datetime
+from collections.abc import AsyncIterator
 from datetime import UTC
 
 from sqlalchemy.engine import RowMapping
 
-from app.dtos import AttendeeBookingDTO, BookingClientDTO, BookingDTO, UserDTO
+from app.adapters.outbox import build_outbox_insert, count_outbox_inserts
+from app.dtos import AttendeeBookingDTO, BookingClientDTO, BookingDTO, OutboxMessageDTO, UserDTO
 from app.interfaces import IBookingDatabaseAdapter
 from app.interfaces.sql import ISqlExecutor
+from app.utils import normalize_email
 
 
 class BookingDatabaseAdapter(IBookingDatabaseAdapter):
     def __init__(self, sql: ISqlExecutor) -> None:
         self.sql = sql
 
-    @staticmethod
-    def _normalize_email(email: str) -> str:
-        local_part, _, domain = email.strip().lower().partition("@")
-        normalized_local = local_part.split("+", maxsplit=1)[0]
-        return f"{normalized_local}@{domain}" if domain else normalized_local
-
     async def get_attendee_bookings_by_email(self, *, email: str) -> list[AttendeeBookingDTO]:
-        normalized_email = self._normalize_email(email)
+        normalized_email = normalize_email(email)
         query = """
                 SELECT b.id,
                        b.uid,
@@ -35,26 +32,71 @@ class BookingDatabaseAdapter(IBookingDatabaseAdapter):
                   AND (b.rescheduled IS NULL or b.rescheduled = FALSE)
                 """
         rows = await self.sql.fetch_all(query, {"normalized_email": normalized_email})
-        return [
-            AttendeeBookingDTO(
-                booking_id=row["id"],
-                booking_uid=row["uid"],
-                name=row["name"],
-                email=row["email"],
-                start_time=row["startTime"].replace(tzinfo=UTC),
-                end_time=row["endTime"].replace(tzinfo=UTC),
-                status=row["status"],
-                bad_connection=row["badConnection"],
-            )
-            for row in rows
-        ]
+        return [self._fill_attendee_booking_dto(row) for row in rows]
 
-    async def delete_booking_and_attendee_by_booking_id(self, *, booking_id: int) -> None:
+    async def get_bad_connection_booking_uids(self, *, email: str, booking_uids: list[str]) -> list[str]:
+        # Looked up by booking uid, so only the given bookings are read, however long the client's history is.
+        query = """
+                SELECT b.uid
+                FROM public."Booking" b
+                         JOIN "Attendee" a ON a."bookingId" = b.id
+                WHERE b.uid = ANY(:booking_uids)
+                  AND a."badConnection" = TRUE
+                  AND regexp_replace(lower(a.email), '[+][^@]*@', '@') = :normalized_email
+                """
+        rows = await self.sql.fetch_all(
+            query,
+            {"booking_uids": booking_uids, "normalized_email": normalize_email(email)},
+        )
+        return [row["uid"] for row in rows]
+
+    async def iter_attendee_bookings_by_email(
+        self,
+        *,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[tuple[str, list[AttendeeBookingDTO]]]:
+        """Stream every client's bookings from a server-side cursor, one normalized email at a time."""
+        query = """
+                SELECT regexp_replace(lower(a.email), '[+][^@]*@', '@') AS normalized_email,
+                       b.id,
+                       b.uid,
+                       b.status,
+                       b."startTime",
+                       b."endTime",
+                       a.name,
+                       a.email,
+                       COALESCE(a."badConnection", FALSE) AS "badConnection"
+                FROM public."Booking" b
+                         JOIN "Attendee" a ON a."bookingId" = b.id
+                WHERE a.email IS NOT NULL
+                  AND (b.rescheduled IS NULL or b.rescheduled = FALSE)
+                ORDER BY normalized_email, b."startTime", b.id
+                """
+        email: str | None = None
+        attendee_bookings: list[AttendeeBookingDTO] = []
+        async for row in self.sql.stream(query, {}, batch_size=batch_size):
+            if row["normalized_email"] != email:
+                if email is not None:
+                    yield email, attendee_bookings
+                email, attendee_bookings = row["normalized_email"], []
+            attendee_bookings.append(self._fill_attendee_booking_dto(row))
+        if email is not None:
+            yield email, attendee_bookings
+
+    async def delete_booking_and_attendee_by_booking_id(
+        self,
+        *,
+        booking_id: int,
+        outbox_messages: list[OutboxMessageDTO] | None = None,
+    ) -> None:
+        outbox_messages = outbox_messages or []
         statements = [
             ('DELETE FROM "Attendee" WHERE "bookingId" = :booking_id', {"booking_id": booking_id}),
             ('DELETE FROM public."Booking" WHERE id = :booking_id', {"booking_id": booking_id}),
+            *(build_outbox_insert(message) for message in outbox_messages),
         ]
-        await self.sql.execute_in_transaction(statements)
+        row_counts = await self.sql.execute_in_transaction(statements)
+        count_outbox_inserts(outbox_messages, row_counts[2:])
 
     async def get_user_by_email(self, email: str) -> UserDTO | None:
         row = await self.sql.fetch_one("SELECT * FROM users WHERE email = :email", {"email": email})
@@ -87,6 +129,10 @@ class BookingDatabaseAdapter(IBookingDatabaseAdapter):
             telegram_token=row["telegram_token"],
         )
 
+    async def get_user_time_zones(self) -> list[str]:
+        rows = await self.sql.fetch_all('SELECT DISTINCT "timeZone" FROM users WHERE "timeZone" IS NOT NULL', {})
+        return [row["timeZone"] for row in rows]
+
     async def get_organizer_chat_id(self, email: str) -> int | None:
         query = (
             "SELECT telegram_chat_id FROM users "
@@ -156,6 +202,19 @@ class BookingDatabaseAdapter(IBookingDatabaseAdapter):
         )
         return [self._fill_booking_dto(row) for row in rows]
 
+    @staticmethod
+    def _fill_attendee_booking_dto(row: RowMapping) -> AttendeeBookingDTO:
+        return AttendeeBookingDTO(
+            booking_id=row["id"],
+            booking_uid=row["uid"],
+            name=row["name"],
+            email=row["email"],
+            start_time=row["startTime"].replace(tzinfo=UTC),
+            end_time=row["endTime"].replace(tzinfo=UTC),
+            status=row["status"],
+            bad_connection=row["badConnection"],
+        )
+
     @staticmethod
     def _fill_booking_dto(row: RowMapping) -> BookingDTO:
         user = UserDTO(
@@ -53,3 +53,4 @@ class UnisenderGoEmailClient(IEmailClient):
                 )
             except UnisenderGoError as e:
                 logger.exception("Failed to send email via Unisender Go", to_email=to_email, error=str(e))
+                raise
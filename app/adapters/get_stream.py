@@ -15,6 +15,7 @@ from tenacity import (
 )
 
 from app.interfaces.chat import IChatClient
+from app.metrics import instrumented
 
 
 logger = structlog.get_logger(__name__)
@@ -32,6 +33,7 @@ class GetStreamAdapter(IChatClient):
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
+    @instrumented("getstream")
     async def create_chat(self, *, channel_id: str, organizer_id: str, client_id: str) -> None:
         organizer_id = self._encode_user_id(user_id=organizer_id)
         client_id = self._encode_user_id(user_id=client_id)
@@ -55,6 +57,7 @@ class GetStreamAdapter(IChatClient):
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
+    @instrumented("getstream")
     async def delete_chat(self, *, channel_id: str) -> None:
         async with StreamChatAsync(api_key=self.chat_api_key, api_secret=self.chat_api_secret) as client:
             channel = client.channel(channel_type="messaging", channel_id=channel_id)
@@ -66,6 +69,7 @@ class GetStreamAdapter(IChatClient):
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
+    @instrumented("getstream")
     async def send_message(self, *, channel_id: str, user_id: str, message: dict) -> None:
         async with StreamChatAsync(api_key=self.chat_api_key, api_secret=self.chat_api_secret) as client:
             channel = client.channel(channel_type="messaging", channel_id=channel_id)
@@ -0,0 +1,157 @@
+import json
+
+import structlog
+from sqlalchemy.engine import RowMapping
+
+from app.dtos import OutboxChannel, OutboxFailureDTO, OutboxMessageDTO, OutboxStatsDTO
+from app.interfaces.outbox import IOutboxRepository
+from app.interfaces.sql import ISqlExecutor
+
+
+logger = structlog.get_logger(__name__)
+
+OUTBOX_TABLE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        idempotency_key TEXT NOT NULL UNIQUE,
+        channel TEXT NOT NULL,
+        payload JSONB NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        sent_at TIMESTAMPTZ
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS notification_outbox_pending_idx
+        ON notification_outbox (available_at, id) WHERE status = 'pending'
+    """,
+)
+
+
+def build_outbox_insert(message: OutboxMessageDTO) -> tuple[str, dict]:
+    """Build the insert so callers can put it into the same transaction as their own state change.
+
+    A message with an already known idempotency key (a redelivered webhook, a retried handler) is ignored; pass the
+    row counts of the inserts to ``count_outbox_inserts`` to log those.
+    """
+    query = """
+        INSERT INTO notification_outbox (idempotency_key, channel, payload)
+        VALUES (:idempotency_key, :channel, CAST(:payload AS jsonb))
+        ON CONFLICT (idempotency_key) DO NOTHING
+    """
+    return query, {
+        "idempotency_key": message.idempotency_key,
+        "channel": message.channel.value,
+        "payload": json.dumps(message.payload, ensure_ascii=False),
+    }
+
+
+def count_outbox_inserts(messages: list[OutboxMessageDTO], row_counts: list[int]) -> int:
+    """Return how many messages were inserted and log the ones skipped as duplicates."""
+    for message, row_count in zip(messages, row_counts, strict=True):
+        if not row_count:
+            logger.info(
+                "Outbox message already enqueued",
+                idempotency_key=message.idempotency_key,
+                channel=message.channel,
+            )
+    return sum(row_counts)
+
+
+class OutboxRepository(IOutboxRepository):
+    def __init__(self, sql: ISqlExecutor) -> None:
+        self.sql = sql
+
+    async def ensure_table(self) -> None:
+        await self.sql.execute_in_transaction([(statement, {}) for statement in OUTBOX_TABLE_DDL])
+
+    async def enqueue(self, messages: list[OutboxMessageDTO]) -> int:
+        row_counts = await self.sql.execute_in_transaction([build_outbox_insert(message) for message in messages])
+        return count_outbox_inserts(messages, row_counts)
+
+    async def claim_batch(self, *, limit: int, lease_seconds: float) -> list[OutboxMessageDTO]:
+        # The lease moves `available_at` forward, so a relay that dies mid-batch hands its messages to the next one.
+        query = """
+            WITH claimed AS (
+                SELECT id
+                FROM notification_outbox
+                WHERE status = 'pending' AND available_at <= now()
+                ORDER BY available_at, id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE notification_outbox o
+            SET attempts = o.attempts + 1,
+                available_at = now() + make_interval(secs => CAST(:lease_seconds AS double precision))
+            FROM claimed
+            WHERE o.id = claimed.id
+            RETURNING o.id, o.idempotency_key, o.channel, o.payload, o.attempts, o.created_at
+        """
+        rows = await self.sql.execute_returning(query, {"limit": limit, "lease_seconds": lease_seconds})
+        return [self._fill_outbox_message_dto(row) for row in rows]
+
+    async def mark_sent(self, message_ids: list[int]) -> None:
+        query = """
+            UPDATE notification_outbox
+            SET status = 'sent', sent_at = now(), last_error = NULL
+            WHERE id = ANY(:message_ids)
+        """
+        await self.sql.execute(query, {"message_ids": message_ids})
+
+    async def mark_failed(self, failures: list[OutboxFailureDTO]) -> None:
+        retry_query = """
+            UPDATE notification_outbox
+            SET last_error = :error,
+                available_at = now() + make_interval(secs => CAST(:retry_in_seconds AS double precision))
+            WHERE id = :message_id
+        """
+        dead_query = "UPDATE notification_outbox SET status = 'dead', last_error = :error WHERE id = :message_id"
+        await self.sql.execute_in_transaction(
+            [
+                (
+                    retry_query,
+                    {
+                        "message_id": failure.message_id,
+                        "error": failure.error,
+                        "retry_in_seconds": failure.retry_in_seconds,
+                    },
+                )
+                if failure.retry_in_seconds is not None
+                else (dead_query, {"message_id": failure.message_id, "error": failure.error})
+                for failure in failures
+            ],
+        )
+
+    async def prune_sent(self, *, older_than_days: int) -> None:
+        query = """
+            DELETE FROM notification_outbox
+            WHERE status = 'sent' AND sent_at < now() - make_interval(days => :older_than_days)
+        """
+        await self.sql.execute(query, {"older_than_days": older_than_days})
+
+    async def get_stats(self) -> OutboxStatsDTO:
+        query = """
+            SELECT count(*) FILTER (WHERE status = 'pending') AS pending,
+                   count(*) FILTER (WHERE status = 'dead') AS dead,
+                   COALESCE(EXTRACT(EPOCH FROM now() - min(created_at) FILTER (WHERE status = 'pending')), 0) AS lag
+            FROM notification_outbox
+            WHERE status <> 'sent'
+        """
+        row = await self.sql.fetch_one(query, {})
+        return OutboxStatsDTO(pending=row["pending"], dead=row["dead"], lag_seconds=float(row["lag"]))
+
+    @staticmethod
+    def _fill_outbox_message_dto(row: RowMapping) -> OutboxMessageDTO:
+        payload = row["payload"]
+        return OutboxMessageDTO(
+            id=row["id"],
+            idempotency_key=row["idempotency_key"],
+            channel=OutboxChannel(row["channel"]),
+            payload=json.loads(payload) if isinstance(payload, str) else payload,
+            attempts=row["attempts"],
+            created_at=row["created_at"],
+        )
@@ -2,6 +2,7 @@ import httpx
 import structlog
 
 from app.interfaces.url_shortener import IUrlShortener
+from app.metrics import track_dependency
 from app.settings import Settings
 
 
@@ -19,17 +20,18 @@ class UrlShortenerAdapter(IUrlShortener):
 
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/urls/shorten",
-                    headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
-                    json={
-                        "url": long_url,
-                        "expires_at": expires_at,
-                        "external_id": external_id,
-                        "not_before": not_before,
-                    },
-                )
-                response.raise_for_status()
+                with track_dependency("shortener", "create_url"):
+                    response = await client.post(
+                        f"{self.base_url}/api/v1/urls/shorten",
+                        headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
+                        json={
+                            "url": long_url,
+                            "expires_at": expires_at,
+                            "external_id": external_id,
+                            "not_before": not_before,
+                        },
+                    )
+                    response.raise_for_status()
                 data = response.json()
                 if ident := data.get("ident"):
                     return f"{self.base_url}/{ident}"
@@ -42,11 +44,12 @@ class UrlShortenerAdapter(IUrlShortener):
             return None
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.get(
-                    f"{self.base_url}/api/v1/urls/external/{external_id}",
-                    headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
-                )
-                response.raise_for_status()
+                with track_dependency("shortener", "get_url"):
+                    response = await client.get(
+                        f"{self.base_url}/api/v1/urls/external/{external_id}",
+                        headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
+                    )
+                    response.raise_for_status()
                 data = response.json()
                 if ident := data.get("ident"):
                     return f"{self.base_url}/{ident}"
@@ -66,17 +69,18 @@ class UrlShortenerAdapter(IUrlShortener):
 
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.patch(
-                    f"{self.base_url}/api/v1/urls/external/{old_external_id}",
-                    headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
-                    json={
-                        "url": long_url,
-                        "expires_at": expires_at,
-                        "not_before": not_before,
-                        "external_id": new_external_id,
-                    },
-                )
-                response.raise_for_status()
+                with track_dependency("shortener", "update_url_data"):
+                    response = await client.patch(
+                        f"{self.base_url}/api/v1/urls/external/{old_external_id}",
+                        headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
+                        json={
+                            "url": long_url,
+                            "expires_at": expires_at,
+                            "not_before": not_before,
+                            "external_id": new_external_id,
+                        },
+                    )
+                    response.raise_for_status()
                 data = response.json()
                 if ident := data.get("ident"):
                     return f"{self.base_url}/{ident}"
@@ -90,11 +94,12 @@ class UrlShortenerAdapter(IUrlShortener):
 
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.delete(
-                    f"{self.base_url}/api/v1/urls/external/{external_id}",
-                    headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
-                )
-                response.raise_for_status()
+                with track_dependency("shortener", "delete_url"):
+                    response = await client.delete(
+                        f"{self.base_url}/api/v1/urls/external/{external_id}",
+                        headers={"Content-Type": "application/json", "api-key": self.settings.shortify_api_key},
+                    )
+                    response.raise_for_status()
                 logger.info(f"Shortened URL {external_id} deleted")
             except Exception:
                 logger.exception("Failed to delete shorten URL")
@@ -18,6 +18,7 @@ from app.clients.exceptions import (
     BaseClientError,
     BaseRateLimitError,
 )
+from app.metrics import track_dependency
 
 
 logger = structlog.get_logger()
@@ -41,6 +42,7 @@ class BaseClient(ABC):
         self._session = session
         self._owned_session = session is None
         self.base_error_class = base_error_class
+        self.service_name = service_name
 
         self.logger = logger.bind(
             service=service_name,
@@ -95,15 +97,16 @@ class BaseClient(ABC):
         )
 
         try:
-            response = await self._session.request(
-                method=method,
-                url=url,
-                json=json_data,
-                headers=self._get_headers(),
-                timeout=self.timeout,
-            )
-
-            self._handle_response_errors(response)
+            with track_dependency(self.service_name, endpoint.lstrip("/")):
+                response = await self._session.request(
+                    method=method,
+                    url=url,
+                    json=json_data,
+                    headers=self._get_headers(),
+                    timeout=self.timeout,
+                )
+
+                self._handle_response_errors(response)
 
             response_data = response.json()
 
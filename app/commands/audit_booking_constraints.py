@@ -0,0 +1,147 @@
+"""Audit the whole booking history against the booking constraints and write a violations report.
+
+Attendee bookings are streamed from a server-side cursor grouped by normalized email, analyzed in a process pool
+and written as they complete, so memory stays bounded by the number of in-flight chunks.
+
+Usage: python -m app.commands.audit_booking_constraints --output violations.jsonl [--format jsonl|csv]
+       [--workers N] [--chunk-size 200] [--batch-size 2000]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from logging import getLevelNamesMapping
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TextIO
+
+import structlog
+from dishka import make_async_container
+
+from app.config.logger import setup_logger
+from app.controllers.booking_constraints_audit import audit_clients
+from app.dtos import AttendeeBookingDTO, BookingConstraintsViolationDTO
+from app.interfaces.booking import IBookingDatabaseAdapter
+from app.ioc import AppProvider
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+PROGRESS_LOG_EVERY_CLIENTS = 10_000
+
+
+class ViolationsWriter:
+    def __init__(self, output: TextIO, output_format: str) -> None:
+        self.output = output
+        self.output_format = output_format
+        self.csv_writer: csv.DictWriter | None = None
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(
+                output,
+                fieldnames=[field.name for field in fields(BookingConstraintsViolationDTO)],
+            )
+            self.csv_writer.writeheader()
+
+    def write(self, violations: list[BookingConstraintsViolationDTO]) -> None:
+        for violation in violations:
+            row = {
+                **asdict(violation),
+                "start_time": violation.start_time.isoformat(),
+                "available_from": violation.available_from.isoformat(),
+            }
+            if self.csv_writer:
+                self.csv_writer.writerow(row)
+            else:
+                self.output.write(json.dumps(row) + "\n")
+
+
+async def audit(
+    *,
+    writer: ViolationsWriter,
+    workers: int,
+    chunk_size: int,
+    batch_size: int,
+) -> None:
+    container = make_async_container(AppProvider())
+    settings = await container.get(Settings)
+    setup_logger(log_level=getLevelNamesMapping().get(settings.log_level), console_render=settings.debug)
+
+    loop = asyncio.get_running_loop()
+    max_in_flight = workers * 2
+    in_flight: set[asyncio.Future[list[BookingConstraintsViolationDTO]]] = set()
+    clients = bookings = violations = 0
+    started_at = time.perf_counter()
+
+    async def drain(*, return_when: str) -> None:
+        nonlocal violations
+        done, _ = await asyncio.wait(in_flight, return_when=return_when)
+        for future in done:
+            in_flight.discard(future)
+            chunk_violations = future.result()
+            violations += len(chunk_violations)
+            writer.write(chunk_violations)
+
+    try:
+        # Spawned workers do not inherit the event loop or open database connections of this process.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            db = await container.get(IBookingDatabaseAdapter)
+            chunk: list[tuple[str, list[AttendeeBookingDTO]]] = []
+            async for email, attendee_bookings in db.iter_attendee_bookings_by_email(batch_size=batch_size):
+                clients += 1
+                bookings += len(attendee_bookings)
+                chunk.append((email, attendee_bookings))
+                if len(chunk) >= chunk_size:
+                    in_flight.add(loop.run_in_executor(executor, audit_clients, chunk, settings.booking_constraints))
+                    chunk = []
+                    if len(in_flight) >= max_in_flight:
+                        await drain(return_when=asyncio.FIRST_COMPLETED)
+                if clients % PROGRESS_LOG_EVERY_CLIENTS == 0:
+                    logger.info("Booking constraints audit progress", clients=clients, bookings=bookings)
+            if chunk:
+                in_flight.add(loop.run_in_executor(executor, audit_clients, chunk, settings.booking_constraints))
+            if in_flight:
+                await drain(return_when=asyncio.ALL_COMPLETED)
+    finally:
+        await container.close()
+
+    elapsed = time.perf_counter() - started_at
+    logger.info(
+        "Booking constraints audit finished",
+        clients=clients,
+        bookings=bookings,
+        violations=violations,
+        elapsed_seconds=round(elapsed, 2),
+        bookings_per_second=round(bookings / elapsed) if elapsed else None,
+        clients_per_second=round(clients / elapsed) if elapsed else None,
+        workers=workers,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, required=True, help="report path")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=200, help="clients per process pool task")
+    parser.add_argument("--batch-size", type=int, default=2000, help="rows fetched per cursor round trip")
+    args = parser.parse_args()
+
+    with args.output.open("w", encoding="utf-8", newline="") as output:
+        asyncio.run(
+            audit(
+                writer=ViolationsWriter(output, args.format),
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                batch_size=args.batch_size,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Rebuild client booking aggregates from Postgres and verify them against the constraints analyzer.
+
+Aggregates are only maintained while booking constraints are enabled; run this after enabling them. Every client's
+history is streamed once, grouped by normalized email, and compared with the stored aggregate; only drifted
+aggregates are rebuilt, which reads that client's history again under WATCH so concurrent events are not lost.
+
+Usage: python -m app.commands.reconcile_client_bookings [--dry-run] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import datetime
+from logging import getLevelNamesMapping
+
+import structlog
+from dishka import make_async_container
+
+from app.config.logger import setup_logger
+from app.controllers.client_bookings import build_client_bookings_aggregate
+from app.interfaces.booking import IBookingDatabaseAdapter
+from app.interfaces.booking_constraints import IBookingConstraintsAnalyzer, IClientBookingsAggregator
+from app.ioc import AppProvider
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+async def reconcile(*, dry_run: bool, batch_size: int) -> None:
+    container = make_async_container(AppProvider())
+    settings = await container.get(Settings)
+    setup_logger(log_level=getLevelNamesMapping().get(settings.log_level), console_render=settings.debug)
+
+    checked = drifted = mismatched = 0
+    try:
+        db = await container.get(IBookingDatabaseAdapter)
+        aggregator = await container.get(IClientBookingsAggregator)
+        analyzer = await container.get(IBookingConstraintsAnalyzer)
+
+        async for email, attendee_bookings in db.iter_attendee_bookings_by_email(batch_size=batch_size):
+            checked += 1
+            now = datetime.datetime.now(datetime.UTC)
+            rebuilt = build_client_bookings_aggregate(
+                email,
+                attendee_bookings,
+                window_start=aggregator.get_window_start(now),
+            )
+
+            if await aggregator.get(email, now=now) != rebuilt:
+                drifted += 1
+                logger.warning("Client bookings aggregate drifted", email=email)
+                if not dry_run:
+                    await aggregator.rebuild(email)
+
+            # Bookings older than the rules horizon are dropped from the aggregate, which only keeps the result
+            # exact for bookings starting from now on.
+            if not rebuilt.bookings or rebuilt.bookings[-1].start_time < now:
+                continue
+            booking = await db.get_booking(rebuilt.bookings[-1].booking_uid)
+            if not booking:
+                continue
+            expected = analyzer.analyze_on_create(booking=booking, attendee_bookings=attendee_bookings)
+            actual = analyzer.analyze_on_create_from_aggregate(booking=booking, aggregate=rebuilt)
+            if expected != actual:
+                mismatched += 1
+                logger.error(
+                    "Aggregate constraints result differs from full history",
+                    email=email,
+                    booking_uid=booking.uid,
+                    expected=expected,
+                    actual=actual,
+                )
+    finally:
+        await container.close()
+
+    logger.info(
+        "Client bookings aggregates reconciled",
+        checked=checked,
+        drifted=drifted,
+        mismatched=mismatched,
+        dry_run=dry_run,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="report drift without rewriting aggregates")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched per server-side cursor round trip")
+    args = parser.parse_args()
+    asyncio.run(reconcile(dry_run=args.dry_run, batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
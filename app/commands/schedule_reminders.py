@@ -0,0 +1,57 @@
+"""Backfill the reminder schedule from upcoming accepted bookings in Postgres.
+
+Run right after enabling the reminder scheduler (bookings are only scheduled while it is enabled), and again
+whenever the schedule may have drifted (for example after a Redis flush). Scheduling is idempotent: a booking
+keeps a single entry scored by its fire time.
+
+Usage: python -m app.commands.schedule_reminders [--days 60]
+"""
+
+import argparse
+import asyncio
+import datetime
+from logging import getLevelNamesMapping
+
+import structlog
+from dishka import make_async_container
+
+from app.config.logger import setup_logger
+from app.interfaces.booking import IBookingDatabaseAdapter
+from app.interfaces.reminders import IReminderScheduler
+from app.ioc import AppProvider
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+async def schedule_reminders(*, days: int) -> None:
+    container = make_async_container(AppProvider())
+    settings = await container.get(Settings)
+    setup_logger(log_level=getLevelNamesMapping().get(settings.log_level), console_render=settings.debug)
+
+    checked = scheduled = 0
+    now = datetime.datetime.now(datetime.UTC)
+    try:
+        scheduler = await container.get(IReminderScheduler)
+        db = await container.get(IBookingDatabaseAdapter)
+        bookings = await db.get_bookings(start_time_from=now, start_time_to=now + datetime.timedelta(days=days))
+        for booking in bookings:
+            checked += 1
+            if await scheduler.schedule(booking, now=now):
+                scheduled += 1
+    finally:
+        await container.close()
+
+    logger.info("Reminder schedule backfilled", checked=checked, scheduled=scheduled, days=days)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=60, help="schedule bookings starting within this many days")
+    args = parser.parse_args()
+    asyncio.run(schedule_reminders(days=args.days))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,209 @@
+import atexit
+import datetime
 import logging
-from collections.abc import Callable, Iterable
+import queue
+import random
+import sys
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping
 from functools import partial
+from logging import getLevelNamesMapping
+from logging.handlers import QueueHandler, QueueListener
 
 import structlog
 import ujson
+from opentelemetry import trace
 from structlog.processors import JSONRenderer
 
+from app.metrics import LOG_EVENTS_DROPPED, LOG_FIELDS_TRUNCATED
 
-def setup_logger(log_level: int, console_render: bool) -> None:
+
+CALLSITE_PARAMETERS = {
+    structlog.processors.CallsiteParameter.PATHNAME,
+    structlog.processors.CallsiteParameter.FILENAME,
+    structlog.processors.CallsiteParameter.MODULE,
+    structlog.processors.CallsiteParameter.FUNC_NAME,
+    structlog.processors.CallsiteParameter.THREAD,
+    structlog.processors.CallsiteParameter.THREAD_NAME,
+    structlog.processors.CallsiteParameter.PROCESS,
+    structlog.processors.CallsiteParameter.PROCESS_NAME,
+}
+
+SAMPLED_METHODS = frozenset({"debug", "info"})
+TRUNCATED_FIELDS = ("event", "body", "errors", "events")
+
+
+def add_trace_context(
+    _logger: structlog.typing.WrappedLogger,
+    _method_name: str,
+    event_dict: structlog.typing.EventDict,
+) -> structlog.typing.EventDict:
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        event_dict["trace_id"] = format(span_context.trace_id, "032x")
+        event_dict["span_id"] = format(span_context.span_id, "016x")
+    return event_dict
+
+
+def add_timestamp(
+    _logger: structlog.typing.WrappedLogger,
+    _method_name: str,
+    event_dict: structlog.typing.EventDict,
+) -> structlog.typing.EventDict:
+    """ISO UTC timestamp of the moment the event was logged, like ``TimeStamper(fmt="iso")``.
+
+    Records from stdlib loggers are stamped from ``LogRecord.created``: with off-loop logging their pre-chain runs in
+    the listener thread, and the current time there would order them after structlog events logged later.
+    """
+    record = event_dict.get("_record")
+    logged_at = (
+        datetime.datetime.fromtimestamp(record.created, tz=datetime.UTC)
+        if record is not None
+        else datetime.datetime.now(tz=datetime.UTC)
+    )
+    event_dict["timestamp"] = logged_at.isoformat().replace("+00:00", "Z")
+    return event_dict
+
+
+def add_callsite_parameters(callsite_level: int, sample_ratio: float) -> structlog.typing.Processor:
+    """Callsite parameters for events at ``callsite_level`` and above, plus a ``sample_ratio`` share of the rest.
+
+    Finding the callsite walks the stack, which is the most expensive step of the chain, and the hot paths log at INFO.
+    """
+    adder = structlog.processors.CallsiteParameterAdder(
+        CALLSITE_PARAMETERS,
+        additional_ignores=[__name__],
+    )
+    levels = getLevelNamesMapping()
+
+    def processor(
+        logger: structlog.typing.WrappedLogger,
+        method_name: str,
+        event_dict: structlog.typing.EventDict,
+    ) -> structlog.typing.EventDict:
+        if levels.get(event_dict.get("level", "").upper(), logging.NOTSET) >= callsite_level or (
+            sample_ratio and random.random() < sample_ratio
+        ):
+            return adder(logger, method_name, event_dict)
+        return event_dict
+
+    return processor
+
+
+class EventSampler:
+    """Thin out high-volume DEBUG/INFO events by their event name; warnings and errors always pass.
+
+    An event keeps a ``sample_rates[event]`` share of its lines (kept lines carry ``sample_rate``) and at most
+    ``rate_limits[event]`` lines per second. Dropped lines are counted in ``log_events_dropped_total``.
+    """
+
+    def __init__(self, sample_rates: Mapping[str, float], rate_limits: Mapping[str, int]) -> None:
+        self.sample_rates = dict(sample_rates)
+        self.rate_limits = dict(rate_limits)
+        self.windows: dict[str, tuple[float, int]] = {}
+
+    def __call__(
+        self,
+        _logger: structlog.typing.WrappedLogger,
+        method_name: str,
+        event_dict: structlog.typing.EventDict,
+    ) -> structlog.typing.EventDict:
+        event = event_dict.get("event")
+        if method_name not in SAMPLED_METHODS or not isinstance(event, str):
+            return event_dict
+
+        if (sample_rate := self.sample_rates.get(event)) is not None:
+            if random.random() >= sample_rate:
+                LOG_EVENTS_DROPPED.labels(event, "sampled").inc()
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = sample_rate
+
+        if (rate_limit := self.rate_limits.get(event)) is not None:
+            now = time.monotonic()
+            window_started_at, count = self.windows.get(event, (now, 0))
+            if now - window_started_at >= 1:
+                window_started_at, count = now, 0
+            if count >= rate_limit:
+                LOG_EVENTS_DROPPED.labels(event, "rate_limited").inc()
+                raise structlog.DropEvent
+            self.windows[event] = (window_started_at, count + 1)
+        return event_dict
+
+
+def truncate_fields(fields: Collection[str], max_length: int) -> structlog.typing.Processor:
+    """Cap the rendered size of bulky fields (webhook bodies, validation errors).
+
+    Runs in the formatter chain, i.e. in the listener thread when logging off the event loop.
+    """
+    fields = frozenset(fields)
+
+    def processor(
+        _logger: structlog.typing.WrappedLogger,
+        _method_name: str,
+        event_dict: structlog.typing.EventDict,
+    ) -> structlog.typing.EventDict:
+        for field in fields.intersection(event_dict):
+            value = event_dict[field]
+            if isinstance(value, bytes):
+                value = event_dict[field] = value.decode("utf-8", errors="replace")
+            text = value if isinstance(value, str) else ujson.dumps(value, ensure_ascii=False, default=str)
+            # Short values keep their structure; only an oversized one becomes a cut string.
+            if len(text) > max_length:
+                LOG_FIELDS_TRUNCATED.labels(field).inc()
+                event_dict[field] = f"{text[:max_length]}...[{len(text) - max_length} more chars]"
+        return event_dict
+
+    return processor
+
+
+class OffLoopQueueHandler(QueueHandler):
+    """Pass records to the listener thread untouched, so rendering and writing happen off the event loop."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, dict):
+            # ``logger.exception`` leaves ``exc_info=True`` for the renderer, which would look in the wrong thread.
+            if record.msg.get("exc_info") is True:
+                record.msg["exc_info"] = sys.exc_info()
+            return record
+
+        # Records from stdlib loggers go through ``foreign_pre_chain`` in the listener thread, which cannot see this
+        # task's context; attach it now for ``ExtraAdder``.
+        context = add_trace_context(None, "", structlog.contextvars.get_contextvars())
+        for key, value in context.items():
+            setattr(record, key, value)
+        return record
+
+
+def setup_logger(
+    log_level: int,
+    console_render: bool,
+    *,
+    callsite_level: int = logging.WARNING,
+    callsite_sample_ratio: float = 0.0,
+    is_off_loop: bool = False,
+    sample_rates: Mapping[str, float] | None = None,
+    rate_limits: Mapping[str, int] | None = None,
+    truncated_fields: Collection[str] = TRUNCATED_FIELDS,
+    max_field_length: int = 2048,
+) -> None:
     shared_processors = [
-        structlog.processors.TimeStamper(fmt="iso"),
+        add_timestamp,
         structlog.stdlib.add_log_level,
         structlog.stdlib.add_logger_name,
         structlog.contextvars.merge_contextvars,
-        structlog.processors.CallsiteParameterAdder(
-            {
-                structlog.processors.CallsiteParameter.PATHNAME,
-                structlog.processors.CallsiteParameter.FILENAME,
-                structlog.processors.CallsiteParameter.MODULE,
-                structlog.processors.CallsiteParameter.FUNC_NAME,
-                structlog.processors.CallsiteParameter.THREAD,
-                structlog.processors.CallsiteParameter.THREAD_NAME,
-                structlog.processors.CallsiteParameter.PROCESS,
-                structlog.processors.CallsiteParameter.PROCESS_NAME,
-            },
-        ),
+        add_trace_context,
+        add_callsite_parameters(callsite_level, callsite_sample_ratio),
         structlog.stdlib.ExtraAdder(),
     ]
 
     if not console_render:
         shared_processors.append(structlog.processors.dict_tracebacks)
 
+    # Sampling only applies to structlog events, so dropped lines skip the rest of the chain; a processor raising
+    # `DropEvent` in `foreign_pre_chain` would break the stdlib handler.
+    sampler = EventSampler(sample_rates=sample_rates or {}, rate_limits=rate_limits or {})
     structlog.configure(
-        processors=[*shared_processors, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        processors=[sampler, *shared_processors, structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
@@ -42,6 +213,8 @@ def setup_logger(log_level: int, console_render: bool) -> None:
         shared_processors=shared_processors,
         logs_render=get_logs_renderer(console_render=console_render),
         log_level=log_level,
+        is_off_loop=is_off_loop,
+        render_processors=[truncate_fields(truncated_fields, max_field_length)],
     )
 
 
@@ -49,17 +222,26 @@ def configure_default_logging(
     shared_processors: Iterable[structlog.typing.Processor] | None,
     logs_render: structlog.dev.ConsoleRenderer | structlog.processors.JSONRenderer,
     log_level: int,
+    is_off_loop: bool = False,
+    render_processors: Iterable[structlog.typing.Processor] = (),
 ) -> None:
     formatter = structlog.stdlib.ProcessorFormatter(
         foreign_pre_chain=shared_processors,
         processors=[
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            *render_processors,
             logs_render,
         ],
     )
 
-    handler = logging.StreamHandler()
+    handler: logging.Handler = logging.StreamHandler()
     handler.setFormatter(formatter)
+    if is_off_loop:
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        handler = OffLoopQueueHandler(log_queue)
     root_logger = logging.getLogger()
     root_logger.addHandler(handler)
     root_logger.setLevel(log_level)
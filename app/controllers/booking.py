@@ -1,18 +1,23 @@
 import datetime
 from collections.abc import Iterator
 from contextlib import contextmanager
+from functools import partial
 
 import structlog
 from structlog.contextvars import bind_contextvars, unbind_contextvars
 
-from app.dtos import BookingDTO, BookingEventDTO, TriggerEvent
-from app.interfaces.booking import IBookingDatabaseAdapter
-from app.interfaces.booking_constraints import IBookingConstraintsAnalyzer
+from app.controllers.delivery import fan_out, get_channel_timeout
+from app.dtos import BookingDTO, BookingEventDTO, DueReminderDTO, TriggerEvent
+from app.interfaces.booking import IBookingCache, IBookingDatabaseAdapter
+from app.interfaces.booking_constraints import IBookingConstraintsAnalyzer, IClientBookingsAggregator
 from app.interfaces.chat import IChatController
 from app.interfaces.meeting import IMeetingController, INotificationStateController
 from app.interfaces.notification import INotificationController
+from app.interfaces.reminders import IReminderScheduler
+from app.interfaces.sql import UnitOfWorkFactory
 from app.interfaces.url_shortener import IUrlShortener
 from app.settings import Settings
+from app.tracing import traced, tracer
 
 
 logger = structlog.get_logger(__name__)
@@ -25,26 +30,36 @@ class BookingController:
     def __init__(
         self,
         db: IBookingDatabaseAdapter,
+        booking_cache: IBookingCache,
         shortener: IUrlShortener,
         chat_controller: IChatController,
         meeting_controller: IMeetingController,
         notification_controller: INotificationController,
         notification_state_controller: INotificationStateController,
         booking_constraints_analyzer: IBookingConstraintsAnalyzer,
+        client_bookings_aggregator: IClientBookingsAggregator,
+        reminder_scheduler: IReminderScheduler,
+        unit_of_work: UnitOfWorkFactory,
         settings: Settings,
     ) -> None:
         self.db = db
+        self.booking_cache = booking_cache
         self.shortener = shortener
         self.chat_controller = chat_controller
         self.meeting_controller = meeting_controller
         self.notification_controller = notification_controller
         self.notification_state_controller = notification_state_controller
         self.booking_constraints_analyzer = booking_constraints_analyzer
+        self.client_bookings_aggregator = client_bookings_aggregator
+        self.reminder_scheduler = reminder_scheduler
+        self.unit_of_work = unit_of_work
         self.client_meeting_prefix = "client_"
         self.settings = settings
 
     async def handle_booking(self, booking_event: BookingEventDTO) -> None:
-        await self._background_processing(booking_event)
+        # The event's statements share one session instead of checking out a connection each.
+        async with self.unit_of_work():
+            await self._background_processing(booking_event)
 
     @staticmethod
     @contextmanager
@@ -85,29 +100,71 @@ class BookingController:
         count_sent_reminders = 0
         for booking in bookings:
             with self._booking_log_context(booking_uid=booking.uid, booking=booking):
-                if await self.notification_state_controller.was_notified(
-                    room=f"{booking.uid}{booking.client.email}",
-                    key=BOOKING_REMINDER_NOTIFICATION_KEY,
-                ):
-                    continue
+                async with self.unit_of_work():
+                    if await self._send_reminder(booking):
+                        count_sent_reminders += 1
+        return count_sent_reminders
 
-                meeting_url = await self.meeting_controller.get_meeting_url(
-                    booking=booking,
-                    external_id_prefix=self.client_meeting_prefix,
-                )
-                await self.notification_controller.notify_client(
-                    booking=booking,
-                    meeting_url=meeting_url,
-                    trigger_event=TriggerEvent.BOOKING_REMINDER,
-                )
-                await self.notification_state_controller.mark_notified(
-                    room=f"{booking.uid}{booking.client.email}",
-                    ttl_seconds=BOOKING_REMINDER_TTL_SECONDS,
-                    key=BOOKING_REMINDER_NOTIFICATION_KEY,
-                )
-            count_sent_reminders += 1
+    async def send_due_reminders(self, due_reminders: list[DueReminderDTO]) -> int:
+        """Send claimed reminders and acknowledge the handled ones; failed ones are claimed again after the lease.
+
+        A reminder whose booking is gone, no longer accepted or already started is acknowledged without sending.
+        """
+        now = datetime.datetime.now(datetime.UTC)
+        count_sent_reminders = 0
+        handled_reminders = []
+        try:
+            for due_reminder in due_reminders:
+                try:
+                    async with self.unit_of_work():
+                        booking = await self.db.get_booking(due_reminder.booking_uid)
+                        if booking and booking.status == "accepted" and booking.start_time > now:
+                            with self._booking_log_context(booking_uid=booking.uid, booking=booking):
+                                if await self._send_reminder(booking):
+                                    count_sent_reminders += 1
+                except Exception:
+                    logger.exception("Error sending scheduled reminder", uid=due_reminder.booking_uid)
+                    continue
+                handled_reminders.append(due_reminder)
+        finally:
+            await self.reminder_scheduler.ack(handled_reminders)
+        logger.info(
+            "Scheduled reminders sent",
+            due=len(due_reminders),
+            sent=count_sent_reminders,
+            failed=len(due_reminders) - len(handled_reminders),
+            max_lateness_seconds=round(
+                max((now - due_reminder.fire_at).total_seconds() for due_reminder in due_reminders),
+                3,
+            ),
+        )
         return count_sent_reminders
 
+    @traced
+    async def _send_reminder(self, booking: BookingDTO) -> bool:
+        if await self.notification_state_controller.was_notified(
+            room=f"{booking.uid}{booking.client.email}",
+            key=BOOKING_REMINDER_NOTIFICATION_KEY,
+        ):
+            return False
+
+        meeting_url = await self.meeting_controller.get_meeting_url(
+            booking=booking,
+            external_id_prefix=self.client_meeting_prefix,
+        )
+        await self.notification_controller.notify_client(
+            booking=booking,
+            meeting_url=meeting_url,
+            trigger_event=TriggerEvent.BOOKING_REMINDER,
+        )
+        await self.notification_state_controller.mark_notified(
+            room=f"{booking.uid}{booking.client.email}",
+            ttl_seconds=BOOKING_REMINDER_TTL_SECONDS,
+            key=BOOKING_REMINDER_NOTIFICATION_KEY,
+        )
+        return True
+
+    @traced
     async def _process_booking_flow(
         self,
         booking_event: BookingEventDTO,
@@ -119,8 +176,15 @@ class BookingController:
             return None
 
         await self._create_new_chat(booking=booking)
+        if self.settings.is_enable_reminder_scheduler:
+            await self.reminder_scheduler.schedule(booking)
 
         if booking.from_reschedule:
+            if self.settings.is_enable_reminder_scheduler:
+                await self.reminder_scheduler.unschedule(booking.from_reschedule)
+            await self.booking_cache.invalidate(booking.from_reschedule)
+            if self.settings.is_enable_booking_constraints:
+                await self.client_bookings_aggregator.apply_rescheduled(booking)
             booking.previous_booking = await self.db.get_booking(booking.from_reschedule)
             try:
                 await self.chat_controller.delete_chat(channel_id=booking.previous_booking.uid)
@@ -156,22 +220,39 @@ class BookingController:
         )
         return None
 
-    async def _validate_booking_constraints_on_create(self, booking_uid: str) -> bool:
+    @traced
+    async def _validate_booking_constraints_on_create(self, *, booking: BookingDTO) -> bool:
         if not self.settings.is_enable_booking_constraints:
             return True
 
-        booking = await self.db.get_booking(booking_uid)
-        if not booking:
-            logger.warning("Booking not found while validating constraints")
-            return False
-
-        attendee_bookings = await self.db.get_attendee_bookings_by_email(email=booking.client.email)
-        validation_result = self.booking_constraints_analyzer.analyze_on_create(
-            booking=booking,
-            attendee_bookings=attendee_bookings,
-        )
+        attendee_bookings = None
+        if aggregate := await self.client_bookings_aggregator.apply_created(booking):
+            validation_result = self.booking_constraints_analyzer.analyze_on_create_from_aggregate(
+                booking=booking,
+                aggregate=aggregate,
+            )
+            # Cal.com marks a bad connection after the meeting without a booking event, so the aggregate can still
+            # count it; the meetings that already took place are re-read, by uid, before a rejection is final.
+            if (
+                not validation_result["is_allowed"]
+                and (refreshed := await self.client_bookings_aggregator.refresh_bad_connections(aggregate))
+                is not aggregate
+            ):
+                validation_result = self.booking_constraints_analyzer.analyze_on_create_from_aggregate(
+                    booking=booking,
+                    aggregate=refreshed,
+                )
+        else:
+            attendee_bookings = await self.db.get_attendee_bookings_by_email(email=booking.client.email)
+            validation_result = self.booking_constraints_analyzer.analyze_on_create(
+                booking=booking,
+                attendee_bookings=attendee_bookings,
+            )
         if validation_result["is_allowed"]:
             return True
+        if attendee_bookings is None:
+            # The aggregate only keeps recent bookings; the rejection email lists every previous meeting.
+            attendee_bookings = await self.db.get_attendee_bookings_by_email(email=booking.client.email)
 
         previous_meeting_dates = sorted(
             [
@@ -182,28 +263,43 @@ class BookingController:
             ],
         )
 
-        await self.notification_controller.notify_client_booking_rejected(
-            booking=booking,
-            available_from=validation_result["available_from"],
-            previous_meeting_dates=previous_meeting_dates,
-            rejection_type=validation_result["rejection_type"],
-            active_booking_start=validation_result["active_booking_start"],
-        )
-
-        await self.db.delete_booking_and_attendee_by_booking_id(booking_id=booking.id)
+        rejection = {
+            "booking": booking,
+            "available_from": validation_result["available_from"],
+            "previous_meeting_dates": previous_meeting_dates,
+            "rejection_type": validation_result["rejection_type"],
+            "active_booking_start": validation_result["active_booking_start"],
+        }
+        if self.settings.is_enable_notification_outbox:
+            # The rejection email is committed together with the deletion, so neither can happen without the other.
+            await self.db.delete_booking_and_attendee_by_booking_id(
+                booking_id=booking.id,
+                outbox_messages=[self.notification_controller.build_client_booking_rejected_message(**rejection)],
+            )
+        else:
+            await self.notification_controller.notify_client_booking_rejected(**rejection)
+            await self.db.delete_booking_and_attendee_by_booking_id(booking_id=booking.id)
+        await self.client_bookings_aggregator.apply_deleted(booking)
         logger.warning("Booking was deleted due to booking rules violation")
         return False
 
-    async def _handle_created(self, booking_event: BookingEventDTO) -> None:
-        if not await self._validate_booking_constraints_on_create(booking_uid=booking_event.payload.uid):
+    @traced
+    async def _handle_created(self, booking_event: BookingEventDTO, booking: BookingDTO | None) -> None:
+        if not booking:
+            logger.warning("Booking not found")
+            return None
+
+        if not await self._validate_booking_constraints_on_create(booking=booking):
             return None
 
         await self._process_booking_flow(booking_event=booking_event, is_update_url_data=False)
         return None
 
+    @traced
     async def _handle_rescheduled(self, booking_event: BookingEventDTO) -> None:
         await self._process_booking_flow(booking_event=booking_event, is_update_url_data=True)
 
+    @traced
     async def _handle_reassigned(self, booking_event: BookingEventDTO) -> None:
         booking = await self.db.get_booking(booking_event.payload.uid)
         if previous_organizer := await self.db.get_user_by_id(user_id=booking.reassign_by_id):
@@ -237,35 +333,64 @@ class BookingController:
             meeting_url=meeting_url,
         )
 
+    @traced
     async def _handle_cancelled(self, booking_event: BookingEventDTO) -> None:
+        await self.booking_cache.invalidate(booking_event.payload.uid)
+        if self.settings.is_enable_reminder_scheduler:
+            await self.reminder_scheduler.unschedule(booking_event.payload.uid)
         booking = await self.db.get_booking(booking_event.payload.uid)
-
-        await self.notification_controller.notify_organizer(
-            user=booking.user,
-            booking=booking,
-            trigger_event=booking_event.trigger_event,
-            meeting_url=None,
-        )
-        await self.notification_controller.notify_client(
-            booking=booking,
-            trigger_event=booking_event.trigger_event,
-            meeting_url=None,
+        if self.settings.is_enable_booking_constraints:
+            await self.client_bookings_aggregator.apply_cancelled(booking)
+
+        # Notifications and cleanup are independent, so the handler takes as long as its slowest call.
+        # The notification channels are fan-outs themselves and apply their own per-channel timeouts.
+        await fan_out(
+            {
+                "organizer": partial(
+                    self.notification_controller.notify_organizer,
+                    user=booking.user,
+                    booking=booking,
+                    trigger_event=booking_event.trigger_event,
+                    meeting_url=None,
+                ),
+                "client": partial(
+                    self.notification_controller.notify_client,
+                    booking=booking,
+                    trigger_event=booking_event.trigger_event,
+                    meeting_url=None,
+                ),
+                "chat": partial(self.chat_controller.delete_chat, channel_id=booking.uid),
+                "organizer_meeting_url": partial(self.meeting_controller.delete_meeting_url, booking=booking),
+                "client_meeting_url": partial(
+                    self.meeting_controller.delete_meeting_url,
+                    booking=booking,
+                    external_id_prefix=self.client_meeting_prefix,
+                ),
+            },
+            timeouts={
+                "chat": get_channel_timeout(self.settings, "chat"),
+                "organizer_meeting_url": get_channel_timeout(self.settings, "meeting_url"),
+                "client_meeting_url": get_channel_timeout(self.settings, "meeting_url"),
+            },
         )
-        try:
-            await self.chat_controller.delete_chat(channel_id=booking.uid)
-        except Exception:
-            logger.exception("Error while deleting chat for booking")
-        await self.meeting_controller.delete_meeting_url(booking=booking)
-        await self.meeting_controller.delete_meeting_url(booking=booking, external_id_prefix=self.client_meeting_prefix)
 
     async def _background_processing(self, booking_event: BookingEventDTO) -> None:
         booking = await self.db.get_booking(booking_event.payload.uid)
-        with self._booking_log_context(booking_uid=booking_event.payload.uid, booking=booking):
+        with (
+            self._booking_log_context(booking_uid=booking_event.payload.uid, booking=booking),
+            tracer.start_as_current_span(
+                f"booking {booking_event.trigger_event}",
+                attributes={
+                    "booking.uid": booking_event.payload.uid,
+                    "booking.trigger_event": booking_event.trigger_event,
+                },
+            ),
+        ):
             logger.info("Processing booking event", type=booking_event.trigger_event)
             try:
                 match booking_event.trigger_event:
                     case TriggerEvent.BOOKING_CREATED:
-                        await self._handle_created(booking_event)
+                        await self._handle_created(booking_event, booking)
                     case TriggerEvent.BOOKING_RESCHEDULED:
                         await self._handle_rescheduled(booking_event)
                     case TriggerEvent.BOOKING_PAYMENT_INITIATED:
@@ -277,6 +402,7 @@ class BookingController:
             except Exception:
                 logger.exception("Error in background processing")
 
+    @traced
     async def _create_new_chat(self, *, booking: BookingDTO) -> None:
         try:
             await self.chat_controller.create_chat(
@@ -0,0 +1,62 @@
+import datetime
+
+from app.interfaces.booking_constraints import (
+    BookingConstraintsValidationResult,
+    IBookingAvailabilityController,
+    IBookingConstraintsAnalyzer,
+    IClientBookingsAggregator,
+)
+from app.settings import Settings
+
+
+class BookingAvailabilityController(IBookingAvailabilityController):
+    """Pre-check for the booking front-end, answered from the cached client bookings aggregate."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        client_bookings_aggregator: IClientBookingsAggregator,
+        booking_constraints_analyzer: IBookingConstraintsAnalyzer,
+    ) -> None:
+        self.settings = settings
+        self.client_bookings_aggregator = client_bookings_aggregator
+        self.booking_constraints_analyzer = booking_constraints_analyzer
+
+    async def check(
+        self,
+        *,
+        email: str,
+        start_time: datetime.datetime,
+        event_type_id: int | None = None,
+    ) -> BookingConstraintsValidationResult:
+        # Month/year counters and the bookings in the aggregate are keyed by UTC time.
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=datetime.UTC)
+        else:
+            start_time = start_time.astimezone(datetime.UTC)
+
+        if not self.settings.is_enable_booking_constraints:
+            return {
+                "is_allowed": True,
+                "available_from": start_time,
+                "rejection_type": None,
+                "active_booking_start": None,
+            }
+
+        aggregate = await self.client_bookings_aggregator.get_or_rebuild(email)
+        result = self.booking_constraints_analyzer.analyze_candidate(
+            aggregate=aggregate,
+            start_time=start_time,
+            event_type_id=event_type_id,
+        )
+        if result["is_allowed"]:
+            return result
+        # The aggregate can still count a meeting Cal.com later marked as a bad connection; only the meetings that
+        # already took place are re-read, by uid.
+        if (refreshed := await self.client_bookings_aggregator.refresh_bad_connections(aggregate)) is aggregate:
+            return result
+        return self.booking_constraints_analyzer.analyze_candidate(
+            aggregate=refreshed,
+            start_time=start_time,
+            event_type_id=event_type_id,
+        )
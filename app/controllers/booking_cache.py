@@ -0,0 +1,83 @@
+import datetime
+import json
+from dataclasses import asdict
+from typing import Any
+
+import structlog
+
+from app.dtos import BookingClientDTO, BookingDTO
+from app.interfaces.booking import IBookingCache
+from app.interfaces.cache import ICacheController
+
+
+logger = structlog.get_logger(__name__)
+
+BOOKING_CACHE_KEY_PREFIX = "booking"
+BOOKING_CACHE_AFTER_END_SECONDS = 60 * 15
+BOOKING_CACHE_MAX_TTL_SECONDS = 60 * 60 * 24 * 7
+BOOKING_DATETIME_FIELDS = ("created_at", "end_time", "start_time", "updated_at")
+
+
+class BookingCacheController(IBookingCache):
+    """Short-lived booking snapshots for the meeting window, keyed by booking uid (== meeting room).
+
+    The organizer is not part of the snapshot: a ``users`` row changes without a booking event, so readers resolve
+    it by ``user_id``.
+    """
+
+    def __init__(self, cache_controller: ICacheController) -> None:
+        self.cache_controller = cache_controller
+
+    @staticmethod
+    def _build_key(booking_uid: str) -> str:
+        return f"{BOOKING_CACHE_KEY_PREFIX}:{booking_uid}"
+
+    @staticmethod
+    def _get_ttl_seconds(booking: BookingDTO) -> int:
+        expires_at = booking.end_time + datetime.timedelta(seconds=BOOKING_CACHE_AFTER_END_SECONDS)
+        ttl_seconds = int((expires_at - datetime.datetime.now(datetime.UTC)).total_seconds())
+        return min(ttl_seconds, BOOKING_CACHE_MAX_TTL_SECONDS)
+
+    @staticmethod
+    def _serialize(booking: BookingDTO) -> str:
+        data = asdict(booking)
+        data["previous_booking"] = None
+        data["user"] = None
+        return json.dumps(data, default=lambda value: value.isoformat())
+
+    @staticmethod
+    def _deserialize(raw: str | bytes) -> BookingDTO:
+        data: dict[str, Any] = json.loads(raw)
+        for field_name in BOOKING_DATETIME_FIELDS:
+            if data.get(field_name):
+                data[field_name] = datetime.datetime.fromisoformat(data[field_name])
+        data["client"] = BookingClientDTO(**data["client"]) if data.get("client") else None
+        return BookingDTO(**data)
+
+    async def get(self, booking_uid: str) -> BookingDTO | None:
+        try:
+            raw = await self.cache_controller.get(self._build_key(booking_uid))
+            return self._deserialize(raw) if raw else None
+        except Exception:
+            logger.exception("Error reading booking from cache", booking_uid=booking_uid)
+            return None
+
+    async def set(self, booking: BookingDTO) -> None:
+        ttl_seconds = self._get_ttl_seconds(booking)
+        if ttl_seconds <= 0:
+            return None
+        try:
+            await self.cache_controller.set(
+                self._build_key(booking.uid),
+                self._serialize(booking),
+                ttl_seconds=ttl_seconds,
+            )
+        except Exception:
+            logger.exception("Error writing booking to cache", booking_uid=booking.uid)
+        return None
+
+    async def invalidate(self, booking_uid: str) -> None:
+        try:
+            await self.cache_controller.delete(self._build_key(booking_uid))
+        except Exception:
+            logger.exception("Error invalidating booking cache", booking_uid=booking_uid)
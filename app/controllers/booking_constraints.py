@@ -1,140 +1,207 @@
+import bisect
 import datetime
+from operator import attrgetter
 
-from app.dtos import AttendeeBookingDTO, BookingDTO
-from app.interfaces.booking_constraints import BookingConstraintsValidationResult, IBookingConstraintsAnalyzer
+from app.dtos import AttendeeBookingDTO, BookingDTO, ClientBookingsAggregateDTO
+from app.interfaces.booking_constraints import (
+    BookingConstraintsValidationResult,
+    IBookingConstraintsAnalyzer,
+    IBookingRulesEngine,
+)
 
 
-MIN_DAYS_BETWEEN_BOOKINGS = 7
-MAX_BOOKINGS_PER_MONTH = 2
-MAX_BOOKINGS_PER_YEAR = 10
-MONTHS_AFTER_CANCELLATION = 2
+CANDIDATE_BOOKING_UID = "availability-candidate"
 
 
-class BookingConstraintsAnalyzer(IBookingConstraintsAnalyzer):
-    def analyze_on_create(
+def get_month_key(target_date: datetime.datetime) -> str:
+    return f"{target_date.year:04d}-{target_date.month:02d}"
+
+
+def get_year_key(target_date: datetime.datetime) -> str:
+    return f"{target_date.year:04d}"
+
+
+class BookingTimeline:
+    """Client bookings sorted once by start time.
+
+    Interval and nearest-booking rules are answered with a bisect; monthly/yearly limits use the aggregate
+    counters when they are given and fall back to a single scan otherwise.
+    """
+
+    def __init__(
         self,
-        *,
-        booking: BookingDTO,
         attendee_bookings: list[AttendeeBookingDTO],
-    ) -> BookingConstraintsValidationResult:
-        last_cancelled_booking = max(
+        *,
+        is_sorted: bool = False,
+        monthly_counts: dict[str, int] | None = None,
+        yearly_counts: dict[str, int] | None = None,
+    ) -> None:
+        bookings = attendee_bookings if is_sorted else sorted(attendee_bookings, key=attrgetter("start_time"))
+        self.bookings = bookings
+        self.active_bookings = [
+            attendee_booking for attendee_booking in bookings if not attendee_booking.bad_connection
+        ]
+        self.active_starts = [attendee_booking.start_time for attendee_booking in self.active_bookings]
+        self.cancelled_bookings = [
+            attendee_booking for attendee_booking in bookings if attendee_booking.status == "cancelled"
+        ]
+
+        self.monthly_counts = monthly_counts
+        self.yearly_counts = yearly_counts
+
+    def append(self, attendee_booking: AttendeeBookingDTO) -> None:
+        """Extend the timeline with a booking that starts no earlier than the ones already in it."""
+        self.bookings.append(attendee_booking)
+        if attendee_booking.status == "cancelled":
+            self.cancelled_bookings.append(attendee_booking)
+        if attendee_booking.bad_connection:
+            return
+        self.active_bookings.append(attendee_booking)
+        self.active_starts.append(attendee_booking.start_time)
+        if self.monthly_counts is not None:
+            month_key = get_month_key(attendee_booking.start_time)
+            self.monthly_counts[month_key] = self.monthly_counts.get(month_key, 0) + 1
+        if self.yearly_counts is not None:
+            year_key = get_year_key(attendee_booking.start_time)
+            self.yearly_counts[year_key] = self.yearly_counts.get(year_key, 0) + 1
+
+    def get_last_cancelled(self, *, exclude_uid: str | None) -> AttendeeBookingDTO | None:
+        return next(
             (
                 attendee_booking
-                for attendee_booking in attendee_bookings
-                if attendee_booking.status == "cancelled" and attendee_booking.booking_uid != booking.uid
+                for attendee_booking in reversed(self.cancelled_bookings)
+                if attendee_booking.booking_uid != exclude_uid
             ),
-            key=lambda attendee_booking: attendee_booking.start_time,
-            default=None,
+            None,
         )
-        if last_cancelled_booking:
-            available_from_after_cancel = self._add_months(last_cancelled_booking.start_time, MONTHS_AFTER_CANCELLATION)
-            if booking.start_time < available_from_after_cancel:
-                return {
-                    "is_allowed": False,
-                    "available_from": available_from_after_cancel,
-                    "rejection_type": "cancelled_booking",
-                    "active_booking_start": None,
-                }
-
-        active_bookings = [
-            attendee_booking for attendee_booking in attendee_bookings if not attendee_booking.bad_connection
-        ]
-
-        other_active_bookings = [
-            attendee_booking for attendee_booking in active_bookings if attendee_booking.booking_uid != booking.uid
-        ]
 
-        nearest_future_booking = min(
+    def get_nearest_after(self, moment: datetime.datetime, *, exclude_uid: str | None) -> AttendeeBookingDTO | None:
+        index = bisect.bisect_right(self.active_starts, moment)
+        return next(
             (
                 attendee_booking
-                for attendee_booking in other_active_bookings
-                if attendee_booking.start_time > datetime.datetime.now(datetime.UTC)
+                for attendee_booking in self.active_bookings[index:]
+                if attendee_booking.booking_uid != exclude_uid
             ),
-            key=lambda attendee_booking: attendee_booking.start_time,
-            default=None,
+            None,
         )
 
-        if nearest_future_booking:
-            return {
-                "is_allowed": False,
-                "available_from": nearest_future_booking.end_time,
-                "rejection_type": "has_active_booking",
-                "active_booking_start": nearest_future_booking.start_time,
-            }
-
-        monthly_bookings = [
+    def get_close_bookings(
+        self,
+        start_time: datetime.datetime,
+        *,
+        min_days: int,
+        exclude_uid: str | None,
+    ) -> list[AttendeeBookingDTO]:
+        # Same window as `abs((start_time - other).days) < min_days`: timedelta.days is floored,
+        # so bookings up to `min_days` days before and up to `min_days - 1` days after the start time are too close.
+        left = bisect.bisect_right(self.active_starts, start_time - datetime.timedelta(days=min_days))
+        right = bisect.bisect_right(self.active_starts, start_time + datetime.timedelta(days=min_days - 1))
+        return [
             attendee_booking
-            for attendee_booking in active_bookings
-            if attendee_booking.start_time.year == booking.start_time.year
-            and attendee_booking.start_time.month == booking.start_time.month
+            for attendee_booking in self.active_bookings[left:right]
+            if attendee_booking.booking_uid != exclude_uid
         ]
-        available_dates: list[datetime.datetime] = [booking.start_time]
 
-        is_monthly_limit_violated = len(monthly_bookings) > MAX_BOOKINGS_PER_MONTH
-        if is_monthly_limit_violated:
-            available_dates.append(self._get_next_month_start(booking.start_time))
+    def count_in_month(self, target_date: datetime.datetime) -> int:
+        if self.monthly_counts is not None:
+            return self.monthly_counts.get(get_month_key(target_date), 0)
+        return sum(
+            1
+            for start_time in self.active_starts
+            if start_time.year == target_date.year and start_time.month == target_date.month
+        )
 
-        yearly_bookings = [
-            attendee_booking
-            for attendee_booking in active_bookings
-            if attendee_booking.start_time.year == booking.start_time.year
-        ]
-        is_yearly_limit_violated = len(yearly_bookings) > MAX_BOOKINGS_PER_YEAR
-        if is_yearly_limit_violated:
-            available_dates.append(
-                booking.start_time.replace(year=booking.start_time.year + 1, month=1, day=1, hour=0, minute=0),
-            )
-
-        is_weekly_limit_violated = False
-        for attendee_booking in other_active_bookings:
-            days_delta = abs((booking.start_time - attendee_booking.start_time).days)
-            if days_delta < MIN_DAYS_BETWEEN_BOOKINGS:
-                is_weekly_limit_violated = True
-                available_dates.append(attendee_booking.start_time + datetime.timedelta(days=MIN_DAYS_BETWEEN_BOOKINGS))
-
-        if is_monthly_limit_violated or is_yearly_limit_violated or is_weekly_limit_violated:
-            return {
-                "is_allowed": False,
-                "available_from": max(available_dates),
-                "rejection_type": self._resolve_rejection_type(
-                    is_monthly_limit_violated=is_monthly_limit_violated,
-                    is_yearly_limit_violated=is_yearly_limit_violated,
-                    is_weekly_limit_violated=is_weekly_limit_violated,
-                ),
-                "active_booking_start": None,
-            }
-
-        return {
-            "is_allowed": True,
-            "available_from": booking.start_time,
-            "rejection_type": None,
-            "active_booking_start": None,
-        }
-
-    @staticmethod
-    def _get_next_month_start(target_date: datetime.datetime) -> datetime.datetime:
-        if target_date.month == 12:
-            return target_date.replace(year=target_date.year + 1, month=1, day=1, hour=0, minute=0)
-        return target_date.replace(month=target_date.month + 1, day=1, hour=0, minute=0)
-
-    @staticmethod
-    def _add_months(target_date: datetime.datetime, months: int) -> datetime.datetime:
-        month = target_date.month - 1 + months
-        year = target_date.year + month // 12
-        month = month % 12 + 1
-        return target_date.replace(year=year, month=month)
-
-    @staticmethod
-    def _resolve_rejection_type(
+    def count_in_year(self, target_date: datetime.datetime) -> int:
+        if self.yearly_counts is not None:
+            return self.yearly_counts.get(get_year_key(target_date), 0)
+        return sum(1 for start_time in self.active_starts if start_time.year == target_date.year)
+
+
+class BookingConstraintsAnalyzer(IBookingConstraintsAnalyzer):
+    def __init__(self, rules_engine: IBookingRulesEngine) -> None:
+        self.rules_engine = rules_engine
+
+    def analyze_on_create(
+        self,
+        *,
+        booking: BookingDTO,
+        attendee_bookings: list[AttendeeBookingDTO],
+    ) -> BookingConstraintsValidationResult:
+        return self.analyze_timeline(
+            booking_uid=booking.uid,
+            start_time=booking.start_time,
+            timeline=BookingTimeline(attendee_bookings),
+            event_type_id=booking.event_type_id,
+        )
+
+    def analyze_on_create_from_aggregate(
+        self,
+        *,
+        booking: BookingDTO,
+        aggregate: ClientBookingsAggregateDTO,
+    ) -> BookingConstraintsValidationResult:
+        return self.analyze_timeline(
+            booking_uid=booking.uid,
+            start_time=booking.start_time,
+            timeline=BookingTimeline(
+                aggregate.bookings,
+                is_sorted=True,
+                monthly_counts=aggregate.monthly_counts,
+                yearly_counts=aggregate.yearly_counts,
+            ),
+            event_type_id=booking.event_type_id,
+        )
+
+    def analyze_candidate(
+        self,
         *,
-        is_monthly_limit_violated: bool,
-        is_yearly_limit_violated: bool,
-        is_weekly_limit_violated: bool,
-    ) -> str | None:
-        if is_monthly_limit_violated:
-            return "month_limit"
-        if is_yearly_limit_violated:
-            return "year_limit"
-        if is_weekly_limit_violated:
-            return "min_interval"
-        return None
+        aggregate: ClientBookingsAggregateDTO,
+        start_time: datetime.datetime,
+        event_type_id: int | None = None,
+    ) -> BookingConstraintsValidationResult:
+        """Answer "would a booking at `start_time` be accepted" without creating it.
+
+        The candidate is inserted into a copy of the aggregate, exactly as the created booking would be by the time
+        `analyze_on_create_from_aggregate` runs, so both checks give the same answer.
+        """
+        candidate = AttendeeBookingDTO(
+            booking_id=0,
+            booking_uid=CANDIDATE_BOOKING_UID,
+            name="",
+            email=aggregate.email,
+            start_time=start_time,
+            end_time=start_time,
+            status="accepted",
+        )
+        bookings = list(aggregate.bookings)
+        bisect.insort_right(bookings, candidate, key=attrgetter("start_time"))
+        month_key, year_key = get_month_key(start_time), get_year_key(start_time)
+        return self.analyze_timeline(
+            booking_uid=CANDIDATE_BOOKING_UID,
+            start_time=start_time,
+            timeline=BookingTimeline(
+                bookings,
+                is_sorted=True,
+                monthly_counts={**aggregate.monthly_counts, month_key: aggregate.monthly_counts.get(month_key, 0) + 1},
+                yearly_counts={**aggregate.yearly_counts, year_key: aggregate.yearly_counts.get(year_key, 0) + 1},
+            ),
+            event_type_id=event_type_id,
+        )
+
+    def analyze_timeline(
+        self,
+        *,
+        booking_uid: str | None,
+        start_time: datetime.datetime,
+        timeline: BookingTimeline,
+        event_type_id: int | None = None,
+        now: datetime.datetime | None = None,
+    ) -> BookingConstraintsValidationResult:
+        return self.rules_engine.evaluate(
+            event_type_id=event_type_id,
+            booking_uid=booking_uid,
+            start_time=start_time,
+            timeline=timeline,
+            now=now or datetime.datetime.now(datetime.UTC),
+        )
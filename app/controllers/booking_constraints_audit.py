@@ -0,0 +1,61 @@
+from app.controllers.booking_constraints import BookingConstraintsAnalyzer, BookingTimeline
+from app.controllers.booking_rules import BookingRulesEngine
+from app.dtos import AttendeeBookingDTO, BookingConstraintsViolationDTO
+from app.settings import BookingConstraintsRules
+
+
+def audit_client_bookings(
+    analyzer: BookingConstraintsAnalyzer,
+    email: str,
+    attendee_bookings: list[AttendeeBookingDTO],
+) -> list[BookingConstraintsViolationDTO]:
+    """Replay one client's history in start order and report bookings the create-time rules would reject.
+
+    Each booking is checked against the bookings that start before it, with ``now`` at its start time. The
+    "has active booking" rule depends on when the booking was made, which the history does not keep, so it never
+    fires here; the interval, monthly, yearly and post-cancellation rules are reproduced exactly. The timeline is
+    extended one booking at a time, so a client's history is replayed in O(n log n) instead of re-sorting prefixes.
+    """
+    bookings = sorted(attendee_bookings, key=lambda attendee_booking: attendee_booking.start_time)
+    timeline = BookingTimeline([], is_sorted=True, monthly_counts={}, yearly_counts={})
+    violations = []
+    for attendee_booking in bookings:
+        timeline.append(attendee_booking)
+        if attendee_booking.status == "cancelled" or attendee_booking.bad_connection:
+            continue
+        result = analyzer.analyze_timeline(
+            booking_uid=attendee_booking.booking_uid,
+            start_time=attendee_booking.start_time,
+            timeline=timeline,
+            now=attendee_booking.start_time,
+        )
+        if result["is_allowed"]:
+            continue
+        violations.append(
+            BookingConstraintsViolationDTO(
+                email=email,
+                booking_id=attendee_booking.booking_id,
+                booking_uid=attendee_booking.booking_uid,
+                start_time=attendee_booking.start_time,
+                status=attendee_booking.status,
+                rejection_type=result["rejection_type"],
+                available_from=result["available_from"],
+            ),
+        )
+    return violations
+
+
+def audit_clients(
+    clients: list[tuple[str, list[AttendeeBookingDTO]]],
+    rules: BookingConstraintsRules,
+) -> list[BookingConstraintsViolationDTO]:
+    """Process pool entry point: audit a chunk of clients in one task to amortize pickling overhead.
+
+    Attendee bookings carry no event type, so every client is checked against the default rules.
+    """
+    analyzer = BookingConstraintsAnalyzer(rules_engine=BookingRulesEngine(default_rules=rules))
+    return [
+        violation
+        for email, attendee_bookings in clients
+        for violation in audit_client_bookings(analyzer, email, attendee_bookings)
+    ]
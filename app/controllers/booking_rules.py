@@ -0,0 +1,328 @@
+import calendar
+import datetime
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import ClassVar, override
+
+from app.controllers.booking_constraints import BookingTimeline
+from app.interfaces.booking_constraints import BookingConstraintsValidationResult, IBookingRulesEngine
+from app.settings import BookingConstraintsRules
+
+
+DEFAULT_REJECTION_REASON = "К сожалению, сейчас мы не можем подтвердить вашу запись."
+
+
+def pluralize(count: int, one: str, few: str, many: str) -> str:
+    if count % 10 == 1 and count % 100 != 11:
+        return one
+    if 2 <= count % 10 <= 4 and not 12 <= count % 100 <= 14:
+        return few
+    return many
+
+
+def add_months(target_date: datetime.datetime, months: int) -> datetime.datetime:
+    month = target_date.month - 1 + months
+    year = target_date.year + month // 12
+    month = month % 12 + 1
+    # Month ends are clamped (Dec 31 + 2 months -> Feb 28/29) instead of raising.
+    day = min(target_date.day, calendar.monthrange(year, month)[1])
+    return target_date.replace(year=year, month=month, day=day)
+
+
+def get_next_month_start(target_date: datetime.datetime) -> datetime.datetime:
+    if target_date.month == 12:
+        return target_date.replace(year=target_date.year + 1, month=1, day=1, hour=0, minute=0)
+    return target_date.replace(month=target_date.month + 1, day=1, hour=0, minute=0)
+
+
+@dataclass(slots=True, frozen=True)
+class RuleContext:
+    booking_uid: str | None
+    start_time: datetime.datetime
+    timeline: BookingTimeline
+    now: datetime.datetime
+
+
+@dataclass(slots=True, frozen=True)
+class RuleViolation:
+    rejection_type: str
+    available_from: datetime.datetime
+    active_booking_start: datetime.datetime | None = None
+
+
+class BookingRule(ABC):
+    """A single constraint.
+
+    ``horizon`` is how far before the checked start time a past booking can still affect the result.
+    """
+
+    rejection_type: ClassVar[str]
+    horizon = datetime.timedelta(0)
+
+    @abstractmethod
+    def check(self, context: RuleContext) -> RuleViolation | None: ...
+
+    @abstractmethod
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str: ...
+
+
+class CancellationCooldownRule(BookingRule):
+    rejection_type = "cancelled_booking"
+
+    def __init__(self, months: int) -> None:
+        self.months = months
+        self.horizon = datetime.timedelta(days=31 * months)
+
+    @override
+    def check(self, context: RuleContext) -> RuleViolation | None:
+        last_cancelled_booking = context.timeline.get_last_cancelled(exclude_uid=context.booking_uid)
+        if not last_cancelled_booking:
+            return None
+        available_from = add_months(last_cancelled_booking.start_time, self.months)
+        if context.start_time < available_from:
+            return RuleViolation(rejection_type=self.rejection_type, available_from=available_from)
+        return None
+
+    @override
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str:
+        date_part = f" ({last_meeting_date})" if last_meeting_date else ""
+        months_text = f"{self.months} {pluralize(self.months, 'месяц', 'месяца', 'месяцев')}"
+        return (
+            f"Ваша последняя запись{date_part} была отменена. По правилам проекта, следующая консультация "
+            f"возможна не ранее чем через {months_text} после отмены, поэтому мы не можем записать вас "
+            "на консультацию с психологом-волонтёром."
+        )
+
+
+class SingleActiveBookingRule(BookingRule):
+    rejection_type = "has_active_booking"
+
+    @override
+    def check(self, context: RuleContext) -> RuleViolation | None:
+        nearest_future_booking = context.timeline.get_nearest_after(context.now, exclude_uid=context.booking_uid)
+        if not nearest_future_booking:
+            return None
+        return RuleViolation(
+            rejection_type=self.rejection_type,
+            available_from=nearest_future_booking.end_time,
+            active_booking_start=nearest_future_booking.start_time,
+        )
+
+    @override
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str:
+        return (
+            f"У вас уже есть одна подтверждённая встреча с психологом-волонтером на {active_booking_start_text}, "
+            "поэтому мы не можем записать вас на консультацию. "
+            "По правилам проекта, нельзя записаться на несколько консультаций одновременно."
+        )
+
+
+class MonthlyLimitRule(BookingRule):
+    rejection_type = "month_limit"
+
+    def __init__(self, max_bookings: int) -> None:
+        self.max_bookings = max_bookings
+
+    @override
+    def check(self, context: RuleContext) -> RuleViolation | None:
+        if context.timeline.count_in_month(context.start_time) > self.max_bookings:
+            return RuleViolation(
+                rejection_type=self.rejection_type,
+                available_from=get_next_month_start(context.start_time),
+            )
+        return None
+
+    @override
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str:
+        limit_text = f"{self.max_bookings} {pluralize(self.max_bookings, 'встреча', 'встречи', 'встреч')}"
+        return (
+            f"В этом месяце вы уже использовали доступный лимит — {limit_text}, поэтому мы не можем записать вас "
+            "на консультацию с психологом-волонтёром."
+        )
+
+
+class YearlyLimitRule(BookingRule):
+    rejection_type = "year_limit"
+
+    def __init__(self, max_bookings: int) -> None:
+        self.max_bookings = max_bookings
+
+    @override
+    def check(self, context: RuleContext) -> RuleViolation | None:
+        if context.timeline.count_in_year(context.start_time) > self.max_bookings:
+            return RuleViolation(
+                rejection_type=self.rejection_type,
+                available_from=context.start_time.replace(
+                    year=context.start_time.year + 1,
+                    month=1,
+                    day=1,
+                    hour=0,
+                    minute=0,
+                ),
+            )
+        return None
+
+    @override
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str:
+        limit_text = f"{self.max_bookings} {pluralize(self.max_bookings, 'встреча', 'встречи', 'встреч')}"
+        return (
+            f"В этом году вы уже использовали доступный лимит — {limit_text}, поэтому мы не можем записать вас "
+            "на консультацию с психологом-волонтёром."
+        )
+
+
+class MinIntervalRule(BookingRule):
+    rejection_type = "min_interval"
+
+    def __init__(self, days: int) -> None:
+        self.days = days
+        self.interval = datetime.timedelta(days=days)
+        self.horizon = self.interval
+
+    @override
+    def check(self, context: RuleContext) -> RuleViolation | None:
+        close_bookings = context.timeline.get_close_bookings(
+            context.start_time,
+            min_days=self.days,
+            exclude_uid=context.booking_uid,
+        )
+        if not close_bookings:
+            return None
+        return RuleViolation(
+            rejection_type=self.rejection_type,
+            available_from=max(attendee_booking.start_time for attendee_booking in close_bookings) + self.interval,
+        )
+
+    @override
+    def build_reason(self, *, active_booking_start_text: str | None, last_meeting_date: str | None) -> str:
+        date_part = f" ({last_meeting_date})" if last_meeting_date else ""
+        days_text = f"{self.days} {pluralize(self.days, 'календарного дня', 'календарных дней', 'календарных дней')}"
+        return (
+            f"С момента вашей последней встречи{date_part} прошло менее {days_text}, поэтому мы не "
+            f"можем записать вас на консультацию с психологом-волонтёром."
+        )
+
+
+class BookingRulesPlan:
+    """Rules compiled for one event type.
+
+    Blocking rules run in declaration order and stop at the first violation. Limit rules all run, because a rejected
+    client is offered the latest of their dates; the reported rejection type is the first violated one in declaration
+    order (month, year, interval).
+    """
+
+    def __init__(self, *, blocking_rules: list[BookingRule], limit_rules: list[BookingRule]) -> None:
+        self.blocking_rules = tuple(blocking_rules)
+        self.limit_rules = tuple(limit_rules)
+        self.rules_by_rejection_type = {rule.rejection_type: rule for rule in (*blocking_rules, *limit_rules)}
+        self.horizon = max(
+            (rule.horizon for rule in self.rules_by_rejection_type.values()), default=datetime.timedelta(0)
+        )
+
+    def evaluate(self, context: RuleContext) -> BookingConstraintsValidationResult:
+        for rule in self.blocking_rules:
+            if violation := rule.check(context):
+                return {
+                    "is_allowed": False,
+                    "available_from": violation.available_from,
+                    "rejection_type": violation.rejection_type,
+                    "active_booking_start": violation.active_booking_start,
+                }
+
+        violations = [violation for rule in self.limit_rules if (violation := rule.check(context))]
+        if violations:
+            return {
+                "is_allowed": False,
+                "available_from": max(context.start_time, *(violation.available_from for violation in violations)),
+                "rejection_type": violations[0].rejection_type,
+                "active_booking_start": None,
+            }
+
+        return {
+            "is_allowed": True,
+            "available_from": context.start_time,
+            "rejection_type": None,
+            "active_booking_start": None,
+        }
+
+    def build_rejection_reason(
+        self,
+        *,
+        rejection_type: str | None,
+        active_booking_start_text: str | None,
+        last_meeting_date: str | None,
+    ) -> str:
+        rule = self.rules_by_rejection_type.get(rejection_type)
+        if not rule:
+            return DEFAULT_REJECTION_REASON
+        return rule.build_reason(
+            active_booking_start_text=active_booking_start_text, last_meeting_date=last_meeting_date
+        )
+
+
+def compile_booking_rules(rules: BookingConstraintsRules) -> BookingRulesPlan:
+    blocking_rules: list[BookingRule] = []
+    if rules.months_after_cancellation is not None:
+        blocking_rules.append(CancellationCooldownRule(rules.months_after_cancellation))
+    if rules.is_single_active_booking:
+        blocking_rules.append(SingleActiveBookingRule())
+
+    limit_rules: list[BookingRule] = []
+    if rules.max_bookings_per_month is not None:
+        limit_rules.append(MonthlyLimitRule(rules.max_bookings_per_month))
+    if rules.max_bookings_per_year is not None:
+        limit_rules.append(YearlyLimitRule(rules.max_bookings_per_year))
+    if rules.min_days_between_bookings is not None:
+        limit_rules.append(MinIntervalRule(rules.min_days_between_bookings))
+
+    return BookingRulesPlan(blocking_rules=blocking_rules, limit_rules=limit_rules)
+
+
+class BookingRulesEngine(IBookingRulesEngine):
+    """Booking constraint plans compiled once: a default plan plus per event type overrides."""
+
+    def __init__(
+        self,
+        *,
+        default_rules: BookingConstraintsRules | None = None,
+        rules_by_event_type: dict[int, BookingConstraintsRules] | None = None,
+    ) -> None:
+        default_rules = default_rules or BookingConstraintsRules()
+        self.default_plan = compile_booking_rules(default_rules)
+        self.plans_by_event_type = {
+            event_type_id: compile_booking_rules(
+                default_rules.model_copy(update=event_type_rules.model_dump(exclude_unset=True)),
+            )
+            for event_type_id, event_type_rules in (rules_by_event_type or {}).items()
+        }
+        self.horizon = max(plan.horizon for plan in (self.default_plan, *self.plans_by_event_type.values()))
+
+    def get_plan(self, event_type_id: int | None) -> BookingRulesPlan:
+        return self.plans_by_event_type.get(event_type_id, self.default_plan)
+
+    def evaluate(
+        self,
+        *,
+        event_type_id: int | None,
+        booking_uid: str | None,
+        start_time: datetime.datetime,
+        timeline: BookingTimeline,
+        now: datetime.datetime,
+    ) -> BookingConstraintsValidationResult:
+        return self.get_plan(event_type_id).evaluate(
+            RuleContext(booking_uid=booking_uid, start_time=start_time, timeline=timeline, now=now),
+        )
+
+    def build_rejection_reason(
+        self,
+        *,
+        event_type_id: int | None,
+        rejection_type: str | None,
+        active_booking_start_text: str | None,
+        last_meeting_date: str | None,
+    ) -> str:
+        return self.get_plan(event_type_id).build_rejection_reason(
+            rejection_type=rejection_type,
+            active_booking_start_text=active_booking_start_text,
+            last_meeting_date=last_meeting_date,
+        )
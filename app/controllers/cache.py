@@ -3,14 +3,21 @@ from typing import Any
 from redis.asyncio import Redis
 
 from app.interfaces.cache import ICacheController
+from app.metrics import instrumented
 
 
 class CacheController(ICacheController):
     def __init__(self, client: Redis) -> None:
         self.client = client
 
+    @instrumented("redis")
     async def get(self, key: str) -> Any | None:
         return await self.client.get(key)
 
+    @instrumented("redis")
     async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
         await self.client.set(key, value, ex=ttl_seconds)
+
+    @instrumented("redis")
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
@@ -0,0 +1,349 @@
+import datetime
+import json
+from operator import attrgetter
+from typing import Any
+
+import structlog
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from app.controllers.booking_constraints import get_month_key, get_year_key
+from app.dtos import AttendeeBookingDTO, BookingDTO, ClientBookingsAggregateDTO
+from app.interfaces.booking import IBookingDatabaseAdapter
+from app.interfaces.booking_constraints import IBookingRulesEngine, IClientBookingsAggregator
+from app.utils import normalize_email
+
+
+logger = structlog.get_logger(__name__)
+
+CLIENT_BOOKINGS_KEY_PREFIX = "client_bookings"
+CLIENT_BOOKINGS_TTL_SECONDS = 60 * 60 * 24 * 400
+# Set in the counters hash when an aggregate is built, so a client without bookings is not rebuilt on every event.
+BUILT_FIELD = "_built"
+REBUILD_ATTEMPTS = 3
+
+# Counters are keyed by the "YYYY-MM" and "YYYY" prefixes of the record's UTC start time.
+_COUNT_FUNCTION = """
+local function count(record, delta)
+    if record.bad_connection then
+        return
+    end
+    for _, field in ipairs({string.sub(record.start_time, 1, 7), string.sub(record.start_time, 1, 4)}) do
+        if redis.call('HINCRBY', KEYS[1], field, delta) <= 0 then
+            redis.call('HDEL', KEYS[1], field)
+        end
+    end
+end
+"""
+# KEYS: counters hash, recent starts sorted set, records hash.
+# ARGV: ttl, window start, booking uid, booking record (empty to only remove), start score, built marker field,
+# uids to remove (the booking uid first)...
+_APPLY_SCRIPT = (
+    _COUNT_FUNCTION
+    + """
+if redis.call('HEXISTS', KEYS[1], ARGV[6]) == 0 then
+    return 0
+end
+local bad_connection = false
+for index = 7, #ARGV do
+    local raw = redis.call('HGET', KEYS[3], ARGV[index])
+    if raw then
+        local record = cjson.decode(raw)
+        count(record, -1)
+        if ARGV[index] == ARGV[3] then
+            bad_connection = record.bad_connection
+        end
+        redis.call('HDEL', KEYS[3], ARGV[index])
+        redis.call('ZREM', KEYS[2], ARGV[index])
+    end
+end
+if ARGV[4] ~= '' then
+    local record = cjson.decode(ARGV[4])
+    record.bad_connection = bad_connection
+    count(record, 1)
+    redis.call('HSET', KEYS[3], ARGV[3], cjson.encode(record))
+    redis.call('ZADD', KEYS[2], ARGV[5], ARGV[3])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[2])
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[1])
+end
+return 1
+"""
+)
+# KEYS: counters hash, recent starts sorted set, records hash. ARGV: built marker field, uids to flag...
+_MARK_BAD_CONNECTION_SCRIPT = (
+    _COUNT_FUNCTION
+    + """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+for index = 2, #ARGV do
+    local raw = redis.call('HGET', KEYS[3], ARGV[index])
+    if raw then
+        local record = cjson.decode(raw)
+        if not record.bad_connection then
+            count(record, -1)
+            record.bad_connection = true
+            redis.call('HSET', KEYS[3], ARGV[index], cjson.encode(record))
+        end
+    end
+end
+return 1
+"""
+)
+# KEYS: counters hash, recent starts sorted set, records hash. ARGV: window start.
+_READ_SCRIPT = """
+local records = {}
+for _, uid in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], ARGV[1], '+inf')) do
+    records[#records + 1] = redis.call('HGET', KEYS[3], uid) or ''
+end
+return {redis.call('HGETALL', KEYS[1]), records}
+"""
+
+
+def build_client_bookings_aggregate(
+    email: str,
+    attendee_bookings: list[AttendeeBookingDTO],
+    *,
+    window_start: datetime.datetime | None = None,
+) -> ClientBookingsAggregateDTO:
+    bookings = sorted(attendee_bookings, key=attrgetter("start_time", "booking_uid"))
+    monthly_counts: dict[str, int] = {}
+    yearly_counts: dict[str, int] = {}
+    for attendee_booking in bookings:
+        if attendee_booking.bad_connection:
+            continue
+        month_key = get_month_key(attendee_booking.start_time)
+        year_key = get_year_key(attendee_booking.start_time)
+        monthly_counts[month_key] = monthly_counts.get(month_key, 0) + 1
+        yearly_counts[year_key] = yearly_counts.get(year_key, 0) + 1
+
+    if window_start:
+        bookings = [attendee_booking for attendee_booking in bookings if attendee_booking.start_time >= window_start]
+    return ClientBookingsAggregateDTO(
+        email=email,
+        bookings=bookings,
+        monthly_counts=monthly_counts,
+        yearly_counts=yearly_counts,
+        last_cancelled_booking=max(
+            (attendee_booking for attendee_booking in bookings if attendee_booking.status == "cancelled"),
+            key=attrgetter("start_time"),
+            default=None,
+        ),
+    )
+
+
+class ClientBookingsAggregator(IClientBookingsAggregator):
+    """Per-client booking counters and recent bookings in Redis, updated from booking events.
+
+    Keyed by normalized attendee email. Monthly/yearly counters live in a hash, and the bookings that can still
+    affect a rule (starting after ``now - rules horizon``) in a sorted set by start time, so a read costs the same
+    for a client with ten bookings and one with ten thousand. The record of every booking is kept in a second hash
+    only to undo its counters when it moves or is removed. Each event is applied by one Lua script; a missing
+    aggregate is rebuilt from Postgres, which already contains the change that triggered the event.
+    """
+
+    def __init__(self, db: IBookingDatabaseAdapter, client: Redis, rules_engine: IBookingRulesEngine) -> None:
+        self.db = db
+        self.client = client
+        self.horizon = rules_engine.horizon
+        self._apply_event = client.register_script(_APPLY_SCRIPT)
+        self._read = client.register_script(_READ_SCRIPT)
+        self._mark_bad_connection = client.register_script(_MARK_BAD_CONNECTION_SCRIPT)
+
+    @staticmethod
+    def _build_keys(email: str) -> list[str]:
+        return [f"{CLIENT_BOOKINGS_KEY_PREFIX}:{email}:{part}" for part in ("counts", "starts", "records")]
+
+    def get_window_start(self, now: datetime.datetime) -> datetime.datetime:
+        return now - self.horizon
+
+    @staticmethod
+    def _serialize_booking(attendee_booking: AttendeeBookingDTO) -> str:
+        return json.dumps(
+            {
+                "booking_id": attendee_booking.booking_id,
+                "booking_uid": attendee_booking.booking_uid,
+                "name": attendee_booking.name,
+                "email": attendee_booking.email,
+                "start_time": attendee_booking.start_time.astimezone(datetime.UTC).isoformat(),
+                "end_time": attendee_booking.end_time.astimezone(datetime.UTC).isoformat(),
+                "status": attendee_booking.status,
+                "bad_connection": attendee_booking.bad_connection,
+            },
+        )
+
+    @staticmethod
+    def _deserialize_booking(raw: str | bytes) -> AttendeeBookingDTO:
+        data: dict[str, Any] = json.loads(raw)
+        return AttendeeBookingDTO(
+            **{
+                **data,
+                "start_time": datetime.datetime.fromisoformat(data["start_time"]),
+                "end_time": datetime.datetime.fromisoformat(data["end_time"]),
+            },
+        )
+
+    async def get(self, email: str, *, now: datetime.datetime | None = None) -> ClientBookingsAggregateDTO | None:
+        normalized_email = normalize_email(email)
+        window_start = self.get_window_start(now or datetime.datetime.now(datetime.UTC))
+        counters, records = await self._read(keys=self._build_keys(normalized_email), args=[window_start.timestamp()])
+        counts = {
+            (field.decode() if isinstance(field, bytes) else field): int(value)
+            for field, value in zip(counters[::2], counters[1::2], strict=True)
+        }
+        if counts.pop(BUILT_FIELD, None) is None:
+            return None
+
+        bookings = [self._deserialize_booking(raw) for raw in records if raw]
+        return ClientBookingsAggregateDTO(
+            email=normalized_email,
+            bookings=bookings,
+            monthly_counts={key: value for key, value in counts.items() if len(key) == len("YYYY-MM")},
+            yearly_counts={key: value for key, value in counts.items() if len(key) == len("YYYY")},
+            last_cancelled_booking=max(
+                (attendee_booking for attendee_booking in bookings if attendee_booking.status == "cancelled"),
+                key=attrgetter("start_time"),
+                default=None,
+            ),
+        )
+
+    async def _rebuild_once(self, email: str) -> ClientBookingsAggregateDTO | None:
+        """Write the aggregate built from Postgres; ``None`` when a concurrent event changed it meanwhile."""
+        keys = self._build_keys(email)
+        counts_key, starts_key, records_key = keys
+        async with self.client.pipeline(transaction=True) as pipeline:
+            await pipeline.watch(*keys)
+            attendee_bookings = await self.db.get_attendee_bookings_by_email(email=email)
+            window_start = self.get_window_start(datetime.datetime.now(datetime.UTC))
+            aggregate = build_client_bookings_aggregate(email, attendee_bookings)
+            pipeline.multi()
+            pipeline.delete(*keys)
+            pipeline.hset(counts_key, mapping={BUILT_FIELD: 1, **aggregate.monthly_counts, **aggregate.yearly_counts})
+            if aggregate.bookings:
+                pipeline.hset(
+                    records_key,
+                    mapping={
+                        attendee_booking.booking_uid: self._serialize_booking(attendee_booking)
+                        for attendee_booking in aggregate.bookings
+                    },
+                )
+            if window := {
+                attendee_booking.booking_uid: attendee_booking.start_time.timestamp()
+                for attendee_booking in aggregate.bookings
+                if attendee_booking.start_time >= window_start
+            }:
+                pipeline.zadd(starts_key, window)
+            for key in keys:
+                pipeline.expire(key, CLIENT_BOOKINGS_TTL_SECONDS)
+            try:
+                await pipeline.execute()
+            except WatchError:
+                return None
+        return build_client_bookings_aggregate(email, attendee_bookings, window_start=window_start)
+
+    async def rebuild(self, email: str) -> ClientBookingsAggregateDTO:
+        normalized_email = normalize_email(email)
+        for _ in range(REBUILD_ATTEMPTS):
+            if aggregate := await self._rebuild_once(normalized_email):
+                return aggregate
+        raise RuntimeError(f"client bookings aggregate of {normalized_email} kept changing during rebuild")
+
+    async def get_or_rebuild(self, email: str) -> ClientBookingsAggregateDTO:
+        if aggregate := await self.get(email):
+            return aggregate
+        return await self.rebuild(email)
+
+    async def refresh_bad_connections(
+        self,
+        aggregate: ClientBookingsAggregateDTO,
+        *,
+        now: datetime.datetime | None = None,
+    ) -> ClientBookingsAggregateDTO:
+        """Pick up ``bad_connection`` flags Cal.com set on past meetings after the aggregate stored them.
+
+        Only meetings in the aggregate that already started and still count are looked up, by uid, so the query is
+        bounded by the rules horizon rather than by the client's history. Returns ``aggregate`` itself when nothing
+        changed.
+        """
+        now = now or datetime.datetime.now(datetime.UTC)
+        booking_uids = [
+            attendee_booking.booking_uid
+            for attendee_booking in aggregate.bookings
+            if attendee_booking.start_time < now and not attendee_booking.bad_connection
+        ]
+        if not booking_uids:
+            return aggregate
+        try:
+            flagged_uids = await self.db.get_bad_connection_booking_uids(
+                email=aggregate.email,
+                booking_uids=booking_uids,
+            )
+            if not flagged_uids:
+                return aggregate
+            logger.info("Client bookings marked as bad connection", email=aggregate.email, booking_uids=flagged_uids)
+            await self._mark_bad_connection(keys=self._build_keys(aggregate.email), args=[BUILT_FIELD, *flagged_uids])
+            return await self.get(aggregate.email, now=now) or aggregate
+        except Exception:
+            logger.exception("Error refreshing bad connections of client bookings", email=aggregate.email)
+            return aggregate
+
+    async def _apply(
+        self,
+        booking: BookingDTO,
+        *,
+        upsert: bool = True,
+        removed_uids: set[str] | None = None,
+    ) -> ClientBookingsAggregateDTO | None:
+        email = normalize_email(booking.client.email)
+        now = datetime.datetime.now(datetime.UTC)
+        args = [
+            CLIENT_BOOKINGS_TTL_SECONDS,
+            self.get_window_start(now).timestamp(),
+            booking.uid,
+            self._serialize_booking(self._to_attendee_booking(booking)) if upsert else "",
+            booking.start_time.timestamp(),
+            BUILT_FIELD,
+            booking.uid,
+            *((removed_uids or set()) - {booking.uid}),
+        ]
+        try:
+            for _ in range(REBUILD_ATTEMPTS):
+                if await self._apply_event(keys=self._build_keys(email), args=args):
+                    return await self.get(email, now=now)
+                # Rebuilt from Postgres, which already has this change. When a concurrent event builds the aggregate
+                # first, the (idempotent) script runs again on top of it.
+                if aggregate := await self._rebuild_once(email):
+                    return aggregate
+        except Exception:
+            logger.exception("Error updating client bookings aggregate", booking_uid=booking.uid)
+            return None
+        logger.warning("Client bookings aggregate kept changing during rebuild", booking_uid=booking.uid)
+        return None
+
+    @staticmethod
+    def _to_attendee_booking(booking: BookingDTO) -> AttendeeBookingDTO:
+        # `bad_connection` is not part of the booking event; the script keeps the stored value. Cal.com sets it after
+        # the meeting without an event, so callers refresh it with `refresh_bad_connections` before a rejection.
+        return AttendeeBookingDTO(
+            booking_id=booking.id,
+            booking_uid=booking.uid,
+            name=booking.client.name,
+            email=booking.client.email,
+            start_time=booking.start_time,
+            end_time=booking.end_time,
+            status=booking.status,
+        )
+
+    async def apply_created(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None:
+        return await self._apply(booking)
+
+    async def apply_cancelled(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None:
+        return await self._apply(booking)
+
+    async def apply_rescheduled(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None:
+        return await self._apply(booking, removed_uids={booking.from_reschedule} if booking.from_reschedule else None)
+
+    async def apply_deleted(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None:
+        return await self._apply(booking, upsert=False)
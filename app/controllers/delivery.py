@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Mapping
+
+import structlog
+from opentelemetry.trace import StatusCode
+
+from app.dtos import DeliveryReportDTO, DeliveryResultDTO, DeliveryStatus
+from app.settings import Settings
+from app.tracing import tracer
+
+
+logger = structlog.get_logger(__name__)
+
+# A channel returns ``False`` when it had nothing to deliver (no chat id, no template, ...).
+DeliveryChannel = Callable[[], Awaitable[bool | None]]
+
+
+def get_channel_timeout(settings: Settings, channel: str) -> float:
+    return settings.notification_channel_timeouts.get(channel, settings.notification_timeout_seconds)
+
+
+async def _deliver(channel: str, send: DeliveryChannel, timeout_seconds: float | None) -> DeliveryResultDTO:
+    with tracer.start_as_current_span(f"deliver {channel}") as span:
+        result = await _run_channel(channel, send, timeout_seconds)
+        span.set_attribute("delivery.status", result.status.value)
+        if result.error:
+            span.set_status(StatusCode.ERROR, result.error)
+        return result
+
+
+async def _run_channel(channel: str, send: DeliveryChannel, timeout_seconds: float | None) -> DeliveryResultDTO:
+    started_at = time.perf_counter()
+    try:
+        async with asyncio.timeout(timeout_seconds):
+            is_delivered = await send()
+    except TimeoutError:
+        logger.warning("Delivery channel timed out", channel=channel, timeout_seconds=timeout_seconds)
+        return DeliveryResultDTO(
+            channel=channel,
+            status=DeliveryStatus.TIMED_OUT,
+            duration_seconds=time.perf_counter() - started_at,
+            error=f"timed out after {timeout_seconds}s",
+        )
+    except Exception as e:
+        logger.exception("Delivery channel failed", channel=channel)
+        return DeliveryResultDTO(
+            channel=channel,
+            status=DeliveryStatus.FAILED,
+            duration_seconds=time.perf_counter() - started_at,
+            error=repr(e),
+        )
+    return DeliveryResultDTO(
+        channel=channel,
+        status=DeliveryStatus.SKIPPED if is_delivered is False else DeliveryStatus.SENT,
+        duration_seconds=time.perf_counter() - started_at,
+    )
+
+
+async def fan_out(
+    channels: Mapping[str, DeliveryChannel],
+    *,
+    timeouts: Mapping[str, float | None],
+) -> DeliveryReportDTO:
+    """Run all channels concurrently; one failing or slow channel never affects the others.
+
+    A channel missing from ``timeouts`` (or mapped to ``None``) is not time-limited, which is meant for channels that
+    are fan-outs themselves and bound their own calls.
+    """
+    results = await asyncio.gather(
+        *(_deliver(channel, send, timeouts.get(channel)) for channel, send in channels.items()),
+    )
+    report = DeliveryReportDTO(results=list(results))
+    logger.info(
+        "Delivery report",
+        **{result.channel: result.status.value for result in report.results},
+        duration_seconds=round(max((result.duration_seconds for result in report.results), default=0.0), 3),
+    )
+    return report
@@ -0,0 +1,50 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+import jwt
+
+from app.interfaces.meeting import IMeetTokenVerifier
+from app.settings import Settings
+
+
+VERIFIED_TOKENS_CACHE_SIZE = 1024
+
+
+class MeetTokenVerifier(IMeetTokenVerifier):
+    """Verify Jitsi JWTs and remember verified claims until the token expires.
+
+    The same token is sent with every join/leave event of a meeting, so the verified
+    claims are kept in a small LRU keyed by the token digest. Tokens without ``exp`` are
+    verified on every call, and a cache hit still honours ``nbf``.
+    """
+
+    def __init__(self, settings: Settings, max_size: int = VERIFIED_TOKENS_CACHE_SIZE) -> None:
+        self.settings = settings
+        self.max_size = max_size
+        self._verified: OrderedDict[bytes, tuple[dict[str, Any], float, float | None]] = OrderedDict()
+
+    def verify(self, token: str) -> dict[str, Any]:
+        digest = hashlib.sha256(token.encode()).digest()
+        if cached := self._verified.get(digest):
+            claims, expires_at, not_before = cached
+            now = time.time()
+            if now < expires_at and (not_before is None or now >= not_before):
+                self._verified.move_to_end(digest)
+                return claims
+            # Expired, or not yet valid after a clock step back; `jwt.decode` raises the matching error.
+            del self._verified[digest]
+
+        claims = jwt.decode(
+            token,
+            self.settings.jitsi_jwt_token,
+            algorithms=["HS256"],
+            audience=self.settings.meeting_jwt_aud,
+            issuer=self.settings.meeting_jwt_iss,
+        )
+        if "exp" in claims:
+            self._verified[digest] = (claims, float(claims["exp"]), claims.get("nbf"))
+            if len(self._verified) > self.max_size:
+                self._verified.popitem(last=False)
+        return claims
@@ -1,12 +1,12 @@
 import json
 
-import jwt
 import structlog
 
-from app.dtos import MeetWebhookEventDTO, MeetWebhookEventType, TriggerEvent
-from app.interfaces.booking import IBookingDatabaseAdapter
+from app.dtos import BookingDTO, MeetWebhookEventDTO, MeetWebhookEventType, TriggerEvent
+from app.interfaces.booking import IBookingCache, IBookingDatabaseAdapter
 from app.interfaces.meeting import INotificationStateController
 from app.interfaces.notification import INotificationController
+from app.interfaces.sql import UnitOfWorkFactory
 
 
 logger = structlog.get_logger(__name__)
@@ -19,24 +19,43 @@ class MeetWebhookController:
     def __init__(
         self,
         db: IBookingDatabaseAdapter,
+        booking_cache: IBookingCache,
         notification_controller: INotificationController,
         notification_state_controller: INotificationStateController,
+        unit_of_work: UnitOfWorkFactory,
     ) -> None:
         self.db = db
+        self.booking_cache = booking_cache
         self.notification_controller = notification_controller
         self.notification_state_controller = notification_state_controller
+        self.unit_of_work = unit_of_work
+
+    async def _get_booking(self, room: str) -> BookingDTO | None:
+        if booking := await self.booking_cache.get(room):
+            return booking
+
+        booking = await self.db.get_booking(room)
+        if booking:
+            await self.booking_cache.set(booking)
+        return booking
 
     async def handle_webhook(self, event: MeetWebhookEventDTO) -> None:
-        claims = jwt.decode(event.jwt.encode(), options={"verify_signature": False})
-        role = claims.get("context", {}).get("user", {}).get("role")
-        room = claims["room"]
+        role = event.claims.get("context", {}).get("user", {}).get("role")
+        room = event.claims["room"]
         if event.event == MeetWebhookEventType.VIDEO_CONFERENCE_JOINED and role == "client":
             if await self.notification_state_controller.was_notified(room=room, key=CLIENT_ENTER_NOTIFICATION_KEY):
                 logger.info(f"Notification already sent for room {room}")
                 return None
 
-            booking = await self.db.get_booking(room)
-            if not booking:
+            # The booking and organizer lookups share one session; it is released before the Telegram call.
+            async with self.unit_of_work():
+                booking = await self._get_booking(room)
+                if not booking:
+                    return None
+                # Cached bookings carry no organizer; it is resolved fresh so a changed `users` row is picked up.
+                user = booking.user or await self.db.get_user_by_id(user_id=booking.user_id)
+            if not user:
+                logger.warning("Organizer not found", room=room, user_id=booking.user_id)
                 return None
 
             metadata = json.loads(booking.metadata) if isinstance(booking.metadata, str) else booking.metadata
@@ -44,7 +63,7 @@ class MeetWebhookController:
             await self.notification_controller.notify_organizer_telegram(
                 booking=booking,
                 trigger_event=TriggerEvent.MEET_CLIENT_JOINED,
-                user=booking.user,
+                user=user,
                 meeting_url=metadata.get("videoCallUrl"),
             )
             await self.notification_state_controller.mark_notified(
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+
+import structlog
+from dishka import AsyncContainer
+
+from app.dtos import MeetWebhookEventDTO, MeetWebhookEventType
+from app.interfaces.meeting import IMeetWebhookController, IMeetWebhookRouter
+from app.metrics import MEET_WEBHOOK_EVENTS
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class MeetWebhookRoute:
+    handler: type[IMeetWebhookController]
+    roles: frozenset[str] | None = None
+
+
+class MeetWebhookRouter(IMeetWebhookRouter):
+    """Route Jitsi webhook events to handlers before any request-scoped dependency is resolved.
+
+    Events without a matching route are dropped here, so they never open a DB session.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[MeetWebhookEventType, list[MeetWebhookRoute]] = {}
+
+    def register(
+        self,
+        event_type: MeetWebhookEventType,
+        handler: type[IMeetWebhookController],
+        roles: set[str] | None = None,
+    ) -> None:
+        route = MeetWebhookRoute(handler=handler, roles=frozenset(roles) if roles is not None else None)
+        self.routes.setdefault(event_type, []).append(route)
+
+    @staticmethod
+    def _get_role(event: MeetWebhookEventDTO) -> str | None:
+        return event.claims.get("context", {}).get("user", {}).get("role")
+
+    async def dispatch(self, event: MeetWebhookEventDTO, container: AsyncContainer) -> bool:
+        role = self._get_role(event)
+        routes = [route for route in self.routes.get(event.event, []) if route.roles is None or role in route.roles]
+        if not routes:
+            MEET_WEBHOOK_EVENTS.labels(event.event.value, "skipped").inc()
+            # Most Jitsi events have no handler, so this stays at debug level.
+            logger.debug("Meet webhook event not routed", event=event.event.value, role=role)
+            return False
+
+        MEET_WEBHOOK_EVENTS.labels(event.event.value, "dispatched").inc()
+        for route in routes:
+            handler = await container.get(route.handler)
+            await handler.handle_webhook(event)
+        return True
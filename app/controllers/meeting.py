@@ -1,16 +1,19 @@
+import json
 import time
 from asyncio import sleep
+from dataclasses import replace
 from datetime import datetime
 
 import jwt
 import structlog
 
 from app.dtos import BookingDTO
-from app.interfaces.booking import IBookingDatabaseAdapter
+from app.interfaces.booking import IBookingCache, IBookingDatabaseAdapter
 from app.interfaces.chat import IChatController
 from app.interfaces.meeting import IMeetingController
 from app.interfaces.url_shortener import IUrlShortener
 from app.settings import Settings
+from app.tracing import traced
 
 
 logger = structlog.get_logger(__name__)
@@ -25,14 +28,17 @@ class MeetingController(IMeetingController):
         db: IBookingDatabaseAdapter,
         shortener: IUrlShortener,
         chat_controller: IChatController,
+        booking_cache: IBookingCache,
         settings: Settings,
     ) -> None:
         self.db = db
         self.shortener = shortener
         self.chat_controller = chat_controller
+        self.booking_cache = booking_cache
         self.settings = settings
         self.timeshift = 5 * 60
 
+    @traced
     async def create_meeting_url(
         self,
         *,
@@ -63,11 +69,13 @@ class MeetingController(IMeetingController):
         if is_update_url_in_db:
             await self._ensure_metadata_sync(booking.uid)
             await self.db.update_booking_video_url(booking.uid, meeting_url)
+            await self._warm_booking_cache(booking=booking, meeting_url=meeting_url)
         return meeting_url
 
     async def get_meeting_url(self, booking: BookingDTO, external_id_prefix: str = "") -> str | None:
         return await self.shortener.get_url(external_id=f"{external_id_prefix}{booking.uid}")
 
+    @traced
     async def delete_meeting_url(
         self,
         *,
@@ -76,6 +84,10 @@ class MeetingController(IMeetingController):
     ) -> None:
         await self.shortener.delete_url(external_id=f"{external_id_prefix}{booking.uid}")
 
+    async def _warm_booking_cache(self, *, booking: BookingDTO, meeting_url: str) -> None:
+        metadata = json.loads(booking.metadata) if isinstance(booking.metadata, str) else booking.metadata
+        await self.booking_cache.set(replace(booking, metadata={**(metadata or {}), "videoCallUrl": meeting_url}))
+
     def _get_meeting_not_before(self, *, start_time: datetime) -> float:
         return start_time.timestamp() - self.timeshift
 
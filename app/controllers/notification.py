@@ -1,21 +1,29 @@
 from datetime import datetime
+from functools import partial
 from typing import ClassVar
 
-import pytz
 import structlog
 from aiogram import Bot
-from aiogram.types import LinkPreviewOptions
-from babel.dates import get_timezone_location
 
+from app.controllers.delivery import fan_out, get_channel_timeout
+from app.controllers.outbox import deliver_message
 from app.dtos import (
     BookingDTO,
+    DeliveryReportDTO,
+    OutboxChannel,
+    OutboxMessageDTO,
     TriggerEvent,
     UserDTO,
 )
 from app.interfaces import INotificationController
 from app.interfaces.booking import IBookingDatabaseAdapter
+from app.interfaces.booking_constraints import IBookingRulesEngine
 from app.interfaces.mail import IEmailController
+from app.interfaces.notification import ITelegramNotificationRenderer
+from app.interfaces.outbox import IOutboxRepository
+from app.interfaces.time_zones import ITimeZoneService
 from app.settings import Settings
+from app.tracing import traced
 
 
 logger = structlog.get_logger(__name__)
@@ -45,22 +53,28 @@ class NotificationController(INotificationController):
         bot: Bot,
         settings: Settings,
         email_controller: IEmailController,
+        booking_rules_engine: IBookingRulesEngine,
+        time_zone_service: ITimeZoneService,
+        telegram_renderer: ITelegramNotificationRenderer,
+        outbox: IOutboxRepository,
     ) -> None:
         self.db = db
         self.bot = bot
         self.settings = settings
         self.email_controller = email_controller
+        self.booking_rules_engine = booking_rules_engine
+        self.time_zone_service = time_zone_service
+        self.telegram_renderer = telegram_renderer
+        self.outbox = outbox
         self.timeshift = 10 * 60
 
-    @staticmethod
-    def get_time_zone_city(*, time_zone: str) -> str:
-        return get_timezone_location(time_zone, locale="ru", return_city=True)
+    def get_time_zone_city(self, *, time_zone: str) -> str:
+        return self.time_zone_service.get_city(time_zone)
 
-    @staticmethod
-    def _get_participant_time(participant_tz_str: str, start_time: datetime | None) -> str:
+    def _get_participant_time(self, participant_tz_str: str, start_time: datetime | None) -> str:
         if not start_time:
             return ""
-        return start_time.astimezone(pytz.timezone(participant_tz_str)).strftime(TIME_FORMAT)
+        return self.time_zone_service.format_time(participant_tz_str, start_time, TIME_FORMAT)
 
     @staticmethod
     def _build_previous_meetings_html(meeting_dates: list[str]) -> str:
@@ -79,132 +93,75 @@ class NotificationController(INotificationController):
             "</ul></td></tr></table>"
         )
 
-    @staticmethod
-    def _build_rejection_reason(
-        *,
-        rejection_type: str | None,
-        active_booking_start_text: str | None,
-        last_meeting_date: str | None,
-    ) -> str:
-        if rejection_type == "has_active_booking":
-            return (
-                f"У вас уже есть одна подтверждённая встреча с психологом-волонтером на {active_booking_start_text}, "
-                "поэтому мы не можем записать вас на консультацию. "
-                "По правилам проекта, нельзя записаться на несколько консультаций одновременно."
-            )
-        if rejection_type == "month_limit":
-            return (
-                "В этом месяце вы уже использовали доступный лимит — 2 встречи, поэтому мы не можем записать вас "
-                "на консультацию с психологом-волонтёром."
-            )
-        if rejection_type == "year_limit":
-            return (
-                "В этом году вы уже использовали доступный лимит — 10 встреч, поэтому мы не можем записать вас "
-                "на консультацию с психологом-волонтёром."
-            )
-        if rejection_type == "min_interval":
-            date_part = f" ({last_meeting_date})" if last_meeting_date else ""
-            return (
-                f"С момента вашей последней встречи{date_part} прошло менее 7 календарных дней, поэтому мы не "
-                f"можем записать вас на консультацию с психологом-волонтёром."
-            )
-        if rejection_type == "cancelled_booking":
-            date_part = f" ({last_meeting_date})" if last_meeting_date else ""
-            return (
-                f"Ваша последняя запись{date_part} была отменена. По правилам проекта, следующая консультация "
-                "возможна не ранее чем через 2 месяца после отмены, поэтому мы не можем записать вас "
-                "на консультацию с психологом-волонтёром."
-            )
-        return "К сожалению, сейчас мы не можем подтвердить вашу запись."
-
     def _calculate_duration(self, start_time: datetime, end_time: datetime) -> str:
         duration_seconds = (end_time - start_time).total_seconds()
         duration_minutes = int((duration_seconds - self.timeshift) / 60)
         return f"{duration_minutes} минут"
 
-    def _get_telegram_notification_text(
+    async def notify_organizer_telegram(
         self,
-        *,
+        user: UserDTO,
         booking: BookingDTO,
-        time_zone: str,
-        meeting_url: str | None,
         trigger_event: TriggerEvent,
-    ) -> str | None:
-        start_time = booking.start_time
-        booking_uid = booking.uid
-        previous_start_time = booking.previous_booking.start_time if booking.previous_booking else None
-        organizer_time = self._get_participant_time(participant_tz_str=time_zone, start_time=start_time)
-
-        messages = {}
-
-        if trigger_event == TriggerEvent.BOOKING_CREATED:
-            messages[TriggerEvent.BOOKING_CREATED] = f"""✅ <b>Новая запись</b>
-
-📅 <b>Время начала:</b> {organizer_time}
-🌍 <b>Часовой пояс:</b> {self.get_time_zone_city(time_zone=time_zone)}
-
-🔗 <a href="{meeting_url}">Ссылка на встречу</a>
-👤 <a href="{self.settings.booking_host_url}/booking/{booking_uid}">Информация o клиенте</a>"""
-
-        if trigger_event == TriggerEvent.BOOKING_RESCHEDULED:
-            previous_time = self._get_participant_time(participant_tz_str=time_zone, start_time=previous_start_time)
-            messages[TriggerEvent.BOOKING_RESCHEDULED] = f"""↻ <b>Встреча перенесена</b>
-
-📅 <b>Предыдущее время начала:</b> {previous_time}
-📅 <b>Новое время начала:</b> {organizer_time}
-🌍 <b>Часовой пояс:</b> {self.get_time_zone_city(time_zone=time_zone)}
-
-🔗 <a href="{meeting_url}">Ссылка на встречу</a>
-👤 <a href="{self.settings.booking_host_url}/booking/{booking_uid}">Информация o клиенте</a>"""
-
-        if trigger_event == TriggerEvent.BOOKING_CANCELLED:
-            messages[TriggerEvent.BOOKING_CANCELLED] = f"""❌ <b>Встреча отменена</b>
-
-📅 <b>Время начала:</b> {organizer_time}
-🌍 <b>Часовой пояс:</b> {self.get_time_zone_city(time_zone=time_zone)}
-👤 <a href="{self.settings.booking_host_url}/booking/{booking_uid}">Информация o клиенте</a>"""
-
-        if trigger_event == TriggerEvent.MEET_CLIENT_JOINED:
-            messages[TriggerEvent.MEET_CLIENT_JOINED] = f"""🏃<b>Клиент зашел на встречу</b>
-
-📅 <b>Время начала:</b> {organizer_time}
-🔗 <a href="{meeting_url}">Ссылка на встречу</a>
-👤 <a href="{self.settings.booking_host_url}/booking/{booking_uid}">Информация o клиенте</a>
-
-⚠️ Если после этого сообщения вы не видите клиента, обновите страницу встречи в браузере и подключитесь снова ⚠️
-"""
-
-        return messages.get(trigger_event)
+        meeting_url: str | None = None,
+    ) -> None:
+        try:
+            await self._send_organizer_telegram(user, booking, trigger_event, meeting_url)
+        except Exception:
+            logger.exception("Error sending telegram notification", email=user.email, trigger_event=trigger_event)
 
-    async def notify_organizer_telegram(
+    async def _send_organizer_telegram(
         self,
         user: UserDTO,
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None:
+    ) -> bool:
         organizer_chat_id = await self.db.get_organizer_chat_id(user.email)
         if not organizer_chat_id:
             logger.warning("Organizer chat ID not found", email=user.email)
-            return
+            return False
 
-        notification_text = self._get_telegram_notification_text(
+        notification_text = self.telegram_renderer.render(
             booking=booking,
             time_zone=user.time_zone,
             meeting_url=meeting_url,
             trigger_event=trigger_event,
         )
+        if not notification_text:
+            return False
+
+        logger.info("Sending telegram notification to organizer", email=user.email, trigger_event=trigger_event)
+        await self._dispatch(
+            OutboxMessageDTO(
+                idempotency_key=self._build_idempotency_key(
+                    booking=booking,
+                    trigger_event=trigger_event,
+                    channel=OutboxChannel.TELEGRAM,
+                    recipient=str(organizer_chat_id),
+                ),
+                channel=OutboxChannel.TELEGRAM,
+                payload={"chat_id": organizer_chat_id, "text": notification_text},
+            ),
+        )
+        return True
+
+    @staticmethod
+    def _build_idempotency_key(
+        *,
+        booking: BookingDTO,
+        trigger_event: TriggerEvent,
+        channel: OutboxChannel,
+        recipient: str,
+    ) -> str:
+        return f"{booking.uid}:{trigger_event}:{channel}:{recipient}:{int(booking.start_time.timestamp())}"
 
-        if notification_text:
-            logger.info("Sending telegram notification to organizer", email=user.email, trigger_event=trigger_event)
-            try:
-                await self.bot.send_message(
-                    chat_id=organizer_chat_id,
-                    text=notification_text,
-                    link_preview_options=LinkPreviewOptions(is_disabled=True),
-                )
-            except Exception:
-                logger.exception("Error sending telegram notification", email=user.email, trigger_event=trigger_event)
+    async def _dispatch(self, message: OutboxMessageDTO) -> None:
+        """Send now, or leave it to the outbox relay when the outbox is enabled."""
+        if self.settings.is_enable_notification_outbox:
+            await self.outbox.enqueue([message])
+            return
+        await deliver_message(message, bot=self.bot, email_controller=self.email_controller)
 
     def _prepare_email_context(
         self,
@@ -239,21 +196,31 @@ class NotificationController(INotificationController):
     async def _send_email_notification(
         self,
         *,
+        booking: BookingDTO,
         recipient_email: str,
         role: str,
         trigger_event: TriggerEvent,
         context: dict,
-    ) -> None:
+    ) -> bool:
         template_id = self.EMAIL_TEMPLATES.get(role, {}).get(trigger_event)
         if not template_id:
             logger.warning("No email template for trigger event", trigger_event=trigger_event, role=role)
-            return
-
-        try:
-            logger.info(f"Sending email to {role}", email=recipient_email, trigger_event=trigger_event)
-            await self.email_controller.send_email(to_email=recipient_email, context=context, template_id=template_id)
-        except Exception:
-            logger.exception(f"Error sending email to {role}")
+            return False
+
+        logger.info(f"Sending email to {role}", email=recipient_email, trigger_event=trigger_event)
+        await self._dispatch(
+            OutboxMessageDTO(
+                idempotency_key=self._build_idempotency_key(
+                    booking=booking,
+                    trigger_event=trigger_event,
+                    channel=OutboxChannel.EMAIL,
+                    recipient=recipient_email,
+                ),
+                channel=OutboxChannel.EMAIL,
+                payload={"to_email": recipient_email, "context": context, "template_id": template_id},
+            ),
+        )
+        return True
 
     async def notify_organizer_email(
         self,
@@ -261,7 +228,7 @@ class NotificationController(INotificationController):
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None:
+    ) -> bool:
         context = self._prepare_email_context(
             booking=booking,
             trigger_event=trigger_event,
@@ -273,22 +240,32 @@ class NotificationController(INotificationController):
             },
         )
 
-        await self._send_email_notification(
+        return await self._send_email_notification(
+            booking=booking,
             recipient_email=organizer.email,
             role="organizer",
             trigger_event=trigger_event,
             context=context,
         )
 
+    @traced
     async def notify_organizer(
         self,
         user: UserDTO,
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None:
-        await self.notify_organizer_telegram(user, booking, trigger_event, meeting_url)
-        await self.notify_organizer_email(user, booking, trigger_event, meeting_url)
+    ) -> DeliveryReportDTO:
+        return await fan_out(
+            {
+                "telegram": partial(self._send_organizer_telegram, user, booking, trigger_event, meeting_url),
+                "organizer_email": partial(self.notify_organizer_email, user, booking, trigger_event, meeting_url),
+            },
+            timeouts={
+                "telegram": get_channel_timeout(self.settings, "telegram"),
+                "organizer_email": get_channel_timeout(self.settings, "email"),
+            },
+        )
 
     async def notify_client_email(
         self,
@@ -296,7 +273,7 @@ class NotificationController(INotificationController):
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None:
+    ) -> bool:
         context = self._prepare_email_context(
             booking=booking,
             participant_time_zone=booking.client.time_zone,
@@ -308,25 +285,80 @@ class NotificationController(INotificationController):
             },
         )
 
-        await self._send_email_notification(
+        return await self._send_email_notification(
+            booking=booking,
             recipient_email=booking.client.email,
             role="client",
             trigger_event=trigger_event,
             context=context,
         )
 
+    @traced
     async def notify_client(
         self,
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None:
-        await self.notify_client_email(
-            booking=booking,
-            trigger_event=trigger_event,
-            meeting_url=meeting_url,
+    ) -> DeliveryReportDTO:
+        return await fan_out(
+            {
+                "client_email": partial(
+                    self.notify_client_email,
+                    booking=booking,
+                    trigger_event=trigger_event,
+                    meeting_url=meeting_url,
+                ),
+            },
+            timeouts={"client_email": get_channel_timeout(self.settings, "email")},
         )
 
+    def build_client_booking_rejected_message(
+        self,
+        *,
+        booking: BookingDTO,
+        available_from: datetime,
+        previous_meeting_dates: list[datetime],
+        rejection_type: str | None,
+        active_booking_start: datetime | None,
+    ) -> OutboxMessageDTO:
+        available_from_text = self._get_participant_time(booking.client.time_zone, available_from)
+        previous_meeting_dates_text = [
+            self.time_zone_service.format_time(booking.client.time_zone, start_time, "%d.%m.%Y")
+            for start_time in previous_meeting_dates
+        ]
+        rejection_reason = self.booking_rules_engine.build_rejection_reason(
+            event_type_id=booking.event_type_id,
+            rejection_type=rejection_type,
+            active_booking_start_text=(
+                self._get_participant_time(booking.client.time_zone, active_booking_start)
+                if active_booking_start
+                else None
+            ),
+            last_meeting_date=previous_meeting_dates_text[0] if previous_meeting_dates_text else None,
+        )
+        previous_meetings_html = self._build_previous_meetings_html(previous_meeting_dates_text)
+        context = {
+            "ClientName": booking.client.name,
+            "RejectionReason": rejection_reason,
+            "AvailableFrom": available_from_text,
+            "PreviousMeetings": previous_meetings_html,
+        }
+        return OutboxMessageDTO(
+            idempotency_key=self._build_idempotency_key(
+                booking=booking,
+                trigger_event=TriggerEvent.BOOKING_REJECTED,
+                channel=OutboxChannel.EMAIL,
+                recipient=booking.client.email,
+            ),
+            channel=OutboxChannel.EMAIL,
+            payload={
+                "to_email": booking.client.email,
+                "context": context,
+                "template_id": self.EMAIL_TEMPLATES.get("client", {}).get(TriggerEvent.BOOKING_REJECTED),
+            },
+        )
+
+    @traced
     async def notify_client_booking_rejected(
         self,
         *,
@@ -337,33 +369,14 @@ class NotificationController(INotificationController):
         active_booking_start: datetime | None,
     ) -> None:
         try:
-            available_from_text = self._get_participant_time(booking.client.time_zone, available_from)
-            previous_meeting_dates_text = [
-                start_time.astimezone(pytz.timezone(booking.client.time_zone)).strftime("%d.%m.%Y")
-                for start_time in previous_meeting_dates
-            ]
-            rejection_reason = self._build_rejection_reason(
+            message = self.build_client_booking_rejected_message(
+                booking=booking,
+                available_from=available_from,
+                previous_meeting_dates=previous_meeting_dates,
                 rejection_type=rejection_type,
-                active_booking_start_text=(
-                    self._get_participant_time(booking.client.time_zone, active_booking_start)
-                    if active_booking_start
-                    else None
-                ),
-                last_meeting_date=previous_meeting_dates_text[0] if previous_meeting_dates_text else None,
-            )
-            previous_meetings_html = self._build_previous_meetings_html(previous_meeting_dates_text)
-            context = {
-                "ClientName": booking.client.name,
-                "RejectionReason": rejection_reason,
-                "AvailableFrom": available_from_text,
-                "PreviousMeetings": previous_meetings_html,
-            }
-            template_id = self.EMAIL_TEMPLATES.get("client", {}).get(TriggerEvent.BOOKING_REJECTED)
-            await self.email_controller.send_email(
-                to_email=booking.client.email,
-                context=context,
-                template_id=template_id,
+                active_booking_start=active_booking_start,
             )
+            await self._dispatch(message)
         except Exception:
             logger.exception(
                 "Error sending rejected booking notification to client",
@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+
+import structlog
+from aiogram import Bot
+from aiogram.types import LinkPreviewOptions
+
+from app.controllers.delivery import get_channel_timeout
+from app.dtos import OutboxChannel, OutboxFailureDTO, OutboxMessageDTO
+from app.interfaces.mail import IEmailController
+from app.interfaces.outbox import IOutboxRelay, IOutboxRepository
+from app.metrics import OUTBOX_DEAD, OUTBOX_LAG, OUTBOX_PENDING
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+async def deliver_message(message: OutboxMessageDTO, *, bot: Bot, email_controller: IEmailController) -> None:
+    """Make the provider call for a rendered message; shared by inline sends and the outbox relay."""
+    match message.channel:
+        case OutboxChannel.TELEGRAM:
+            await bot.send_message(
+                chat_id=message.payload["chat_id"],
+                text=message.payload["text"],
+                link_preview_options=LinkPreviewOptions(is_disabled=True),
+            )
+        case OutboxChannel.EMAIL:
+            await email_controller.send_email(
+                to_email=message.payload["to_email"],
+                context=message.payload["context"],
+                template_id=message.payload["template_id"],
+            )
+
+
+def get_retry_delay(settings: Settings, attempts: int) -> float | None:
+    """Exponential backoff after ``attempts`` failed deliveries; ``None`` once the message should be given up."""
+    if attempts >= settings.outbox_max_attempts:
+        return None
+    return min(settings.outbox_retry_base_seconds * 2 ** (attempts - 1), settings.outbox_retry_max_seconds)
+
+
+class OutboxRelay(IOutboxRelay):
+    def __init__(
+        self,
+        settings: Settings,
+        outbox: IOutboxRepository,
+        bot: Bot,
+        email_controller: IEmailController,
+    ) -> None:
+        self.settings = settings
+        self.outbox = outbox
+        self.bot = bot
+        self.email_controller = email_controller
+
+    async def relay_once(self) -> int:
+        """Claim one batch, deliver it concurrently and record the outcome; returns the number of claimed messages."""
+        messages = await self.outbox.claim_batch(
+            limit=self.settings.outbox_batch_size,
+            lease_seconds=self.settings.outbox_lease_seconds,
+        )
+        if not messages:
+            return 0
+
+        errors = await asyncio.gather(*(self._deliver(message) for message in messages))
+        sent_ids = [message.id for message, error in zip(messages, errors, strict=True) if error is None]
+        failures = [
+            OutboxFailureDTO(
+                message_id=message.id,
+                error=error,
+                retry_in_seconds=get_retry_delay(self.settings, message.attempts),
+            )
+            for message, error in zip(messages, errors, strict=True)
+            if error is not None
+        ]
+        if sent_ids:
+            await self.outbox.mark_sent(sent_ids)
+        if failures:
+            await self.outbox.mark_failed(failures)
+            for failure in failures:
+                if failure.retry_in_seconds is None:
+                    logger.error("Outbox message dead-lettered", message_id=failure.message_id, error=failure.error)
+
+        now = datetime.datetime.now(datetime.UTC)
+        logger.info(
+            "Outbox batch relayed",
+            sent=len(sent_ids),
+            failed=len(failures),
+            lag_seconds=round(max((now - message.created_at).total_seconds() for message in messages), 3),
+        )
+        return len(messages)
+
+    async def report_stats(self) -> None:
+        stats = await self.outbox.get_stats()
+        OUTBOX_PENDING.set(stats.pending)
+        OUTBOX_DEAD.set(stats.dead)
+        OUTBOX_LAG.set(stats.lag_seconds)
+        logger.info("Outbox stats", pending=stats.pending, dead=stats.dead, lag_seconds=round(stats.lag_seconds, 3))
+        await self.outbox.prune_sent(older_than_days=self.settings.outbox_retention_days)
+
+    async def _deliver(self, message: OutboxMessageDTO) -> str | None:
+        try:
+            async with asyncio.timeout(get_channel_timeout(self.settings, message.channel.value)):
+                await deliver_message(message, bot=self.bot, email_controller=self.email_controller)
+        # Any provider error (HTTP, Bot API, timeout) is recorded on the message and retried with backoff.
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                "Outbox delivery failed",
+                message_id=message.id,
+                idempotency_key=message.idempotency_key,
+                attempts=message.attempts,
+                exc_info=True,
+            )
+            return repr(e)
+        return None
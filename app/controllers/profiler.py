@@ -0,0 +1,107 @@
+import asyncio
+import signal
+import sys
+import tracemalloc
+from collections import Counter
+from types import CodeType, FrameType
+
+import structlog
+
+from app.dtos import MemoryGrowthDTO
+from app.interfaces.profiler import IProfiler
+
+
+logger = structlog.get_logger(__name__)
+
+TRACEMALLOC_FRAMES = 1
+
+
+class StackSampler:
+    """``SIGPROF`` handler folding the interrupted stack of the main (event loop) thread into collapsed stacks.
+
+    The timer counts CPU time, so an idle loop is not sampled, and the handler runs in the loop thread itself: a
+    sampling thread would only get the GIL when the loop releases it, i.e. almost always inside ``select``.
+    """
+
+    def __init__(self) -> None:
+        self.stacks: Counter[str] = Counter()
+        self.labels: dict[CodeType, str] = {}
+        # Longest first, so a site-packages path is shortened to the package rather than to the stdlib prefix.
+        self.path_prefixes = sorted({path.rstrip("/") + "/" for path in sys.path if path}, key=len, reverse=True)
+
+    def handle_signal(self, _signum: int, frame: FrameType | None) -> None:
+        labels = []
+        while frame is not None:
+            labels.append(self._get_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(labels))] += 1
+
+    def _get_label(self, code: CodeType) -> str:
+        if (label := self.labels.get(code)) is None:
+            filename = code.co_filename
+            for prefix in self.path_prefixes:
+                if filename.startswith(prefix):
+                    filename = filename.removeprefix(prefix)
+                    break
+            label = self.labels[code] = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+        return label
+
+
+class Profiler(IProfiler):
+    """Bounded on-demand profiling of the running worker; one profile of each kind at a time.
+
+    The overhead is one stack walk per CPU sample, and tracemalloc's allocation hooks only while a memory window is
+    open (tracemalloc is stopped again unless it was already running).
+    """
+
+    def __init__(self) -> None:
+        self.cpu_lock = asyncio.Lock()
+        self.memory_lock = asyncio.Lock()
+
+    async def profile_cpu(self, *, seconds: float, interval_seconds: float) -> str | None:
+        """Collapsed stacks (``outer;...;inner count`` lines), the input format of flamegraph tools."""
+        if self.cpu_lock.locked():
+            return None
+        async with self.cpu_lock:
+            logger.info("CPU profile started", seconds=seconds, interval_seconds=interval_seconds)
+            sampler = StackSampler()
+            previous_handler = signal.signal(signal.SIGPROF, sampler.handle_signal)
+            signal.setitimer(signal.ITIMER_PROF, interval_seconds, interval_seconds)
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+                signal.signal(signal.SIGPROF, previous_handler)
+        return "".join(f"{stack} {count}\n" for stack, count in sampler.stacks.most_common())
+
+    async def profile_memory(self, *, seconds: float, limit: int) -> list[MemoryGrowthDTO] | None:
+        """Allocations that grew the most by source line while the window was open."""
+        if self.memory_lock.locked():
+            return None
+        async with self.memory_lock:
+            logger.info("Memory profile started", seconds=seconds)
+            is_started_here = not tracemalloc.is_tracing()
+            if is_started_here:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            try:
+                before = await asyncio.to_thread(tracemalloc.take_snapshot)
+                await asyncio.sleep(seconds)
+                after = await asyncio.to_thread(tracemalloc.take_snapshot)
+            finally:
+                if is_started_here:
+                    tracemalloc.stop()
+            ignored = (tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),)
+            stats = await asyncio.to_thread(
+                after.filter_traces(ignored).compare_to,
+                before.filter_traces(ignored),
+                "lineno",
+            )
+        return [
+            MemoryGrowthDTO(
+                location=str(stat.traceback[0]),
+                size_diff_bytes=stat.size_diff,
+                count_diff=stat.count_diff,
+                size_bytes=stat.size,
+            )
+            for stat in stats[:limit]
+        ]
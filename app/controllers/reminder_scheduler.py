@@ -0,0 +1,121 @@
+import datetime
+import os
+import socket
+import uuid
+
+import structlog
+from redis.asyncio import Redis
+
+from app.dtos import BookingDTO, DueReminderDTO
+from app.interfaces.reminders import IReminderScheduler
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+REMINDERS_KEY = "booking_reminders"
+REMINDER_LEADER_KEY = "booking_reminders:leader"
+# Same slack as the former 23-24h polling window: a booking made up to an hour after its reminder moment still
+# gets one, right away.
+REMINDER_GRACE_SECONDS = 60 * 60
+
+# Range and lease run as one script, so two schedulers can never claim the same reminder. A claimed reminder stays
+# in the set with its score moved to the end of the lease: it is removed once handled, or due again if it is not.
+_CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for index = 1, #due, 2 do
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[3], due[index])
+end
+return due
+"""
+# ARGV: pairs of booking uid and lease end. A reminder rescheduled while it was being sent has another score and stays.
+_ACK_SCRIPT = """
+local removed = 0
+for index = 1, #ARGV, 2 do
+    if tonumber(redis.call('ZSCORE', KEYS[1], ARGV[index])) == tonumber(ARGV[index + 1]) then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[index])
+    end
+end
+return removed
+"""
+_RENEW_LEADERSHIP_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEADERSHIP_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ReminderScheduler(IReminderScheduler):
+    """Client reminders kept in a Redis sorted set of booking uids scored by their fire time.
+
+    Booking events add and remove entries; one leader (a Redis lock renewed on every poll) claims due entries, so the
+    cost of a poll depends on the number of due reminders rather than on the size of the booking table. A claim
+    only leases the entries; they are removed by ``ack`` once handled, so a reminder that failed, or whose leader
+    died mid-batch, is claimed again when the lease runs out.
+    """
+
+    def __init__(self, client: Redis, settings: Settings) -> None:
+        self.client = client
+        self.offset = datetime.timedelta(hours=settings.booking_reminder_offset_hours)
+        self.leader_ttl_ms = int(settings.reminder_leader_ttl_seconds * 1000)
+        self.lease = datetime.timedelta(seconds=settings.reminder_lease_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._claim_due = client.register_script(_CLAIM_DUE_SCRIPT)
+        self._ack = client.register_script(_ACK_SCRIPT)
+        self._renew_leadership = client.register_script(_RENEW_LEADERSHIP_SCRIPT)
+        self._release_leadership = client.register_script(_RELEASE_LEADERSHIP_SCRIPT)
+
+    async def schedule(self, booking: BookingDTO, *, now: datetime.datetime | None = None) -> bool:
+        now = now or datetime.datetime.now(datetime.UTC)
+        fire_at = booking.start_time - self.offset
+        if booking.status != "accepted" or (now - fire_at).total_seconds() > REMINDER_GRACE_SECONDS:
+            await self.unschedule(booking.uid)
+            return False
+        await self.client.zadd(REMINDERS_KEY, {booking.uid: max(fire_at, now).timestamp()})
+        return True
+
+    async def unschedule(self, booking_uid: str) -> None:
+        await self.client.zrem(REMINDERS_KEY, booking_uid)
+
+    async def claim_due(self, *, now: datetime.datetime | None = None, limit: int = 100) -> list[DueReminderDTO]:
+        now = now or datetime.datetime.now(datetime.UTC)
+        claimed_until = now + self.lease
+        due = await self._claim_due(keys=[REMINDERS_KEY], args=[now.timestamp(), limit, claimed_until.timestamp()])
+        return [
+            DueReminderDTO(
+                booking_uid=member.decode() if isinstance(member, bytes) else member,
+                fire_at=datetime.datetime.fromtimestamp(float(score), tz=datetime.UTC),
+                claimed_until=claimed_until,
+            )
+            for member, score in zip(due[::2], due[1::2], strict=True)
+        ]
+
+    async def ack(self, due_reminders: list[DueReminderDTO]) -> None:
+        if not due_reminders:
+            return
+        await self._ack(
+            keys=[REMINDERS_KEY],
+            args=[
+                value
+                for due_reminder in due_reminders
+                for value in (due_reminder.booking_uid, due_reminder.claimed_until.timestamp())
+            ],
+        )
+
+    async def acquire_leadership(self) -> bool:
+        if await self._renew_leadership(keys=[REMINDER_LEADER_KEY], args=[self.owner, self.leader_ttl_ms]):
+            return True
+        is_acquired = bool(await self.client.set(REMINDER_LEADER_KEY, self.owner, nx=True, px=self.leader_ttl_ms))
+        if is_acquired:
+            logger.info("Reminder scheduler leadership acquired", owner=self.owner)
+        return is_acquired
+
+    async def release_leadership(self) -> None:
+        await self._release_leadership(keys=[REMINDER_LEADER_KEY], args=[self.owner])
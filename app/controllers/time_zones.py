@@ -0,0 +1,50 @@
+import datetime
+from collections.abc import Iterable
+from functools import lru_cache
+
+import pytz
+import structlog
+from babel.dates import get_timezone_location
+
+from app.interfaces.time_zones import ITimeZoneService
+
+
+logger = structlog.get_logger(__name__)
+
+TIME_ZONE_CACHE_SIZE = 1024
+TIME_ZONE_LOCALE = "ru"
+
+
+@lru_cache(maxsize=TIME_ZONE_CACHE_SIZE)
+def get_zone(time_zone: str) -> datetime.tzinfo:
+    return pytz.timezone(time_zone)
+
+
+@lru_cache(maxsize=TIME_ZONE_CACHE_SIZE)
+def get_city(time_zone: str) -> str:
+    return get_timezone_location(time_zone, locale=TIME_ZONE_LOCALE, return_city=True)
+
+
+class TimeZoneService(ITimeZoneService):
+    """Zone objects and localized city names, memoized per zone name for the whole process."""
+
+    def get_zone(self, time_zone: str) -> datetime.tzinfo:
+        return get_zone(time_zone)
+
+    def get_city(self, time_zone: str) -> str:
+        return get_city(time_zone)
+
+    def format_time(self, time_zone: str, moment: datetime.datetime, time_format: str) -> str:
+        return moment.astimezone(get_zone(time_zone)).strftime(time_format)
+
+    def warm_up(self, time_zones: Iterable[str]) -> int:
+        warmed = 0
+        for time_zone in time_zones:
+            try:
+                get_zone(time_zone)
+                get_city(time_zone)
+            except LookupError:
+                logger.warning("Unknown time zone skipped during warm up", time_zone=time_zone)
+                continue
+            warmed += 1
+        return warmed
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, StrEnum
 from typing import TYPE_CHECKING, TypedDict
 
@@ -167,6 +167,7 @@ class MeetWebhookEventType(str, Enum):
 class MeetWebhookEventDTO:
     event: MeetWebhookEventType
     jwt: str
+    claims: dict = field(default_factory=dict)
 
 
 @dataclass(slots=True, frozen=True)
@@ -179,3 +180,99 @@ class AttendeeBookingDTO:
     end_time: datetime
     status: str
     bad_connection: bool = False
+
+
+@dataclass(slots=True)
+class ClientBookingsAggregateDTO:
+    email: str
+    # Only bookings starting after the rules horizon; the counters cover the whole history.
+    bookings: list[AttendeeBookingDTO] = field(default_factory=list)
+    monthly_counts: dict[str, int] = field(default_factory=dict)
+    yearly_counts: dict[str, int] = field(default_factory=dict)
+    last_cancelled_booking: AttendeeBookingDTO | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class BookingConstraintsViolationDTO:
+    email: str
+    booking_id: int
+    booking_uid: str
+    start_time: datetime
+    status: str
+    rejection_type: str | None
+    available_from: datetime
+
+
+class DeliveryStatus(StrEnum):
+    SENT = "sent"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+
+
+@dataclass(slots=True, frozen=True)
+class DeliveryResultDTO:
+    channel: str
+    status: DeliveryStatus
+    duration_seconds: float
+    error: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class DeliveryReportDTO:
+    results: list[DeliveryResultDTO] = field(default_factory=list)
+
+    @property
+    def failed_channels(self) -> list[str]:
+        return [
+            result.channel
+            for result in self.results
+            if result.status in {DeliveryStatus.FAILED, DeliveryStatus.TIMED_OUT}
+        ]
+
+
+class OutboxChannel(StrEnum):
+    EMAIL = "email"
+    TELEGRAM = "telegram"
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxMessageDTO:
+    """A fully rendered notification; ``payload`` holds the provider call arguments."""
+
+    idempotency_key: str
+    channel: OutboxChannel
+    payload: dict
+    id: int | None = None
+    attempts: int = 0
+    created_at: datetime | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxFailureDTO:
+    message_id: int
+    error: str
+    retry_in_seconds: float | None
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxStatsDTO:
+    pending: int
+    dead: int
+    lag_seconds: float
+
+
+@dataclass(slots=True, frozen=True)
+class DueReminderDTO:
+    booking_uid: str
+    fire_at: datetime
+    # End of the claim lease; the reminder is due again after it unless acknowledged.
+    claimed_until: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class MemoryGrowthDTO:
+    location: str
+    size_diff_bytes: int
+    count_diff: int
+    size_bytes: int
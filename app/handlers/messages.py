@@ -5,8 +5,10 @@ from datetime import UTC, datetime
 
 import jwt
 import structlog
-from aiogram import F, types
-from aiogram.filters import Command, CommandObject, CommandStart
+from aiogram import types
+from aiogram.filters import Command, CommandObject, CommandStart, Filter, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message
 from aiogram.utils.markdown import hbold
 from aiogram.utils.payload import decode_payload
@@ -31,7 +33,20 @@ MEETING_TEST_FIELDS: list[tuple[str, str]] = [
     ("start_time", "Введите start_time в формате YYYY-MM-DD HH:MM (UTC)"),
     ("duration_minutes", "Введите продолжительность встречи в минутах"),
 ]
-MEETING_TEST_STATE: dict[int, dict] = {}
+
+
+class MeetingTestStates(StatesGroup):
+    in_progress = State()
+
+
+class TextEquals(Filter):
+    """Async counterpart of ``F.text == text``: aiogram runs sync filters (magic filters, bare states) in a thread."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    async def __call__(self, message: Message) -> bool:
+        return message.text == self.text
 
 
 async def _send_meeting_test_links(
@@ -142,7 +157,7 @@ async def cmd_start(
     return None
 
 
-@telegram_router.message(F.text == "ping")
+@telegram_router.message(TextEquals("ping"))
 async def hello(message: types.Message) -> None:
     try:
         await message.answer("pong")
@@ -156,6 +171,7 @@ async def hello(message: types.Message) -> None:
 async def meeting_test(
     message: types.Message,
     command: CommandObject,
+    state: FSMContext,
     sql: FromDishka[ISqlExecutor],
     chat_controller: FromDishka[IChatController],
     shortener: FromDishka[IUrlShortener],
@@ -173,8 +189,8 @@ async def meeting_test(
         return None
 
     if not args_raw:
-        user_id = message.from_user.id
-        MEETING_TEST_STATE[user_id] = {"step": 0, "data": {}}
+        await state.set_state(MeetingTestStates.in_progress)
+        await state.set_data({"step": 0, "data": {}})
         await message.answer(
             "Запустил пошаговый режим meeting_test. "
             "Для отмены отправьте /cancel_meeting_test.\n"
@@ -220,31 +236,28 @@ async def meeting_test(
 
 
 @telegram_router.message(Command("cancel_meeting_test"))
-async def cancel_meeting_test(message: types.Message) -> None:
-    user_id = message.from_user.id
-    MEETING_TEST_STATE.pop(user_id, None)
+async def cancel_meeting_test(message: types.Message, state: FSMContext) -> None:
+    await state.clear()
     await message.answer("Пошаговый режим meeting_test отменен")
 
 
-@telegram_router.message()
+@telegram_router.message(StateFilter(MeetingTestStates.in_progress))
 @inject
 async def meeting_test_interactive(
     message: types.Message,
+    state: FSMContext,
     chat_controller: FromDishka[IChatController],
     shortener: FromDishka[IUrlShortener],
     settings: FromDishka[Settings],
 ) -> None:
-    user_id = message.from_user.id
-    state = MEETING_TEST_STATE.get(user_id)
-    if not state:
-        return None
+    wizard = await state.get_data()
 
     text = (message.text or "").strip()
     if not text:
         await message.answer("Введите значение текстом")
         return None
 
-    step: int = state["step"]
+    step: int = wizard["step"]
     field_name = MEETING_TEST_FIELDS[step][0]
 
     if field_name in {"client_email", "organizer_email"} and "@" not in text:
@@ -259,25 +272,26 @@ async def meeting_test_interactive(
         if value <= 0:
             await message.answer("duration_minutes должен быть больше 0")
             return None
-        state["data"][field_name] = value
+        wizard["data"][field_name] = value
     elif field_name == "start_time":
         try:
             parsed_dt = datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=UTC)
         except ValueError:
             await message.answer("start_time должен быть в формате YYYY-MM-DD HH:MM (UTC)")
             return None
-        state["data"][field_name] = int(parsed_dt.timestamp())
+        wizard["data"][field_name] = int(parsed_dt.timestamp())
     else:
-        state["data"][field_name] = text
+        wizard["data"][field_name] = text
 
     next_step = step + 1
     if next_step < len(MEETING_TEST_FIELDS):
-        state["step"] = next_step
+        wizard["step"] = next_step
+        await state.set_data(wizard)
         await message.answer(MEETING_TEST_FIELDS[next_step][1])
         return None
 
-    data = state["data"]
-    MEETING_TEST_STATE.pop(user_id, None)
+    data = wizard["data"]
+    await state.clear()
 
     await _send_meeting_test_links(
         message=message,
@@ -2,10 +2,17 @@ from app.interfaces.booking import IBookingController, IBookingDatabaseAdapter
 from app.interfaces.cache import ICacheController
 from app.interfaces.chat import IChatClient, IChatController
 from app.interfaces.mail import IEmailClient, IEmailController, IMailWebhookController
-from app.interfaces.meeting import IMeetingController, IMeetWebhookController, INotificationStateController
+from app.interfaces.meeting import (
+    IMeetingController,
+    IMeetTokenVerifier,
+    IMeetWebhookController,
+    IMeetWebhookRouter,
+    INotificationStateController,
+)
 from app.interfaces.notification import INotificationController
 from app.interfaces.sql import ISqlExecutor
 from app.interfaces.telegram import ITelegramController
+from app.interfaces.time_zones import ITimeZoneService
 from app.interfaces.url_shortener import IUrlShortener
 
 
@@ -18,11 +25,14 @@ __all__ = [
     "IEmailClient",
     "IEmailController",
     "IMailWebhookController",
+    "IMeetTokenVerifier",
     "IMeetWebhookController",
+    "IMeetWebhookRouter",
     "IMeetingController",
     "INotificationController",
     "INotificationStateController",
     "ISqlExecutor",
     "ITelegramController",
+    "ITimeZoneService",
     "IUrlShortener",
 ]
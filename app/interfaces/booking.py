@@ -4,8 +4,9 @@ from typing import TYPE_CHECKING, Protocol
 
 if TYPE_CHECKING:
     import datetime
+    from collections.abc import AsyncIterator
 
-    from app.dtos import AttendeeBookingDTO, BookingDTO, BookingEventDTO, UserDTO
+    from app.dtos import AttendeeBookingDTO, BookingDTO, BookingEventDTO, DueReminderDTO, OutboxMessageDTO, UserDTO
 
 
 class IBookingDatabaseAdapter(Protocol):
@@ -13,10 +14,25 @@ class IBookingDatabaseAdapter(Protocol):
 
     async def get_attendee_bookings_by_email(self, *, email: str) -> list[AttendeeBookingDTO]: ...
 
-    async def delete_booking_and_attendee_by_booking_id(self, *, booking_id: int) -> None: ...
+    async def get_bad_connection_booking_uids(self, *, email: str, booking_uids: list[str]) -> list[str]: ...
+
+    def iter_attendee_bookings_by_email(
+        self,
+        *,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[tuple[str, list[AttendeeBookingDTO]]]: ...
+
+    async def delete_booking_and_attendee_by_booking_id(
+        self,
+        *,
+        booking_id: int,
+        outbox_messages: list[OutboxMessageDTO] | None = None,
+    ) -> None: ...
 
     async def get_user_by_id(self, user_id: int) -> UserDTO | None: ...
 
+    async def get_user_time_zones(self) -> list[str]: ...
+
     async def get_organizer_chat_id(self, email: str) -> int | None: ...
 
     async def get_booking(self, booking_uid: str) -> BookingDTO | None: ...
@@ -30,6 +46,14 @@ class IBookingDatabaseAdapter(Protocol):
     ) -> list[BookingDTO]: ...
 
 
+class IBookingCache(Protocol):
+    async def get(self, booking_uid: str) -> BookingDTO | None: ...
+
+    async def set(self, booking: BookingDTO) -> None: ...
+
+    async def invalidate(self, booking_uid: str) -> None: ...
+
+
 class IBookingController(Protocol):
     async def handle_booking(self, booking_event: BookingEventDTO) -> None: ...
 
@@ -39,3 +63,5 @@ class IBookingController(Protocol):
         start_time_to_shift: int,
         booking_uid: str,
     ) -> int: ...
+
+    async def send_due_reminders(self, due_reminders: list[DueReminderDTO]) -> int: ...
@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING, Protocol, TypedDict
 if TYPE_CHECKING:
     import datetime
 
-    from app.dtos import AttendeeBookingDTO, BookingDTO
+    from app.controllers.booking_constraints import BookingTimeline
+    from app.dtos import AttendeeBookingDTO, BookingDTO, ClientBookingsAggregateDTO
 
 
 class BookingConstraintsValidationResult(TypedDict):
@@ -23,3 +24,77 @@ class IBookingConstraintsAnalyzer(Protocol):
         booking: BookingDTO,
         attendee_bookings: list[AttendeeBookingDTO],
     ) -> BookingConstraintsValidationResult: ...
+
+    def analyze_on_create_from_aggregate(
+        self,
+        *,
+        booking: BookingDTO,
+        aggregate: ClientBookingsAggregateDTO,
+    ) -> BookingConstraintsValidationResult: ...
+
+    def analyze_candidate(
+        self,
+        *,
+        aggregate: ClientBookingsAggregateDTO,
+        start_time: datetime.datetime,
+        event_type_id: int | None = None,
+    ) -> BookingConstraintsValidationResult: ...
+
+
+class IBookingAvailabilityController(Protocol):
+    async def check(
+        self,
+        *,
+        email: str,
+        start_time: datetime.datetime,
+        event_type_id: int | None = None,
+    ) -> BookingConstraintsValidationResult: ...
+
+
+class IBookingRulesEngine(Protocol):
+    # How far back past bookings can affect any plan; older bookings never change a result for a future start.
+    horizon: datetime.timedelta
+
+    def evaluate(
+        self,
+        *,
+        event_type_id: int | None,
+        booking_uid: str | None,
+        start_time: datetime.datetime,
+        timeline: BookingTimeline,
+        now: datetime.datetime,
+    ) -> BookingConstraintsValidationResult: ...
+
+    def build_rejection_reason(
+        self,
+        *,
+        event_type_id: int | None,
+        rejection_type: str | None,
+        active_booking_start_text: str | None,
+        last_meeting_date: str | None,
+    ) -> str: ...
+
+
+class IClientBookingsAggregator(Protocol):
+    def get_window_start(self, now: datetime.datetime) -> datetime.datetime: ...
+
+    async def get(self, email: str, *, now: datetime.datetime | None = None) -> ClientBookingsAggregateDTO | None: ...
+
+    async def get_or_rebuild(self, email: str) -> ClientBookingsAggregateDTO: ...
+
+    async def rebuild(self, email: str) -> ClientBookingsAggregateDTO: ...
+
+    async def refresh_bad_connections(
+        self,
+        aggregate: ClientBookingsAggregateDTO,
+        *,
+        now: datetime.datetime | None = None,
+    ) -> ClientBookingsAggregateDTO: ...
+
+    async def apply_created(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None: ...
+
+    async def apply_cancelled(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None: ...
+
+    async def apply_rescheduled(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None: ...
+
+    async def apply_deleted(self, booking: BookingDTO) -> ClientBookingsAggregateDTO | None: ...
@@ -6,3 +6,5 @@ class ICacheController(Protocol):
     async def get(self, key: str) -> Any | None: ...
 
     async def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 
 if TYPE_CHECKING:
+    from dishka import AsyncContainer
+
     from app.dtos import BookingDTO, MeetWebhookEventDTO
 
 
@@ -32,6 +34,14 @@ class IMeetWebhookController(Protocol):
     async def handle_webhook(self, event: MeetWebhookEventDTO) -> None: ...
 
 
+class IMeetWebhookRouter(Protocol):
+    async def dispatch(self, event: MeetWebhookEventDTO, container: AsyncContainer) -> bool: ...
+
+
+class IMeetTokenVerifier(Protocol):
+    def verify(self, token: str) -> dict[str, Any]: ...
+
+
 class INotificationStateController(Protocol):
     async def was_notified(self, room: str, key: str) -> bool: ...
 
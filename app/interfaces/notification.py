@@ -5,7 +5,18 @@ from typing import TYPE_CHECKING, Protocol
 if TYPE_CHECKING:
     import datetime
 
-    from app.dtos import BookingDTO, TriggerEvent, UserDTO
+    from app.dtos import BookingDTO, DeliveryReportDTO, OutboxMessageDTO, TriggerEvent, UserDTO
+
+
+class ITelegramNotificationRenderer(Protocol):
+    def render(
+        self,
+        *,
+        booking: BookingDTO,
+        time_zone: str,
+        meeting_url: str | None,
+        trigger_event: TriggerEvent,
+    ) -> str | None: ...
 
 
 class INotificationController(Protocol):
@@ -15,7 +26,7 @@ class INotificationController(Protocol):
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None: ...
+    ) -> DeliveryReportDTO: ...
 
     async def notify_organizer_telegram(
         self,
@@ -31,7 +42,7 @@ class INotificationController(Protocol):
         booking: BookingDTO,
         trigger_event: TriggerEvent,
         meeting_url: str | None = None,
-    ) -> None: ...
+    ) -> DeliveryReportDTO: ...
 
     async def notify_client_booking_rejected(
         self,
@@ -42,3 +53,13 @@ class INotificationController(Protocol):
         rejection_type: str | None,
         active_booking_start: datetime.datetime | None,
     ) -> None: ...
+
+    def build_client_booking_rejected_message(
+        self,
+        *,
+        booking: BookingDTO,
+        available_from: datetime.datetime,
+        previous_meeting_dates: list[datetime.datetime],
+        rejection_type: str | None,
+        active_booking_start: datetime.datetime | None,
+    ) -> OutboxMessageDTO: ...
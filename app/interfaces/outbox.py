@@ -0,0 +1,28 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Protocol
+
+
+if TYPE_CHECKING:
+    from app.dtos import OutboxFailureDTO, OutboxMessageDTO, OutboxStatsDTO
+
+
+class IOutboxRepository(Protocol):
+    async def ensure_table(self) -> None: ...
+
+    async def enqueue(self, messages: list[OutboxMessageDTO]) -> int: ...
+
+    async def claim_batch(self, *, limit: int, lease_seconds: float) -> list[OutboxMessageDTO]: ...
+
+    async def mark_sent(self, message_ids: list[int]) -> None: ...
+
+    async def mark_failed(self, failures: list[OutboxFailureDTO]) -> None: ...
+
+    async def prune_sent(self, *, older_than_days: int) -> None: ...
+
+    async def get_stats(self) -> OutboxStatsDTO: ...
+
+
+class IOutboxRelay(Protocol):
+    async def relay_once(self) -> int: ...
+
+    async def report_stats(self) -> None: ...
@@ -0,0 +1,9 @@
+from typing import Protocol
+
+from app.dtos import MemoryGrowthDTO
+
+
+class IProfiler(Protocol):
+    async def profile_cpu(self, *, seconds: float, interval_seconds: float) -> str | None: ...
+
+    async def profile_memory(self, *, seconds: float, limit: int) -> list[MemoryGrowthDTO] | None: ...
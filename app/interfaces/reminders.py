@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Protocol
+
+
+if TYPE_CHECKING:
+    import datetime
+
+    from app.dtos import BookingDTO, DueReminderDTO
+
+
+class IReminderScheduler(Protocol):
+    async def schedule(self, booking: BookingDTO, *, now: datetime.datetime | None = None) -> bool: ...
+
+    async def unschedule(self, booking_uid: str) -> None: ...
+
+    async def claim_due(self, *, now: datetime.datetime | None = None, limit: int = 100) -> list[DueReminderDTO]: ...
+
+    async def ack(self, due_reminders: list[DueReminderDTO]) -> None: ...
+
+    async def acquire_leadership(self) -> bool: ...
+
+    async def release_leadership(self) -> None: ...
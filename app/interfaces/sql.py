@@ -1,16 +1,33 @@
 from __future__ import annotations
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 from typing import TYPE_CHECKING, Protocol
 
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from sqlalchemy.engine import RowMapping
 
 
+UnitOfWorkFactory = Callable[[], AbstractAsyncContextManager[None]]
+
+
 class ISqlExecutor(Protocol):
+    def unit_of_work(self) -> AbstractAsyncContextManager[None]:
+        """Run the statements of the current task in one session until the block exits; writes still commit."""
+        ...
+
     async def fetch_one(self, query: str, values: dict) -> RowMapping | None: ...
 
     async def fetch_all(self, query: str, values: dict) -> list[RowMapping]: ...
 
+    def stream(self, query: str, values: dict, *, batch_size: int = 1000) -> AsyncIterator[RowMapping]: ...
+
     async def execute(self, query: str, values: dict) -> None: ...
 
-    async def execute_in_transaction(self, statements: list[tuple[str, dict]]) -> None: ...
+    async def execute_returning(self, query: str, values: dict) -> list[RowMapping]: ...
+
+    async def execute_in_transaction(self, statements: list[tuple[str, dict]]) -> list[int]:
+        """Run the statements in one transaction and return the number of rows each one affected."""
+        ...
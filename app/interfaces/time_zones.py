@@ -0,0 +1,17 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Protocol
+
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Iterable
+
+
+class ITimeZoneService(Protocol):
+    def get_zone(self, time_zone: str) -> datetime.tzinfo: ...
+
+    def get_city(self, time_zone: str) -> str: ...
+
+    def format_time(self, time_zone: str, moment: datetime.datetime, time_format: str) -> str: ...
+
+    def warm_up(self, time_zones: Iterable[str]) -> int: ...
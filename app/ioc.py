@@ -3,40 +3,72 @@ from typing import Any
 
 from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.redis import RedisStorage
 from dishka import Provider, Scope, provide
 from redis.asyncio import ConnectionPool, Redis
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.adapters.db import BookingDatabaseAdapter
-from app.adapters.email import UnisenderGoEmailClient
-from app.adapters.get_stream import GetStreamAdapter
-from app.adapters.shortener import UrlShortenerAdapter
+from app.adapters.outbox import OutboxRepository
 from app.adapters.sql import SqlExecutor
 from app.controllers.booking import BookingController
+from app.controllers.booking_availability import BookingAvailabilityController
+from app.controllers.booking_cache import BookingCacheController
 from app.controllers.booking_constraints import BookingConstraintsAnalyzer
+from app.controllers.booking_rules import BookingRulesEngine
 from app.controllers.cache import CacheController
 from app.controllers.chat import ChatController
+from app.controllers.client_bookings import ClientBookingsAggregator
 from app.controllers.email import EmailController
 from app.controllers.mail_webhook import MailWebhookController
 from app.controllers.meet_notification_state import NotificationStateController
+from app.controllers.meet_token import MeetTokenVerifier
 from app.controllers.meet_webhook import MeetWebhookController
+from app.controllers.meet_webhook_router import MeetWebhookRouter
 from app.controllers.meeting import MeetingController
 from app.controllers.notification import NotificationController
+from app.controllers.outbox import OutboxRelay
+from app.controllers.profiler import Profiler
+from app.controllers.reminder_scheduler import ReminderScheduler
 from app.controllers.telegram import TelegramController
-from app.interfaces.booking import IBookingController, IBookingDatabaseAdapter
-from app.interfaces.booking_constraints import IBookingConstraintsAnalyzer
+from app.controllers.telegram_templates import TelegramNotificationRenderer
+from app.controllers.time_zones import TimeZoneService
+from app.dtos import MeetWebhookEventType
+from app.interfaces.booking import IBookingCache, IBookingController, IBookingDatabaseAdapter
+from app.interfaces.booking_constraints import (
+    IBookingAvailabilityController,
+    IBookingConstraintsAnalyzer,
+    IBookingRulesEngine,
+    IClientBookingsAggregator,
+)
 from app.interfaces.cache import ICacheController
 from app.interfaces.chat import IChatClient, IChatController
 from app.interfaces.mail import IEmailClient, IEmailController, IMailWebhookController
-from app.interfaces.meeting import IMeetingController, IMeetWebhookController, INotificationStateController
-from app.interfaces.notification import INotificationController
+from app.interfaces.meeting import (
+    IMeetingController,
+    IMeetTokenVerifier,
+    IMeetWebhookController,
+    IMeetWebhookRouter,
+    INotificationStateController,
+)
+from app.interfaces.notification import INotificationController, ITelegramNotificationRenderer
+from app.interfaces.outbox import IOutboxRelay, IOutboxRepository
+from app.interfaces.profiler import IProfiler
+from app.interfaces.reminders import IReminderScheduler
 from app.interfaces.sql import ISqlExecutor
 from app.interfaces.telegram import ITelegramController
+from app.interfaces.time_zones import ITimeZoneService
 from app.interfaces.url_shortener import IUrlShortener
+from app.metrics import TelegramMetricsMiddleware, track_db_pool, track_redis_pool
 from app.settings import Settings
 
 
+FSM_STATE_TTL_SECONDS = 60 * 30
+
 dp = Dispatcher()
 telegram_router = Router(name="telegram")
 dp.include_router(telegram_router)
@@ -49,7 +81,17 @@ class AppProvider(Provider):
 
     @provide(scope=Scope.APP)
     async def provide_bot(self, settings: Settings) -> AsyncGenerator[Bot, Any]:
-        async with Bot(token=settings.bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML)) as bot:
+        session = (
+            AiohttpSession(api=TelegramAPIServer.from_base(settings.telegram_api_url))
+            if settings.telegram_api_url
+            else None
+        )
+        async with Bot(
+            token=settings.bot_token,
+            session=session,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        ) as bot:
+            bot.session.middleware(TelegramMetricsMiddleware())
             yield bot
 
     @provide(scope=Scope.APP)
@@ -60,6 +102,7 @@ class AppProvider(Provider):
             max_overflow=20,
             pool_pre_ping=True,
         )
+        track_db_pool(engine)
         try:
             yield engine
         finally:
@@ -73,36 +116,46 @@ class AppProvider(Provider):
             autoflush=False,
         )
 
-    @provide(scope=Scope.REQUEST)
-    async def provide_session(
-        self,
-        sessionmaker: async_sessionmaker[AsyncSession],
-    ) -> AsyncGenerator[AsyncSession, Any]:
-        async with sessionmaker() as session:
-            yield session
-
-    @provide(scope=Scope.REQUEST)
-    def provide_sql_executor(self, session: AsyncSession) -> ISqlExecutor:
-        return SqlExecutor(session)
+    @provide(scope=Scope.APP)
+    def provide_sql_executor(self, sessionmaker: async_sessionmaker[AsyncSession]) -> ISqlExecutor:
+        # Sessions are opened per statement or per `unit_of_work()` block by the executor, so nothing in the graph is
+        # bound to a request scope.
+        return SqlExecutor(sessionmaker)
 
     @provide(scope=Scope.APP)
     async def provide_cache_client(self, settings: Settings) -> AsyncGenerator[Redis, Any]:
         redis = Redis(connection_pool=ConnectionPool.from_url(settings.redis_url))
+        track_redis_pool(redis.connection_pool)
         try:
             yield redis
         finally:
             await redis.aclose()
 
+    @provide(scope=Scope.APP)
+    def provide_fsm_storage(self, cache_client: Redis) -> BaseStorage:
+        return RedisStorage(redis=cache_client, state_ttl=FSM_STATE_TTL_SECONDS, data_ttl=FSM_STATE_TTL_SECONDS)
+
     @provide(scope=Scope.APP)
     def provide_cache_controller(self, cache_client: Redis) -> ICacheController:
         return CacheController(client=cache_client)
 
+    @provide(scope=Scope.APP)
+    def provide_reminder_scheduler(self, cache_client: Redis, settings: Settings) -> IReminderScheduler:
+        return ReminderScheduler(client=cache_client, settings=settings)
+
+    @provide(scope=Scope.APP)
+    def provide_booking_cache(self, cache_controller: ICacheController) -> IBookingCache:
+        return BookingCacheController(cache_controller=cache_controller)
+
     @provide(scope=Scope.APP)
     def provide_mail_webhook_controller(self, bot: Bot, settings: Settings) -> IMailWebhookController:
         return MailWebhookController(bot=bot, settings=settings)
 
     @provide(scope=Scope.APP)
     def provide_email_client(self, settings: Settings) -> IEmailClient:
+        # Integration adapters are imported by their providers, so their SDKs load on first use instead of at startup.
+        from app.adapters.email import UnisenderGoEmailClient  # noqa: PLC0415
+
         return UnisenderGoEmailClient(
             api_url=settings.email_api_url,
             api_key=settings.email_api_key,
@@ -113,16 +166,20 @@ class AppProvider(Provider):
     def provide_email_controller(self, client: IEmailClient, settings: Settings) -> IEmailController:
         return EmailController(client=client, settings=settings)
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
     def provide_db(self, sql: ISqlExecutor) -> IBookingDatabaseAdapter:
         return BookingDatabaseAdapter(sql)
 
     @provide(scope=Scope.APP)
     def provide_shortener(self, settings: Settings) -> IUrlShortener:
+        from app.adapters.shortener import UrlShortenerAdapter  # noqa: PLC0415
+
         return UrlShortenerAdapter(settings=settings)
 
     @provide(scope=Scope.APP)
     def provide_chat_adapter(self, settings: Settings) -> IChatClient:
+        from app.adapters.get_stream import GetStreamAdapter  # noqa: PLC0415
+
         return GetStreamAdapter(
             chat_api_key=settings.chat_api_key,
             chat_api_secret=settings.chat_api_secret,
@@ -133,29 +190,108 @@ class AppProvider(Provider):
     def provide_chat_controller(self, chat_adapter: IChatClient) -> IChatController:
         return ChatController(client=chat_adapter)
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
     def provide_meeting_controller(
         self,
         db: IBookingDatabaseAdapter,
         shortener: IUrlShortener,
         chat_controller: IChatController,
+        booking_cache: IBookingCache,
         settings: Settings,
     ) -> IMeetingController:
-        return MeetingController(db=db, shortener=shortener, chat_controller=chat_controller, settings=settings)
+        return MeetingController(
+            db=db,
+            shortener=shortener,
+            chat_controller=chat_controller,
+            booking_cache=booking_cache,
+            settings=settings,
+        )
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
     def provide_notification_controller(
         self,
         db: IBookingDatabaseAdapter,
         bot: Bot,
         settings: Settings,
         email_controller: IEmailController,
+        booking_rules_engine: IBookingRulesEngine,
+        time_zone_service: ITimeZoneService,
+        telegram_renderer: ITelegramNotificationRenderer,
+        outbox: IOutboxRepository,
     ) -> INotificationController:
-        return NotificationController(db=db, bot=bot, settings=settings, email_controller=email_controller)
+        return NotificationController(
+            db=db,
+            bot=bot,
+            settings=settings,
+            email_controller=email_controller,
+            booking_rules_engine=booking_rules_engine,
+            time_zone_service=time_zone_service,
+            telegram_renderer=telegram_renderer,
+            outbox=outbox,
+        )
+
+    @provide(scope=Scope.APP)
+    def provide_outbox_repository(self, sql: ISqlExecutor) -> IOutboxRepository:
+        return OutboxRepository(sql=sql)
+
+    @provide(scope=Scope.APP)
+    def provide_outbox_relay(
+        self,
+        settings: Settings,
+        outbox: IOutboxRepository,
+        bot: Bot,
+        email_controller: IEmailController,
+    ) -> IOutboxRelay:
+        return OutboxRelay(settings=settings, outbox=outbox, bot=bot, email_controller=email_controller)
+
+    @provide(scope=Scope.APP)
+    def provide_time_zone_service(self) -> ITimeZoneService:
+        return TimeZoneService()
+
+    @provide(scope=Scope.APP)
+    def provide_profiler(self) -> IProfiler:
+        return Profiler()
+
+    @provide(scope=Scope.APP)
+    def provide_telegram_notification_renderer(
+        self,
+        settings: Settings,
+        time_zone_service: ITimeZoneService,
+    ) -> ITelegramNotificationRenderer:
+        return TelegramNotificationRenderer(settings=settings, time_zone_service=time_zone_service)
+
+    @provide(scope=Scope.APP)
+    def provide_booking_rules_engine(self, settings: Settings) -> IBookingRulesEngine:
+        return BookingRulesEngine(
+            default_rules=settings.booking_constraints,
+            rules_by_event_type=settings.booking_constraints_by_event_type,
+        )
+
+    @provide(scope=Scope.APP)
+    def provide_booking_constraints_analyzer(self, rules_engine: IBookingRulesEngine) -> IBookingConstraintsAnalyzer:
+        return BookingConstraintsAnalyzer(rules_engine=rules_engine)
+
+    @provide(scope=Scope.APP)
+    def provide_booking_availability_controller(
+        self,
+        settings: Settings,
+        client_bookings_aggregator: IClientBookingsAggregator,
+        booking_constraints_analyzer: IBookingConstraintsAnalyzer,
+    ) -> IBookingAvailabilityController:
+        return BookingAvailabilityController(
+            settings=settings,
+            client_bookings_aggregator=client_bookings_aggregator,
+            booking_constraints_analyzer=booking_constraints_analyzer,
+        )
 
-    @provide(scope=Scope.REQUEST)
-    def provide_booking_constraints_analyzer(self) -> IBookingConstraintsAnalyzer:
-        return BookingConstraintsAnalyzer()
+    @provide(scope=Scope.APP)
+    def provide_client_bookings_aggregator(
+        self,
+        db: IBookingDatabaseAdapter,
+        cache_client: Redis,
+        rules_engine: IBookingRulesEngine,
+    ) -> IClientBookingsAggregator:
+        return ClientBookingsAggregator(db=db, client=cache_client, rules_engine=rules_engine)
 
     @provide(scope=Scope.APP)
     def provide_telegram_controller(self, bot: Bot, settings: Settings) -> ITelegramController:
@@ -168,38 +304,64 @@ class AppProvider(Provider):
     ) -> INotificationStateController:
         return NotificationStateController(cache_controller=cache_controller)
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
+    def provide_meet_token_verifier(self, settings: Settings) -> IMeetTokenVerifier:
+        return MeetTokenVerifier(settings=settings)
+
+    @provide(scope=Scope.APP)
+    def provide_meet_webhook_router(self) -> IMeetWebhookRouter:
+        router = MeetWebhookRouter()
+        router.register(
+            MeetWebhookEventType.VIDEO_CONFERENCE_JOINED,
+            handler=IMeetWebhookController,
+            roles={"client"},
+        )
+        return router
+
+    @provide(scope=Scope.APP)
     def provide_meet_webhook_controller(
         self,
         db: IBookingDatabaseAdapter,
+        booking_cache: IBookingCache,
         notification_controller: INotificationController,
         notification_state_controller: INotificationStateController,
+        sql: ISqlExecutor,
     ) -> IMeetWebhookController:
         return MeetWebhookController(
             db=db,
+            booking_cache=booking_cache,
             notification_controller=notification_controller,
             notification_state_controller=notification_state_controller,
+            unit_of_work=sql.unit_of_work,
         )
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
     def provide_booking_controller(
         self,
         db: IBookingDatabaseAdapter,
+        booking_cache: IBookingCache,
         shortener: IUrlShortener,
         chat_controller: IChatController,
         meeting_controller: IMeetingController,
         notification_controller: INotificationController,
         notification_state_controller: INotificationStateController,
         booking_constraints_analyzer: IBookingConstraintsAnalyzer,
+        client_bookings_aggregator: IClientBookingsAggregator,
+        reminder_scheduler: IReminderScheduler,
+        sql: ISqlExecutor,
         settings: Settings,
     ) -> IBookingController:
         return BookingController(
             db=db,
+            booking_cache=booking_cache,
             shortener=shortener,
             chat_controller=chat_controller,
             meeting_controller=meeting_controller,
             notification_controller=notification_controller,
             notification_state_controller=notification_state_controller,
             booking_constraints_analyzer=booking_constraints_analyzer,
+            client_bookings_aggregator=client_bookings_aggregator,
+            reminder_scheduler=reminder_scheduler,
+            unit_of_work=sql.unit_of_work,
             settings=settings,
         )
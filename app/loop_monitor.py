@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import suppress
+
+import structlog
+
+from app.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS, SLOW_CALLBACKS
+from app.settings import Settings
+
+
+logger = structlog.get_logger(__name__)
+
+STACK_DEPTH = 12
+
+
+class SlowCallbackCounter(logging.Filter):
+    """Count the "Executing <Handle ...> took N seconds" warnings asyncio emits in debug mode."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str) and record.msg.startswith("Executing "):
+            SLOW_CALLBACKS.inc()
+        return True
+
+
+def get_stack_summary(thread_id: int) -> list[str]:
+    frame = sys._current_frames().get(thread_id)  # noqa: SLF001
+    if frame is None:
+        return []
+    return [
+        f"{summary.filename}:{summary.lineno} in {summary.name}"
+        for summary in traceback.extract_stack(frame)[-STACK_DEPTH:]
+    ]
+
+
+class LoopMonitor:
+    """Event loop health: a lag probe on the loop and a watchdog thread that catches the loop while it is stuck.
+
+    The probe records how late each periodic wake-up is (``event_loop_lag_seconds``) and logs lags above
+    ``loop_lag_warning_seconds``. The watchdog only knows the last probe wake-up; when that is older than
+    ``loop_stall_seconds`` it logs the loop thread's current stack, i.e. the synchronous code blocking the loop.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.interval = settings.loop_probe_interval_seconds
+        self.lag_warning_seconds = settings.loop_lag_warning_seconds
+        self.stall_seconds = settings.loop_stall_seconds
+        self.is_asyncio_debug = settings.is_enable_asyncio_debug
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.probe_task: asyncio.Task[None] | None = None
+        self.watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        if self.is_asyncio_debug:
+            # Debug mode adds overhead to every callback; meant for a limited time on one instance.
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.lag_warning_seconds
+            logging.getLogger("asyncio").addFilter(SlowCallbackCounter())
+        self.heartbeat = time.monotonic()
+        self.probe_task = loop.create_task(self._probe())
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+
+    async def stop(self) -> None:
+        self.stopped.set()
+        if self.probe_task:
+            self.probe_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.probe_task
+
+    async def _probe(self) -> None:
+        while True:
+            expected_at = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.heartbeat = time.monotonic()
+            lag = max(self.heartbeat - expected_at, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.lag_warning_seconds:
+                logger.warning("Event loop lag", lag_seconds=round(lag, 3))
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self.stopped.wait(self.stall_seconds / 4):
+            heartbeat = self.heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.stall_seconds or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            EVENT_LOOP_STALLS.inc()
+            logger.warning(
+                "Event loop stalled",
+                stalled_seconds=round(stalled_for, 3),
+                loop_stack=get_stack_summary(self.loop_thread_id),
+            )
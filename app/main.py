@@ -1,9 +1,11 @@
+import asyncio
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from logging import getLevelNamesMapping
 
-import sentry_sdk
 import structlog
+from aiogram.fsm.storage.base import BaseStorage
 from dishka import make_async_container
 from dishka.integrations.aiogram import AiogramProvider
 from dishka.integrations.aiogram import setup_dishka as setup_aiogram_dishka
@@ -12,28 +14,108 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from prometheus_client import start_http_server
 
 from app.config.logger import setup_logger
 from app.handlers import messages  # noqa: F401
+from app.interfaces.booking import IBookingController, IBookingDatabaseAdapter
+from app.interfaces.outbox import IOutboxRelay, IOutboxRepository
+from app.interfaces.reminders import IReminderScheduler
 from app.interfaces.telegram import ITelegramController
+from app.interfaces.time_zones import ITimeZoneService
 from app.ioc import AppProvider, dp
+from app.loop_monitor import LoopMonitor
 from app.routes import root_router
 from app.settings import Settings
+from app.tracing import TracingMiddleware, setup_tracing
 
 
 logger = structlog.get_logger(__name__)
 
+OUTBOX_STATS_INTERVAL_SECONDS = 60
+
 
 container = make_async_container(AppProvider(), FastapiProvider(), AiogramProvider())
 
 
+async def warm_up_time_zones() -> None:
+    try:
+        db = await container.get(IBookingDatabaseAdapter)
+        time_zones = await db.get_user_time_zones()
+        time_zone_service = await container.get(ITimeZoneService)
+        logger.info("Time zones warmed up", count=time_zone_service.warm_up(time_zones))
+    except Exception:
+        logger.exception("Error warming up time zones")
+
+
+async def relay_outbox(settings: Settings) -> None:
+    relay: IOutboxRelay | None = None
+    stats_reported_at = 0.0
+    while True:
+        claimed = 0
+        try:
+            # The table is created inside the loop, so a database that is down at startup is retried, not fatal.
+            if relay is None:
+                outbox = await container.get(IOutboxRepository)
+                await outbox.ensure_table()
+                relay = await container.get(IOutboxRelay)
+            claimed = await relay.relay_once()
+            if time.monotonic() - stats_reported_at >= OUTBOX_STATS_INTERVAL_SECONDS:
+                stats_reported_at = time.monotonic()
+                await relay.report_stats()
+        except Exception:
+            logger.exception("Error relaying notification outbox")
+        # A full batch means more messages are probably waiting, so poll again right away.
+        if claimed < settings.outbox_batch_size:
+            await asyncio.sleep(settings.outbox_poll_interval_seconds)
+
+
+async def run_reminder_scheduler(settings: Settings) -> None:
+    scheduler = await container.get(IReminderScheduler)
+    booking_controller = await container.get(IBookingController)
+    try:
+        while True:
+            try:
+                if await scheduler.acquire_leadership():
+                    while due_reminders := await scheduler.claim_due(limit=settings.reminder_batch_size):
+                        await booking_controller.send_due_reminders(due_reminders)
+                        if len(due_reminders) < settings.reminder_batch_size:
+                            break
+            except Exception:
+                logger.exception("Error running reminder scheduler")
+            await asyncio.sleep(settings.reminder_poll_interval_seconds)
+    finally:
+        await scheduler.release_leadership()
+
+
+async def stop_background_loops(background_loops: list[asyncio.Task]) -> None:
+    for task in background_loops:
+        task.cancel()
+    # A loop that already died must not abort the shutdown before the container is closed.
+    for result in await asyncio.gather(*background_loops, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error("Background loop failed", exc_info=result)
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
     settings = await container.get(Settings)
-    log_level = getLevelNamesMapping().get(settings.log_level)
-    setup_logger(log_level=log_level, console_render=settings.debug)
+    log_levels = getLevelNamesMapping()
+    setup_logger(
+        log_level=log_levels.get(settings.log_level),
+        console_render=settings.debug,
+        callsite_level=log_levels.get(settings.log_callsite_level),
+        callsite_sample_ratio=settings.log_callsite_sample_ratio,
+        is_off_loop=settings.is_enable_off_loop_logging,
+        sample_rates=settings.log_sample_rates,
+        rate_limits=settings.log_rate_limits_per_second,
+        max_field_length=settings.log_max_field_length,
+    )
+    tracer_provider = setup_tracing(settings)
 
     if settings.sentry_dsn:
+        import sentry_sdk  # noqa: PLC0415
+
         logger.info(f"Initializing Sentry with DSN: {settings.sentry_dsn}")
         sentry_sdk.init(
             dsn=settings.sentry_dsn,
@@ -43,10 +125,28 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
         )
 
     logger.info("🚀 Starting application")
+    dp.fsm.storage = await container.get(BaseStorage)
+    await warm_up_time_zones()
     telegram_controller = await container.get(ITelegramController)
     await telegram_controller.start()
+    metrics_server, _ = start_http_server(settings.metrics_port) if settings.metrics_port else (None, None)
+    loop_monitor = LoopMonitor(settings) if settings.is_enable_loop_monitor else None
+    if loop_monitor:
+        loop_monitor.start()
+    background_loops = []
+    if settings.is_enable_notification_outbox:
+        background_loops.append(asyncio.create_task(relay_outbox(settings)))
+    if settings.is_enable_reminder_scheduler:
+        background_loops.append(asyncio.create_task(run_reminder_scheduler(settings)))
     yield
+    await stop_background_loops(background_loops)
+    if loop_monitor:
+        await loop_monitor.stop()
+    if metrics_server:
+        metrics_server.shutdown()
     await container.close()
+    if tracer_provider:
+        tracer_provider.shutdown()
     logger.info("⛔ Stopping application")
 
 
@@ -54,6 +154,7 @@ app = FastAPI(lifespan=lifespan)
 setup_aiogram_dishka(container=container, router=dp, auto_inject=True)
 setup_dishka(container, app)
 
+app.add_middleware(TracingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
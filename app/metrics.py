@@ -0,0 +1,126 @@
+import functools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import ParamSpec, TypeVar
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from prometheus_client import Counter, Gauge, Histogram
+from redis.asyncio import ConnectionPool
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.tracing import start_client_span
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Integration calls range from sub-millisecond Redis commands to multi-second third-party API retries.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DEPENDENCY_REQUESTS = Counter(
+    "dependency_requests_total",
+    "Calls to an external dependency.",
+    ["dependency", "operation"],
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_errors_total",
+    "Calls to an external dependency that raised.",
+    ["dependency", "operation"],
+)
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_latency_seconds",
+    "Latency of calls to an external dependency.",
+    ["dependency", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+BACKGROUND_TASKS = Gauge("background_tasks", "Booking events being processed in background tasks.")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out_connections", "SQLAlchemy pool connections in use.")
+REDIS_POOL_IN_USE = Gauge("redis_pool_in_use_connections", "Redis pool connections in use.")
+REDIS_POOL_AVAILABLE = Gauge("redis_pool_available_connections", "Idle Redis pool connections.")
+LOG_EVENTS_DROPPED = Counter(
+    "log_events_dropped_total",
+    "Log lines dropped by sampling or rate limits.",
+    ["event", "reason"],
+)
+LOG_FIELDS_TRUNCATED = Counter("log_fields_truncated_total", "Log fields cut to the maximum field length.", ["field"])
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a periodic probe.",
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_STALLS = Counter("event_loop_stalls_total", "Times the event loop stopped running callbacks for too long.")
+SLOW_CALLBACKS = Counter("event_loop_slow_callbacks_total", "Callbacks reported slow by asyncio debug mode.")
+MEET_WEBHOOK_EVENTS = Counter(
+    "meet_webhook_events_total",
+    "Jitsi webhook events by event type and whether a handler was routed or the event was skipped.",
+    ["event", "outcome"],
+)
+OUTBOX_PENDING = Gauge("outbox_pending_messages", "Outbox messages waiting to be delivered or retried.")
+OUTBOX_DEAD = Gauge("outbox_dead_messages", "Outbox messages given up after the maximum number of attempts.")
+OUTBOX_LAG = Gauge("outbox_lag_seconds", "Age of the oldest pending outbox message.")
+
+
+@functools.cache
+def _get_series(dependency: str, operation: str) -> tuple[Counter, Counter, Histogram]:
+    # `labels()` takes a lock and builds a key on every call; the label sets here are small and fixed.
+    return (
+        DEPENDENCY_REQUESTS.labels(dependency, operation),
+        DEPENDENCY_ERRORS.labels(dependency, operation),
+        DEPENDENCY_LATENCY.labels(dependency, operation),
+    )
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str) -> Iterator[None]:
+    requests, errors, latency = _get_series(dependency, operation)
+    requests.inc()
+    started_at = time.perf_counter()
+    try:
+        with start_client_span(dependency, operation):
+            yield
+    except BaseException:
+        errors.inc()
+        raise
+    finally:
+        latency.observe(time.perf_counter() - started_at)
+
+
+def instrumented(dependency: str) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Record count, errors and latency of an async method, labelled with the method name."""
+
+    def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with track_dependency(dependency, func.__name__):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Bot API calls (``send_message`` and friends) labelled by API method."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        with track_dependency("telegram", method.__api_method__):
+            return await make_request(bot, method)
+
+
+def track_db_pool(engine: AsyncEngine) -> None:
+    """Read pool usage at scrape time instead of updating gauges on every checkout."""
+    DB_POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
+
+
+def track_redis_pool(pool: ConnectionPool) -> None:
+    REDIS_POOL_IN_USE.set_function(lambda: len(pool._in_use_connections))  # noqa: SLF001
+    REDIS_POOL_AVAILABLE.set_function(lambda: len(pool._available_connections))  # noqa: SLF001
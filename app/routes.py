@@ -1,5 +1,7 @@
+import datetime
 import hashlib
 import hmac
+import logging
 import re
 from asyncio import Task, create_task
 from collections.abc import Awaitable
@@ -8,21 +10,37 @@ from typing import Annotated
 import jwt
 import structlog
 from aiogram import Bot, types
-from dishka import Scope
 from dishka.integrations.fastapi import DishkaRoute, FromDishka
-from fastapi import APIRouter, FastAPI, Header, HTTPException, status
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from starlette.requests import Request
 
 from app.interfaces.booking import IBookingController
+from app.interfaces.booking_constraints import IBookingAvailabilityController
 from app.interfaces.mail import IMailWebhookController
-from app.interfaces.meeting import IMeetWebhookController
+from app.interfaces.meeting import IMeetTokenVerifier, IMeetWebhookRouter
+from app.interfaces.profiler import IProfiler
 from app.ioc import dp
-from app.schemas import BookingEvent, BookingReminderBody, JitsiWebhookEvent, MailWebhookEvent
+from app.metrics import BACKGROUND_TASKS
+from app.schemas import (
+    BookingAvailabilityResponse,
+    BookingEvent,
+    BookingReminderBody,
+    JitsiWebhookEvent,
+    MailWebhookEvent,
+    MemoryGrowthResponse,
+)
 from app.settings import Settings
 
 
 logger = structlog.get_logger(__name__)
 background_tasks: set[Task[Awaitable[None] | None]] = set()
+BACKGROUND_TASKS.set_function(lambda: len(background_tasks))
+
+# Bounds for on-demand profiling of a production worker.
+PROFILE_MAX_SECONDS = 60
+PROFILE_MIN_INTERVAL_MS = 5
 
 root_router = APIRouter(
     prefix="",
@@ -54,11 +72,11 @@ async def validate_mail_signature(request: Request, settings: Settings) -> bool:
     return hmac.compare_digest(auth, expected_signature)
 
 
-async def _process_booking_event_in_new_scope(app: FastAPI, booking_event: BookingEvent) -> None:
+async def _process_booking_event(app: FastAPI, booking_event: BookingEvent) -> None:
     try:
-        async with app.state.dishka_container({}, scope=Scope.REQUEST) as request_container:
-            booking_controller = await request_container.get(IBookingController)
-            await booking_controller.handle_booking(booking_event.to_dto())
+        # The controller graph is app-scoped, so the task outliving the request needs no scope of its own.
+        booking_controller = await app.state.dishka_container.get(IBookingController)
+        await booking_controller.handle_booking(booking_event.to_dto())
     except Exception:
         logger.exception("Error while processing booking event in background", event=booking_event.model_dump())
 
@@ -83,6 +101,21 @@ async def booking_reminder(
     return count_sent_reminders
 
 
+@root_router.get("/booking/availability")
+async def booking_availability(
+    availability_controller: FromDishka[IBookingAvailabilityController],
+    settings: FromDishka[Settings],
+    email: Annotated[str, Query(min_length=3)],
+    start_time: Annotated[datetime.datetime, Query()],
+    event_type_id: Annotated[int | None, Query()] = None,
+    admin_api_token: Annotated[str | None, Header(alias="admin-api-token")] = None,
+) -> BookingAvailabilityResponse:
+    if admin_api_token != settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    result = await availability_controller.check(email=email, start_time=start_time, event_type_id=event_type_id)
+    return BookingAvailabilityResponse(**result)
+
+
 @root_router.post("/booking")
 async def booking(
     booking_event: BookingEvent,
@@ -92,10 +125,19 @@ async def booking(
 ) -> None:
     if not settings.debug and not await validate_signature(signature=signature, request=request):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Signature validation error")
-    request_body = await request.json()
-    logger.info(f"Received booking event {request_body}")
+    body = await request.body()
+    logger.info(
+        "Received booking event",
+        uid=booking_event.payload.uid,
+        trigger_event=booking_event.trigger_event,
+        payload_size=len(body),
+    )
+    # Bodies carry client personal data and can be large; the bytes are only decoded if the line is rendered.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Booking event body", uid=booking_event.payload.uid, body=body)
 
-    task = create_task(_process_booking_event_in_new_scope(app=request.app, booking_event=booking_event))
+    # The task gets a copy of the current context, so its spans continue the request's trace.
+    task = create_task(_process_booking_event(app=request.app, booking_event=booking_event))
     background_tasks.add(task)
     task.add_done_callback(background_tasks.discard)
     return None
@@ -116,7 +158,14 @@ async def mail_webhook(
     if not await validate_mail_signature(request=request, settings=settings):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Signature validation error")
 
-    logger.info(event)
+    logger.info(
+        "Received mail webhook",
+        events=[
+            (user_events.user_id, user_event.event_name, user_event.event_data.status)
+            for user_events in event.events_by_user
+            for user_event in user_events.events
+        ],
+    )
     await mail_controller.handle_webhook(event.to_dto())
     return None
 
@@ -139,20 +188,68 @@ async def bot_webhook(
 @root_router.post("/jitsi/webhook")
 async def jitsi_webhook(
     event: JitsiWebhookEvent,
-    meet_controller: FromDishka[IMeetWebhookController],
-    settings: FromDishka[Settings],
+    request: Request,
+    meet_router: FromDishka[IMeetWebhookRouter],
+    token_verifier: FromDishka[IMeetTokenVerifier],
 ) -> None:
     try:
-        jwt.decode(
-            event.jwt,
-            settings.jitsi_jwt_token,
-            algorithms=["HS256"],
-            audience=settings.meeting_jwt_aud,
-            issuer=settings.meeting_jwt_iss,
-        )
+        claims = token_verifier.verify(event.jwt)
     except jwt.PyJWTError as e:
         logger.exception("Jitsi webhook JWT validation error")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="JWT validation error") from e
 
-    await meet_controller.handle_webhook(event.to_dto())
+    await meet_router.dispatch(event.to_dto(claims=claims), container=request.state.dishka_container)
     return None
+
+
+@root_router.get("/metrics")
+async def metrics(
+    settings: FromDishka[Settings],
+    authorization: Annotated[str | None, Header()] = None,
+) -> Response:
+    # The app port is public (CORS *), so metrics are only exposed here behind a token; see `metrics_port`.
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(authorization or "", f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@root_router.get("/admin/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    profiler: FromDishka[IProfiler],
+    settings: FromDishka[Settings],
+    seconds: Annotated[float, Query(gt=0, le=PROFILE_MAX_SECONDS)] = 10,
+    interval_ms: Annotated[float, Query(ge=PROFILE_MIN_INTERVAL_MS, le=1000)] = 10,
+    admin_api_token: Annotated[str | None, Header(alias="admin-api-token")] = None,
+) -> PlainTextResponse:
+    if admin_api_token != settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    collapsed_stacks = await profiler.profile_cpu(seconds=seconds, interval_seconds=interval_ms / 1000)
+    if collapsed_stacks is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A CPU profile is already running")
+    return PlainTextResponse(collapsed_stacks)
+
+
+@root_router.get("/admin/profile/memory")
+async def profile_memory(
+    profiler: FromDishka[IProfiler],
+    settings: FromDishka[Settings],
+    seconds: Annotated[float, Query(gt=0, le=PROFILE_MAX_SECONDS)] = 30,
+    limit: Annotated[int, Query(gt=0, le=500)] = 50,
+    admin_api_token: Annotated[str | None, Header(alias="admin-api-token")] = None,
+) -> list[MemoryGrowthResponse]:
+    if admin_api_token != settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    growth = await profiler.profile_memory(seconds=seconds, limit=limit)
+    if growth is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A memory profile is already running")
+    return [
+        MemoryGrowthResponse(
+            location=item.location,
+            size_diff_bytes=item.size_diff_bytes,
+            count_diff=item.count_diff,
+            size_bytes=item.size_bytes,
+        )
+        for item in growth
+    ]
@@ -1,3 +1,4 @@
+import datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -14,6 +15,7 @@ from app.dtos import (
     MailWebhookEventsByUserDTO,
     MailWebhookUserEventDTO,
     MeetWebhookEventDTO,
+    MeetWebhookEventType,
     TriggerEvent,
 )
 
@@ -30,6 +32,20 @@ class BookingReminderBody(BaseModel):
     booking_uid: str | None = None
 
 
+class BookingAvailabilityResponse(BaseModel):
+    is_allowed: bool
+    available_from: datetime.datetime
+    rejection_type: str | None = None
+    active_booking_start: datetime.datetime | None = None
+
+
+class MemoryGrowthResponse(BaseModel):
+    location: str
+    size_diff_bytes: int
+    count_diff: int
+    size_bytes: int
+
+
 class BookingEventAttendee(BaseCalComModel):
     name: str
     email: str
@@ -167,8 +183,9 @@ class JitsiWebhookEvent(BaseModel):
     class Config:
         alias_generator = to_camel
 
-    def to_dto(self) -> MeetWebhookEventDTO:
+    def to_dto(self, claims: dict | None = None) -> MeetWebhookEventDTO:
         return MeetWebhookEventDTO(
-            event=self.event,
+            event=MeetWebhookEventType(self.event),
             jwt=self.jwt,
+            claims=claims or {},
         )
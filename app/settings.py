@@ -1,9 +1,19 @@
-from typing import final
+from typing import Literal, final
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class BookingConstraintsRules(BaseModel):
+    """Booking constraint limits; ``None`` disables the corresponding rule."""
+
+    months_after_cancellation: int | None = Field(default=2, ge=1)
+    is_single_active_booking: bool = True
+    max_bookings_per_month: int | None = Field(default=2, ge=0)
+    max_bookings_per_year: int | None = Field(default=10, ge=0)
+    min_days_between_bookings: int | None = Field(default=7, ge=1)
+
+
 @final
 class Settings(BaseSettings):
     base_webhook_url: str
@@ -14,6 +24,22 @@ class Settings(BaseSettings):
     is_check_first_run: bool = False
     jitsi_jwt_token: str = Field(strict=True)
     log_level: str = "DEBUG"
+    # Events below this level get callsite fields (pathname, func_name, thread, ...) only for a sampled share.
+    log_callsite_level: str = "WARNING"
+    log_callsite_sample_ratio: float = Field(default=0.0, ge=0, le=1)
+    # Render and write log records in a listener thread instead of on the event loop.
+    # Only pays off with a slow log sink: with a fast one the queue hand-off costs more than the write it moves away.
+    is_enable_off_loop_logging: bool = False
+    # JSON keyed by event name, e.g. {"Received booking event": 0.1}; only DEBUG/INFO lines are sampled or limited.
+    log_sample_rates: dict[str, float] = Field(default_factory=dict)
+    log_rate_limits_per_second: dict[str, int] = Field(default_factory=dict)
+    log_max_field_length: int = Field(default=2048, ge=64)
+    is_enable_loop_monitor: bool = True
+    loop_probe_interval_seconds: float = Field(default=0.5, gt=0)
+    loop_lag_warning_seconds: float = Field(default=0.1, gt=0)
+    loop_stall_seconds: float = Field(default=1.0, gt=0)
+    # asyncio debug mode: logs every callback slower than `loop_lag_warning_seconds`, at a per-callback cost.
+    is_enable_asyncio_debug: bool = False
     meeting_host_url: str = "localhost:8080"
     meeting_jwt_aud: str
     meeting_jwt_iss: str
@@ -21,6 +47,12 @@ class Settings(BaseSettings):
     postgres_dsn: str = Field(strict=True)
     redis_url: str = "redis://localhost:6379/0"
     sentry_dsn: str | None = Field(strict=True, default=None)
+    # `otlp` sends spans to an OTLP/HTTP collector, `file` appends them as JSON lines; unset disables tracing.
+    tracing_exporter: Literal["otlp", "file"] | None = None
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_sample_ratio: float = Field(default=1.0, ge=0, le=1)
+    tracing_service_name: str = "zhivaya-bot"
     shortify_api_key: str | None = Field(strict=True, default=None)
     shortner_url: str
     from_email: str
@@ -35,14 +67,43 @@ class Settings(BaseSettings):
     smtp_password: str | None = Field(strict=True, default=None)
     support_email: str = "info@localhost.local"
     telegram_my_token: str
+    # Bot API server base URL, e.g. a local `telegram-bot-api` or the load-test fake; unset uses api.telegram.org.
+    telegram_api_url: str | None = None
     webhook_path: str = "/telegram"
     admin_chat_ids: list[int] = Field(default_factory=list)
     admin_api_token: str = Field(strict=True)
+    # Bearer token required by `GET /metrics` on the public app; the endpoint answers 404 while it is unset.
+    metrics_token: str | None = None
+    # Also serve metrics without a token on this port; only for a port the internal network can reach.
+    metrics_port: int | None = None
     chat_api_key: str
     chat_api_secret: str
     chat_user_id_encryption_key: str
     offer_url: str
     is_enable_booking_constraints: bool = False
+    booking_constraints: BookingConstraintsRules = Field(default_factory=BookingConstraintsRules)
+    # JSON keyed by cal.com event type id, e.g. {"12": {"max_bookings_per_month": 4}}; unset fields fall back to
+    # `booking_constraints`.
+    booking_constraints_by_event_type: dict[int, BookingConstraintsRules] = Field(default_factory=dict)
+    notification_timeout_seconds: float = Field(default=10.0, gt=0)
+    # JSON keyed by delivery channel, e.g. {"telegram": 5, "chat": 3}; other channels use
+    # `notification_timeout_seconds`. Keys: "telegram" and "email" (organizer and client emails, inline or relayed
+    # from the outbox), "chat", "meeting_url".
+    notification_channel_timeouts: dict[str, float] = Field(default_factory=dict)
+    is_enable_notification_outbox: bool = False
+    outbox_batch_size: int = Field(default=50, ge=1)
+    outbox_poll_interval_seconds: float = Field(default=1.0, gt=0)
+    outbox_lease_seconds: float = Field(default=120.0, gt=0)
+    outbox_max_attempts: int = Field(default=8, ge=1)
+    outbox_retry_base_seconds: float = Field(default=5.0, gt=0)
+    outbox_retry_max_seconds: float = Field(default=3600.0, gt=0)
+    outbox_retention_days: int = Field(default=7, ge=1)
+    is_enable_reminder_scheduler: bool = False
+    booking_reminder_offset_hours: float = Field(default=24.0, gt=0)
+    reminder_poll_interval_seconds: float = Field(default=1.0, gt=0)
+    reminder_batch_size: int = Field(default=100, ge=1)
+    reminder_leader_ttl_seconds: float = Field(default=15.0, gt=0)
+    reminder_lease_seconds: float = Field(default=300.0, gt=0)
 
     class Config:
         env_file = ".env"
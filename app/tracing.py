@@ -0,0 +1,112 @@
+import functools
+from collections.abc import Awaitable, Callable, Sequence
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import ParamSpec, TypeVar
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, SpanKind
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.settings import Settings
+
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Until `setup_tracing` installs a provider this is a no-op tracer, so spans cost next to nothing when disabled.
+tracer = trace.get_tracer("app")
+
+
+class FileSpanExporter(SpanExporter):
+    """One JSON document per finished span, appended to a file; for local runs and tests without a collector."""
+
+    def __init__(self, path: str) -> None:
+        self.file = Path(path).open("a", encoding="utf-8")  # noqa: SIM115
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        self.file.writelines(span.to_json(indent=None) + "\n" for span in spans)
+        self.file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self.file.close()
+
+
+def setup_tracing(settings: Settings) -> TracerProvider | None:
+    match settings.tracing_exporter:
+        case "otlp":
+            # The protobuf exporter is the heaviest part of the SDK; only load it when it is used.
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter  # noqa: PLC0415
+
+            exporter: SpanExporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+        case "file":
+            exporter = FileSpanExporter(settings.tracing_file_path)
+        case _:
+            return None
+
+    provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: settings.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def start_client_span(dependency: str, operation: str) -> AbstractContextManager[Span | None]:
+    """Span for an outbound call, only inside a sampled trace so polling loops do not produce orphan traces."""
+    # Not `is_recording()`: a background task outlives the request span it was spawned under.
+    if not trace.get_current_span().get_span_context().trace_flags.sampled:
+        return nullcontext()
+    return tracer.start_as_current_span(
+        f"{dependency} {operation}",
+        kind=SpanKind.CLIENT,
+        attributes={"peer.service": dependency, "operation": operation},
+    )
+
+
+def traced(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """Run an async controller step in a span named after its qualified name."""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with tracer.start_as_current_span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+class TracingMiddleware:
+    """Server span per HTTP request, continuing the caller's trace from ``traceparent`` when present.
+
+    Tasks spawned by a handler (``asyncio.create_task`` copies the current context) stay in the request's trace.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
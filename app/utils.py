@@ -0,0 +1,4 @@
+def normalize_email(email: str) -> str:
+    local_part, _, domain = email.strip().lower().partition("@")
+    normalized_local = local_part.split("+", maxsplit=1)[0]
+    return f"{normalized_local}@{domain}" if domain else normalized_local
@@ -0,0 +1,197 @@
+"""Measure ``GET /booking/availability`` latency end to end through FastAPI, dishka and Redis.
+
+A fake database adapter stands in for Postgres: it is registered in the container over ``AppProvider``'s
+``IBookingDatabaseAdapter``, so the ``ClientBookingsAggregator`` serving the endpoint is the one that seeds the
+aggregates in a real Redis from generated histories. The numbers cover routing, DI, the Redis round trip of the read
+script, decoding the recent bookings and rule evaluation. A share of the clients (``--rejected-share``) has a booking
+two days before the requested time and is rejected by the minimum interval; a rejection also re-reads the bad
+connection flag of the client's past meetings, which the fake answers without a network round trip. The aggregate
+keys of the generated clients are deleted after the run; point ``BENCHMARK_REDIS_URL`` at a scratch database.
+
+Usage: python -m benchmarks.booking_availability [--requests 5000] [--clients 500] [--history 40]
+       [--rejected-share 0.3]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import time
+from typing import Any
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+LATENCY_BUDGET_SECONDS = 0.020
+EMAIL_DOMAIN = "availability-benchmark.local"
+
+
+class HistoryDatabase:
+    """Generated attendee histories; allowed clients only have meetings older than a year."""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        history: int,
+        rejected_share: float,
+        requested_start_time: datetime.datetime,
+    ) -> None:
+        self.rng = rng
+        self.history = history
+        self.rejected_share = rejected_share
+        self.requested_start_time = requested_start_time
+        self.attendee_bookings: dict[str, list] = {}
+
+    def generate(self, email: str) -> list:
+        from app.dtos import AttendeeBookingDTO
+
+        def build(index: int, start_time: datetime.datetime, status: str, *, bad_connection: bool) -> Any:
+            return AttendeeBookingDTO(
+                booking_id=index,
+                booking_uid=f"{email}-{index}",
+                name="Client",
+                email=email,
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1),
+                status=status,
+                bad_connection=bad_connection,
+            )
+
+        now = datetime.datetime.now(datetime.UTC)
+        attendee_bookings = [
+            build(
+                index,
+                now - datetime.timedelta(hours=self.rng.randint(24 * 400, 24 * 365 * 2)),
+                self.rng.choice(("accepted", "accepted", "accepted", "cancelled")),
+                bad_connection=self.rng.random() < 0.05,
+            )
+            for index in range(self.rng.randint(1, self.history))
+        ]
+        if self.rng.random() < self.rejected_share:
+            attendee_bookings.append(
+                build(
+                    len(attendee_bookings),
+                    self.requested_start_time - datetime.timedelta(days=2),
+                    "accepted",
+                    bad_connection=False,
+                ),
+            )
+        return sorted(attendee_bookings, key=lambda attendee_booking: attendee_booking.start_time)
+
+    async def get_attendee_bookings_by_email(self, *, email: str) -> list:
+        if email not in self.attendee_bookings:
+            self.attendee_bookings[email] = self.generate(email)
+        return self.attendee_bookings[email]
+
+    async def get_bad_connection_booking_uids(self, *, email: str, booking_uids: list[str]) -> list[str]:
+        requested = set(booking_uids)
+        return [
+            attendee_booking.booking_uid
+            for attendee_booking in self.attendee_bookings.get(email, [])
+            if attendee_booking.bad_connection and attendee_booking.booking_uid in requested
+        ]
+
+
+def build_history_database_provider(db: HistoryDatabase) -> Any:
+    from dishka import Provider, Scope, provide
+
+    from app.interfaces.booking import IBookingDatabaseAdapter
+
+    class HistoryDatabaseProvider(Provider):
+        # Registered after AppProvider, so it replaces the Postgres adapter for every dependent.
+        @provide(scope=Scope.APP)
+        def provide_db(self) -> IBookingDatabaseAdapter:
+            return db
+
+    return HistoryDatabaseProvider()
+
+
+async def run(redis_url: str, requests: int, clients: int, history: int, rejected_share: float) -> None:
+    import httpx
+    from dishka import make_async_container
+    from dishka.integrations.fastapi import FastapiProvider, setup_dishka
+    from fastapi import FastAPI
+    from redis.asyncio import Redis
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    from app.controllers.client_bookings import CLIENT_BOOKINGS_KEY_PREFIX
+    from app.interfaces.booking_constraints import IClientBookingsAggregator
+    from app.ioc import AppProvider
+    from app.routes import root_router
+
+    client = Redis.from_url(redis_url)
+    try:
+        await client.ping()
+    except RedisConnectionError:
+        print(f"Redis is not reachable at {redis_url}; set BENCHMARK_REDIS_URL")
+        raise SystemExit(1) from None
+
+    start_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=30)
+    db = HistoryDatabase(random.Random(0), history, rejected_share, start_time)
+    container = make_async_container(AppProvider(), FastapiProvider(), build_history_database_provider(db))
+    app = FastAPI()
+    setup_dishka(container, app)
+    app.include_router(root_router)
+
+    aggregator = await container.get(IClientBookingsAggregator)
+    emails = [f"client-{index}@{EMAIL_DOMAIN}" for index in range(clients)]
+    for email in emails:
+        await aggregator.rebuild(email)
+    headers = {"admin-api-token": os.environ["ADMIN_API_TOKEN"]}
+
+    timings = {True: [], False: []}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http_client:
+            for index in range(requests):
+                params = {"email": emails[index % len(emails)], "start_time": start_time.isoformat()}
+                started_at = time.perf_counter()
+                response = await http_client.get("/booking/availability", params=params, headers=headers)
+                elapsed = time.perf_counter() - started_at
+                response.raise_for_status()
+                timings[response.json()["is_allowed"]].append(elapsed)
+    finally:
+        await container.close()
+        keys = [key async for key in client.scan_iter(f"{CLIENT_BOOKINGS_KEY_PREFIX}:*@{EMAIL_DOMAIN}:*")]
+        if keys:
+            await client.delete(*keys)
+        await client.aclose()
+
+    def describe(samples: list[float]) -> str:
+        if len(samples) < 2:
+            return f"{len(samples)} requests"
+        quantiles = statistics.quantiles(samples, n=100)
+        return (
+            f"{len(samples)} requests, p50 {quantiles[49] * 1000:.2f}ms, p99 {quantiles[98] * 1000:.2f}ms, "
+            f"max {max(samples) * 1000:.2f}ms"
+        )
+
+    all_timings = timings[True] + timings[False]
+    p99 = statistics.quantiles(all_timings, n=100)[98]
+    print(f"requests: {requests}, clients: {clients}, bookings per client: up to {history}")
+    print(f"     all: {describe(all_timings)}")
+    print(f" allowed: {describe(timings[True])}")
+    print(f"rejected: {describe(timings[False])}")
+    if p99 > LATENCY_BUDGET_SECONDS:
+        print(f"p99 exceeded the {LATENCY_BUDGET_SECONDS * 1000:.0f}ms budget")
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--history", type=int, default=40)
+    parser.add_argument("--rejected-share", type=float, default=0.3)
+    args = parser.parse_args()
+
+    redis_url = os.environ.get("BENCHMARK_REDIS_URL", "redis://localhost:6379/15")
+    for key, value in {**BENCHMARK_ENV, "IS_ENABLE_BOOKING_CONSTRAINTS": "true", "REDIS_URL": redis_url}.items():
+        os.environ.setdefault(key, value)
+    asyncio.run(run(redis_url, args.requests, args.clients, args.history, args.rejected_share))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Compare the sorted-timeline constraints analyzer with the previous linear-scan implementation.
+
+First runs a randomized equivalence check (random histories, cancellations, bad connections, week-window edges)
+against ``legacy_analyze``, a copy of the scan-based algorithm, then times both on growing client histories.
+
+Usage: python -m benchmarks.booking_constraints [--cases 20000] [--seed 0] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import random
+import statistics
+import time
+from collections.abc import Callable
+from functools import partial
+
+from app.controllers.booking_constraints import BookingConstraintsAnalyzer, BookingTimeline
+from app.controllers.booking_rules import BookingRulesEngine
+from app.controllers.client_bookings import build_client_bookings_aggregate
+from app.dtos import AttendeeBookingDTO, BookingDTO
+
+
+HISTORY_SIZES = (10, 100, 1_000, 10_000)
+
+MIN_DAYS_BETWEEN_BOOKINGS = 7
+MAX_BOOKINGS_PER_MONTH = 2
+MAX_BOOKINGS_PER_YEAR = 10
+MONTHS_AFTER_CANCELLATION = 2
+
+
+def legacy_get_next_month_start(target_date: datetime.datetime) -> datetime.datetime:
+    if target_date.month == 12:
+        return target_date.replace(year=target_date.year + 1, month=1, day=1, hour=0, minute=0)
+    return target_date.replace(month=target_date.month + 1, day=1, hour=0, minute=0)
+
+
+def legacy_add_months(target_date: datetime.datetime, months: int) -> datetime.datetime:
+    # No month-end clamping: raises ValueError for Dec 31 + 2 months, as the scan-based analyzer did.
+    month = target_date.month - 1 + months
+    year = target_date.year + month // 12
+    month = month % 12 + 1
+    return target_date.replace(year=year, month=month)
+
+
+def legacy_resolve_result(
+    *,
+    booking: BookingDTO,
+    last_cancelled_booking: AttendeeBookingDTO | None,
+    nearest_future_booking: AttendeeBookingDTO | None,
+    monthly_bookings_count: int,
+    yearly_bookings_count: int,
+    close_bookings: list[AttendeeBookingDTO],
+) -> dict:
+    if last_cancelled_booking:
+        available_from_after_cancel = legacy_add_months(last_cancelled_booking.start_time, MONTHS_AFTER_CANCELLATION)
+        if booking.start_time < available_from_after_cancel:
+            return {
+                "is_allowed": False,
+                "available_from": available_from_after_cancel,
+                "rejection_type": "cancelled_booking",
+                "active_booking_start": None,
+            }
+
+    if nearest_future_booking:
+        return {
+            "is_allowed": False,
+            "available_from": nearest_future_booking.end_time,
+            "rejection_type": "has_active_booking",
+            "active_booking_start": nearest_future_booking.start_time,
+        }
+
+    available_dates = [booking.start_time]
+    is_monthly_limit_violated = monthly_bookings_count > MAX_BOOKINGS_PER_MONTH
+    if is_monthly_limit_violated:
+        available_dates.append(legacy_get_next_month_start(booking.start_time))
+    is_yearly_limit_violated = yearly_bookings_count > MAX_BOOKINGS_PER_YEAR
+    if is_yearly_limit_violated:
+        available_dates.append(
+            booking.start_time.replace(year=booking.start_time.year + 1, month=1, day=1, hour=0, minute=0),
+        )
+    available_dates.extend(
+        attendee_booking.start_time + datetime.timedelta(days=MIN_DAYS_BETWEEN_BOOKINGS)
+        for attendee_booking in close_bookings
+    )
+
+    if is_monthly_limit_violated or is_yearly_limit_violated or close_bookings:
+        if is_monthly_limit_violated:
+            rejection_type = "month_limit"
+        elif is_yearly_limit_violated:
+            rejection_type = "year_limit"
+        else:
+            rejection_type = "min_interval"
+        return {
+            "is_allowed": False,
+            "available_from": max(available_dates),
+            "rejection_type": rejection_type,
+            "active_booking_start": None,
+        }
+
+    return {
+        "is_allowed": True,
+        "available_from": booking.start_time,
+        "rejection_type": None,
+        "active_booking_start": None,
+    }
+
+
+def legacy_analyze(
+    booking: BookingDTO,
+    attendee_bookings: list[AttendeeBookingDTO],
+    now: datetime.datetime,
+) -> dict:
+    last_cancelled_booking = max(
+        (
+            attendee_booking
+            for attendee_booking in attendee_bookings
+            if attendee_booking.status == "cancelled" and attendee_booking.booking_uid != booking.uid
+        ),
+        key=lambda attendee_booking: attendee_booking.start_time,
+        default=None,
+    )
+    active_bookings = [
+        attendee_booking for attendee_booking in attendee_bookings if not attendee_booking.bad_connection
+    ]
+    other_active_bookings = [
+        attendee_booking for attendee_booking in active_bookings if attendee_booking.booking_uid != booking.uid
+    ]
+    nearest_future_booking = min(
+        (attendee_booking for attendee_booking in other_active_bookings if attendee_booking.start_time > now),
+        key=lambda attendee_booking: attendee_booking.start_time,
+        default=None,
+    )
+    return legacy_resolve_result(
+        booking=booking,
+        last_cancelled_booking=last_cancelled_booking,
+        nearest_future_booking=nearest_future_booking,
+        monthly_bookings_count=sum(
+            1
+            for attendee_booking in active_bookings
+            if attendee_booking.start_time.year == booking.start_time.year
+            and attendee_booking.start_time.month == booking.start_time.month
+        ),
+        yearly_bookings_count=sum(
+            1 for attendee_booking in active_bookings if attendee_booking.start_time.year == booking.start_time.year
+        ),
+        close_bookings=[
+            attendee_booking
+            for attendee_booking in other_active_bookings
+            if abs((booking.start_time - attendee_booking.start_time).days) < MIN_DAYS_BETWEEN_BOOKINGS
+        ],
+    )
+
+
+def build_attendee_booking(
+    rng: random.Random,
+    booking_uid: str,
+    start_time: datetime.datetime,
+) -> AttendeeBookingDTO:
+    return AttendeeBookingDTO(
+        booking_id=abs(hash(booking_uid)),
+        booking_uid=booking_uid,
+        name="Client",
+        email="client@example.com",
+        start_time=start_time,
+        end_time=start_time + datetime.timedelta(hours=1),
+        status=rng.choice(("accepted", "accepted", "accepted", "cancelled")),
+        bad_connection=rng.random() < 0.1,
+    )
+
+
+def build_case(
+    rng: random.Random,
+    now: datetime.datetime,
+    history_size: int,
+) -> tuple[BookingDTO, list[AttendeeBookingDTO]]:
+    start_time = now + datetime.timedelta(hours=rng.randint(-24 * 30, 24 * 60))
+    booking = BookingDTO(
+        created_at=now,
+        end_time=start_time + datetime.timedelta(hours=1),
+        ical_sequence=0,
+        id=0,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="accepted",
+        title="Consultation",
+        uid="new-booking",
+    )
+
+    attendee_bookings = []
+    for index in range(history_size):
+        if rng.random() < 0.2:
+            # Exactly on the boundaries of the minimum-interval window, where floored days matter.
+            offset = datetime.timedelta(days=rng.choice((-7, -6, 6, 7)), seconds=rng.choice((-1, 0, 1)))
+            attendee_start_time = start_time + offset
+        else:
+            attendee_start_time = now + datetime.timedelta(hours=rng.randint(-24 * 365 * 3, 24 * 90))
+        attendee_bookings.append(build_attendee_booking(rng, f"booking-{index}", attendee_start_time))
+    if rng.random() < 0.9:
+        attendee_bookings.append(build_attendee_booking(rng, booking.uid, booking.start_time))
+    rng.shuffle(attendee_bookings)
+    return booking, attendee_bookings
+
+
+def check_equivalence(analyzer: BookingConstraintsAnalyzer, cases: int, seed: int) -> tuple[int, int]:
+    rng = random.Random(seed)
+    mismatches = skipped = 0
+    for _ in range(cases):
+        now = datetime.datetime.now(datetime.UTC)
+        booking, attendee_bookings = build_case(rng, now, rng.randint(0, 30))
+        try:
+            expected = legacy_analyze(booking, attendee_bookings, now)
+        except ValueError:
+            # Month-end cancellations the legacy algorithm could not handle; the rules engine clamps them.
+            skipped += 1
+            continue
+        actual = analyzer.analyze_timeline(
+            booking_uid=booking.uid,
+            start_time=booking.start_time,
+            timeline=BookingTimeline(attendee_bookings),
+            now=now,
+        )
+        from_aggregate = analyzer.analyze_on_create_from_aggregate(
+            booking=booking,
+            aggregate=build_client_bookings_aggregate("client@example.com", attendee_bookings),
+        )
+        if not expected == actual == from_aggregate:
+            mismatches += 1
+            print(f"mismatch: legacy={expected} timeline={actual} aggregate={from_aggregate}")
+    return mismatches, skipped
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    analyzer = BookingConstraintsAnalyzer(rules_engine=BookingRulesEngine())
+    mismatches, skipped = check_equivalence(analyzer, args.cases, args.seed)
+    print(f"equivalence: {args.cases} cases, {mismatches} mismatches, {skipped} skipped (legacy month-end errors)")
+
+    rng = random.Random(args.seed)
+    now = datetime.datetime.now(datetime.UTC)
+    print(f"{'history':>8} {'legacy':>12} {'full history':>14} {'aggregate':>12}")
+    for history_size in HISTORY_SIZES:
+        booking, attendee_bookings = build_case(rng, now, history_size)
+        aggregate = build_client_bookings_aggregate("client@example.com", attendee_bookings)
+        legacy = measure(partial(legacy_analyze, booking, attendee_bookings, now), args.repeat)
+        full_history = measure(
+            partial(analyzer.analyze_on_create, booking=booking, attendee_bookings=attendee_bookings),
+            args.repeat,
+        )
+        from_aggregate = measure(
+            partial(analyzer.analyze_on_create_from_aggregate, booking=booking, aggregate=aggregate),
+            args.repeat,
+        )
+        print(
+            f"{history_size:>8} {legacy * 1_000_000:>10.1f}us {full_history * 1_000_000:>12.1f}us "
+            f"{from_aggregate * 1_000_000:>10.1f}us",
+        )
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
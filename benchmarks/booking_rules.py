@@ -0,0 +1,143 @@
+"""Measure booking rule evaluation on large client histories, alone and through the analyzer entry points.
+
+For every history size and plan three paths are timed:
+
+- ``evaluate``: ``BookingRulesEngine.evaluate`` on a prebuilt timeline, the rules alone;
+- ``aggregate``: ``analyze_on_create_from_aggregate`` on an aggregate trimmed to the rules horizon, as read from
+  Redis on the create path (the Redis round trip is covered by ``benchmarks.booking_availability``);
+- ``full history``: ``analyze_on_create`` on the unsorted attendee bookings from Postgres, which sorts and builds
+  the timeline first and grows with the history (several milliseconds at 10k bookings).
+
+Only the first two are held to the per-call budget.
+
+Usage: python -m benchmarks.booking_rules [--repeat 5]
+"""
+
+import argparse
+import datetime
+import random
+import timeit
+from collections.abc import Callable
+from functools import partial
+
+from app.controllers.booking_constraints import BookingConstraintsAnalyzer, BookingTimeline
+from app.controllers.booking_rules import BookingRulesEngine
+from app.controllers.client_bookings import build_client_bookings_aggregate
+from app.dtos import AttendeeBookingDTO, BookingDTO
+from app.settings import BookingConstraintsRules
+
+
+HISTORY_SIZES = (10, 1_000, 10_000, 100_000)
+BUDGET_SECONDS = 0.001
+BUDGETED_PATHS = ("evaluate", "aggregate")
+
+
+def build_attendee_bookings(rng: random.Random, now: datetime.datetime, history_size: int) -> list[AttendeeBookingDTO]:
+    attendee_bookings = []
+    for index in range(history_size):
+        start_time = now - datetime.timedelta(hours=rng.randint(1, 24 * 365 * 5))
+        attendee_bookings.append(
+            AttendeeBookingDTO(
+                booking_id=index,
+                booking_uid=f"booking-{index}",
+                name="Client",
+                email="client@example.com",
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(hours=1),
+                status=rng.choice(("accepted", "accepted", "accepted", "cancelled")),
+                bad_connection=rng.random() < 0.1,
+            ),
+        )
+    return attendee_bookings
+
+
+def build_booking(start_time: datetime.datetime, now: datetime.datetime) -> BookingDTO:
+    return BookingDTO(
+        created_at=now,
+        end_time=start_time + datetime.timedelta(hours=1),
+        ical_sequence=0,
+        id=0,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="accepted",
+        title="Consultation",
+        uid="new-booking",
+    )
+
+
+def build_paths(
+    engine: BookingRulesEngine,
+    booking: BookingDTO,
+    attendee_bookings: list[AttendeeBookingDTO],
+    now: datetime.datetime,
+) -> dict[str, Callable[[], object]]:
+    analyzer = BookingConstraintsAnalyzer(rules_engine=engine)
+    full_aggregate = build_client_bookings_aggregate("client@example.com", attendee_bookings)
+    timeline = BookingTimeline(
+        full_aggregate.bookings,
+        is_sorted=True,
+        monthly_counts=full_aggregate.monthly_counts,
+        yearly_counts=full_aggregate.yearly_counts,
+    )
+    aggregate = build_client_bookings_aggregate(
+        "client@example.com",
+        attendee_bookings,
+        window_start=now - engine.horizon,
+    )
+    return {
+        "evaluate": partial(
+            engine.evaluate,
+            event_type_id=None,
+            booking_uid=booking.uid,
+            start_time=booking.start_time,
+            timeline=timeline,
+            now=now,
+        ),
+        "aggregate": partial(analyzer.analyze_on_create_from_aggregate, booking=booking, aggregate=aggregate),
+        "full history": partial(analyzer.analyze_on_create, booking=booking, attendee_bookings=attendee_bookings),
+    }
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    """Best time of one call in seconds."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engines = {
+        "all rules": BookingRulesEngine(),
+        "limits only": BookingRulesEngine(
+            default_rules=BookingConstraintsRules(months_after_cancellation=None, is_single_active_booking=False),
+        ),
+    }
+    rng = random.Random(args.seed)
+    now = datetime.datetime.now(datetime.UTC)
+    booking = build_booking(now + datetime.timedelta(days=30), now)
+
+    print(f"{'history':>8} {'plan':>12} {'path':>13} {'per call':>12}")
+    over_budget = []
+    for history_size in HISTORY_SIZES:
+        attendee_bookings = build_attendee_bookings(rng, now, history_size)
+        for name, engine in engines.items():
+            for path, function in build_paths(engine, booking, attendee_bookings, now).items():
+                seconds = measure(function, args.repeat)
+                print(f"{history_size:>8} {name:>12} {path:>13} {seconds * 1_000_000:>10.2f}us")
+                if path in BUDGETED_PATHS and seconds > BUDGET_SECONDS:
+                    over_budget.append(f"{path}[{history_size}, {name}]")
+
+    if over_budget:
+        print(f"exceeded the {BUDGET_SECONDS * 1000:.0f}ms budget: {', '.join(over_budget)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Measure the dependency-injection cost of handling one event with the request-scoped and app-scoped graphs.
+
+The container is built from the real ``AppProvider`` (nothing connects: the engine, Redis pool, bot and adapters
+only open connections on first use). The ``request`` graph re-registers the booking controllers, their SQL
+adapters and a session in ``Scope.REQUEST``, as ``app/ioc.py`` did before, so every event enters a scope,
+builds ``BookingController`` with its whole subgraph and closes the session on exit. With the ``app`` graph the
+controller is built once; DishkaRoute endpoints still enter and exit a request scope, background tasks and loops
+resolve straight from the app container.
+
+Usage: python -m benchmarks.di_scopes [--events 20000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+def build_request_scoped_provider() -> Any:
+    from dishka import Provider, Scope, provide
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app.adapters.db import BookingDatabaseAdapter
+    from app.adapters.outbox import OutboxRepository
+    from app.adapters.sql import SqlExecutor
+    from app.controllers.booking import BookingController
+    from app.controllers.booking_availability import BookingAvailabilityController
+    from app.controllers.booking_constraints import BookingConstraintsAnalyzer
+    from app.controllers.client_bookings import ClientBookingsAggregator
+    from app.controllers.meet_webhook import MeetWebhookController
+    from app.controllers.meeting import MeetingController
+    from app.controllers.notification import NotificationController
+    from app.controllers.outbox import OutboxRelay
+    from app.interfaces.booking import IBookingController, IBookingDatabaseAdapter
+    from app.interfaces.booking_constraints import (
+        IBookingAvailabilityController,
+        IBookingConstraintsAnalyzer,
+        IClientBookingsAggregator,
+    )
+    from app.interfaces.meeting import IMeetingController, IMeetWebhookController
+    from app.interfaces.notification import INotificationController
+    from app.interfaces.outbox import IOutboxRelay, IOutboxRepository
+    from app.interfaces.sql import ISqlExecutor, UnitOfWorkFactory
+
+    class RequestScopedProvider(Provider):
+        scope = Scope.REQUEST
+
+        @provide
+        async def provide_session(
+            self,
+            sessionmaker: async_sessionmaker[AsyncSession],
+        ) -> AsyncGenerator[AsyncSession, Any]:
+            async with sessionmaker() as session:
+                yield session
+
+        @provide
+        def provide_sql_executor(self, _: AsyncSession, sessionmaker: async_sessionmaker[AsyncSession]) -> ISqlExecutor:
+            return SqlExecutor(sessionmaker)
+
+        @provide
+        def provide_unit_of_work(self, sql: ISqlExecutor) -> UnitOfWorkFactory:
+            return sql.unit_of_work
+
+        db = provide(BookingDatabaseAdapter, provides=IBookingDatabaseAdapter)
+        outbox = provide(OutboxRepository, provides=IOutboxRepository)
+        outbox_relay = provide(OutboxRelay, provides=IOutboxRelay)
+        constraints_analyzer = provide(BookingConstraintsAnalyzer, provides=IBookingConstraintsAnalyzer)
+        client_bookings_aggregator = provide(ClientBookingsAggregator, provides=IClientBookingsAggregator)
+        availability_controller = provide(BookingAvailabilityController, provides=IBookingAvailabilityController)
+        meeting_controller = provide(MeetingController, provides=IMeetingController)
+        notification_controller = provide(NotificationController, provides=INotificationController)
+        meet_webhook_controller = provide(MeetWebhookController, provides=IMeetWebhookController)
+        booking_controller = provide(BookingController, provides=IBookingController)
+
+    return RequestScopedProvider()
+
+
+async def measure(events: int, resolve: Callable[[], Awaitable[object]]) -> float:
+    await resolve()
+    started_at = time.perf_counter()
+    for _ in range(events):
+        await resolve()
+    return (time.perf_counter() - started_at) / events
+
+
+async def run(events: int, repeat: int) -> None:
+    from dishka import AsyncContainer, Scope, make_async_container
+
+    from app.interfaces.booking import IBookingController
+    from app.ioc import AppProvider
+
+    async def in_request_scope(container: AsyncContainer) -> object:
+        async with container(scope=Scope.REQUEST) as request_container:
+            return await request_container.get(IBookingController)
+
+    request_graph = make_async_container(AppProvider(), build_request_scoped_provider())
+    app_graph = make_async_container(AppProvider())
+    scenarios = {
+        "request graph, request scope": lambda: in_request_scope(request_graph),
+        "app graph, request scope": lambda: in_request_scope(app_graph),
+        "app graph, no scope": lambda: app_graph.get(IBookingController),
+    }
+    try:
+        for name, resolve in scenarios.items():
+            timings = [await measure(events, resolve) for _ in range(repeat)]
+            print(f"{name:>30}: {statistics.median(timings) * 1e6:7.2f}us per event (median of {repeat})")
+    finally:
+        await request_graph.close()
+        await app_graph.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    asyncio.run(run(args.events, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Local stand-ins for the external HTTP services the app calls, with injectable latency and errors.
+
+Every service gets its own port (the GetStream SDK drops any path prefix of its base URL):
+
+- ``telegram``: the Bot API (``TELEGRAM_API_URL``); ``getWebhookInfo`` and ``sendMessage`` return minimal objects,
+  every other method ``true``.
+- ``unisender``: ``/email/send.json`` (``EMAIL_API_URL``).
+- ``shortener``: ``/api/v1/urls/shorten`` and ``/api/v1/urls/external/{id}`` (``SHORTNER_URL``).
+- ``stream``: any GetStream REST call (``STREAM_CHAT_URL``).
+
+A fake sleeps for its ``latency`` before answering and fails an ``error_rate`` share of calls with a 500.
+Run standalone to point a local app at the fakes; ``benchmarks.load_test`` starts them in-process.
+
+Usage: python -m benchmarks.fake_services [--latency-ms telegram=80] [--error-rate unisender=0.05]
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable
+
+from aiohttp import web
+
+
+SERVICES = ("telegram", "unisender", "shortener", "stream")
+# Environment variable the app reads each fake's base URL from.
+SERVICE_URL_ENV = {
+    "telegram": "TELEGRAM_API_URL",
+    "unisender": "EMAIL_API_URL",
+    "shortener": "SHORTNER_URL",
+    "stream": "STREAM_CHAT_URL",
+}
+STREAM_OPERATIONS = frozenset({"users", "channels", "query", "message", "messages", "truncate"})
+
+
+class FakeServices:
+    def __init__(
+        self,
+        *,
+        latencies_seconds: dict[str, float] | None = None,
+        error_rates: dict[str, float] | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.latencies_seconds = latencies_seconds or {}
+        self.error_rates = error_rates or {}
+        self.random = random.Random(seed)
+        self.calls: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.errors: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.urls: dict[str, str] = {}
+        self._runners: list[web.AppRunner] = []
+        self._ids = 0
+
+    async def start(self, host: str = "127.0.0.1", ports: dict[str, int] | None = None) -> dict[str, str]:
+        handlers: dict[str, list[web.RouteDef]] = {
+            "telegram": [web.post("/bot{token}/{method}", self.telegram)],
+            "unisender": [web.post("/email/send.json", self.unisender)],
+            "shortener": [web.route("*", "/api/v1/urls/{operation}{tail:.*}", self.shortener)],
+            "stream": [web.route("*", "/{tail:.*}", self.stream)],
+        }
+        for service, routes in handlers.items():
+            app = web.Application()
+            app.add_routes(routes)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, host, (ports or {}).get(service, 0)).start()
+            self._runners.append(runner)
+            bound_host, bound_port = runner.addresses[0][:2]
+            self.urls[service] = f"http://{bound_host}:{bound_port}"
+        return self.urls
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    def env(self) -> dict[str, str]:
+        return {SERVICE_URL_ENV[service]: url for service, url in self.urls.items()}
+
+    async def _is_failing(self, service: str, operation: str) -> bool:
+        self.calls[service, operation] += 1
+        if latency := self.latencies_seconds.get(service):
+            await asyncio.sleep(latency)
+        if self.random.random() < self.error_rates.get(service, 0):
+            self.errors[service, operation] += 1
+            return True
+        return False
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    async def telegram(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if await self._is_failing("telegram", method):
+            return web.json_response(
+                {"ok": False, "error_code": 500, "description": "Internal Server Error: injected"},
+                status=500,
+            )
+        form = await request.post()
+        match method.lower():
+            case "getwebhookinfo":
+                result: object = {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+            case "sendmessage":
+                result = {
+                    "message_id": self._next_id(),
+                    "date": int(time.time()),
+                    "chat": {"id": int(str(form["chat_id"])), "type": "private"},
+                    "text": form.get("text", ""),
+                }
+            case _:
+                result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def unisender(self, request: web.Request) -> web.Response:
+        if await self._is_failing("unisender", "send"):
+            return web.json_response({"status": "error", "code": 500, "message": "injected"}, status=500)
+        payload = await request.json()
+        recipients = [recipient["email"] for recipient in payload.get("message", {}).get("recipients", [])]
+        return web.json_response({"status": "success", "job_id": f"job-{self._next_id()}", "emails": recipients})
+
+    async def shortener(self, request: web.Request) -> web.Response:
+        if await self._is_failing("shortener", f"{request.method} {request.match_info['operation']}"):
+            return web.json_response({"detail": "injected"}, status=500)
+        if request.method == "DELETE":
+            return web.json_response({})
+        return web.json_response({"ident": f"s{self._next_id()}"})
+
+    async def stream(self, request: web.Request) -> web.Response:
+        operation = "/".join(part for part in request.path.split("/") if part in STREAM_OPERATIONS)
+        if await self._is_failing("stream", f"{request.method} {operation}"):
+            return web.json_response({"code": -1, "message": "injected", "StatusCode": 500}, status=500)
+        channel_type, channel_id = [*request.path.split("/"), "", "", ""][2:4]
+        return web.json_response(
+            {
+                "duration": "0.01ms",
+                "channel": {"id": channel_id, "type": channel_type},
+                "members": [],
+                "messages": [],
+            },
+        )
+
+
+def parse_service_values(values: list[str], scale: float = 1) -> dict[str, float]:
+    """``["telegram=80", "stream=0.1"]`` into ``{"telegram": 80 * scale, ...}``; ``all=`` sets every service."""
+    parsed: dict[str, float] = {}
+    for value in values:
+        service, _, number = value.partition("=")
+        if service != "all" and service not in SERVICES:
+            raise SystemExit(f"unknown service {service!r}, expected one of {', '.join(SERVICES)}")
+        for name in SERVICES if service == "all" else (service,):
+            parsed[name] = float(number) * scale
+    return parsed
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", nargs="*", default=[], metavar="SERVICE=MS", help="e.g. all=20 telegram=80")
+    parser.add_argument("--error-rate", nargs="*", default=[], metavar="SERVICE=RATIO", help="e.g. unisender=0.05")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def build_from_arguments(args: argparse.Namespace) -> FakeServices:
+    return FakeServices(
+        latencies_seconds=parse_service_values(args.latency_ms, scale=1 / 1000),
+        error_rates=parse_service_values(args.error_rate),
+        seed=args.seed,
+    )
+
+
+async def serve(fakes: FakeServices, ports: dict[str, int], until: Callable[[], Awaitable[None]]) -> None:
+    await fakes.start(ports=ports)
+    try:
+        for name, url in fakes.env().items():
+            print(f"{name}={url}")
+        await until()
+    finally:
+        await fakes.stop()
+        for (service, operation), count in sorted(fakes.calls.items()):
+            print(f"{service:>10} {operation:<32} {count:6d} calls, {fakes.errors[service, operation]} injected errors")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_fault_arguments(parser)
+    parser.add_argument("--base-port", type=int, default=8090, help="services listen on consecutive ports from here")
+    args = parser.parse_args()
+
+    ports = {service: args.base_port + index for index, service in enumerate(SERVICES)}
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(build_from_arguments(args), ports, until=asyncio.Event().wait))
+
+
+if __name__ == "__main__":
+    main()
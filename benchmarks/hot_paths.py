@@ -0,0 +1,288 @@
+"""Micro-benchmarks of the per-event hot paths, compared against a committed JSON baseline.
+
+Each case times one call with ``timeit`` (``autorange`` picks the loop count, the best of ``--repeat`` runs is
+kept) and is compared with ``benchmarks/baselines/hot_paths.json``; a case slower than the baseline by more than
+``--threshold`` is reported as a regression and the run exits with 1. ``--save`` rewrites the baseline, so a change
+that moves a hot path shows up in review as a diff of that file. Timings only compare on the same machine and
+Python: re-save the baseline on the reference machine rather than trusting numbers from a laptop.
+
+The signature checks run the route helpers on 256 KiB and 1 MiB bodies; ``analyze_on_create`` runs on client
+histories from 10 to 10k bookings.
+
+Usage: python -m benchmarks.hot_paths [--repeat 5] [--threshold 0.25] [--filter jitsi] [--save]
+"""
+
+import argparse
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import timeit
+from collections.abc import Callable, Coroutine
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "hot_paths.json"
+HISTORY_SIZES = (10, 100, 1_000, 10_000)
+PAYLOAD_SIZES = {"256k": 256 * 1024, "1m": 1024 * 1024}
+
+Case = Callable[[], object]
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """Drive a coroutine that never suspends, without the event loop overhead in the timing."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("coroutine suspended")
+
+
+def build_booking_row(index: int) -> dict[str, Any]:
+    # "timestamp without time zone" columns come back naive.
+    start_time = datetime.datetime(2025, 3, 14, 12, 0) + datetime.timedelta(hours=index)  # noqa: DTZ001
+    return {
+        "id": index,
+        "uid": f"booking-{index}",
+        "userId": 1,
+        "eventTypeId": 1,
+        "title": "Consultation",
+        "description": "First session",
+        "startTime": start_time,
+        "endTime": start_time + datetime.timedelta(minutes=60),
+        "createdAt": start_time - datetime.timedelta(days=3),
+        "updatedAt": None,
+        "location": "integrations:daily",
+        "paid": False,
+        "status": "accepted",
+        "cancellationReason": None,
+        "rejectionReason": None,
+        "fromReschedule": None,
+        "rescheduled": None,
+        "dynamicEventSlugRef": None,
+        "dynamicGroupSlugRef": None,
+        "recurringEventId": None,
+        "customInputs": {},
+        "smsReminderNumber": None,
+        "destinationCalendarId": None,
+        "scheduledJobs": [],
+        "metadata": {"videoCallUrl": "https://meet.example.com/room"},
+        "responses": {"name": "Client", "email": "client@example.com", "notes": "Anxiety"},
+        "isRecorded": False,
+        "iCalSequence": 0,
+        "iCalUID": f"booking-{index}@example.com",
+        "userPrimaryEmail": "organizer@example.com",
+        "idempotencyKey": None,
+        "noShowHost": False,
+        "rating": None,
+        "ratingFeedback": None,
+        "cancelledBy": None,
+        "rescheduledBy": None,
+        "oneTimePassword": None,
+        "reassignReason": None,
+        "reassignById": None,
+        "user_id_val": 1,
+        "user_name": "Organizer",
+        "user_email": "organizer@example.com",
+        "user_locked": False,
+        "user_time_zone": "Europe/Moscow",
+        "user_telegram_chat_id": 123456,
+        "user_telegram_token": "token",
+        "client_name": "Client",
+        "client_email": "client@example.com",
+        "client_time_zone": "Europe/Berlin",
+    }
+
+
+def build_request(body: bytes, app: Any, headers: list[tuple[bytes, bytes]] | None = None) -> Any:
+    from starlette.requests import Request
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": headers or [], "app": app}
+    return Request(scope, receive)
+
+
+def build_cases(settings: Any) -> dict[str, Case]:
+    from app.adapters.db import BookingDatabaseAdapter
+    from app.adapters.get_stream import GetStreamAdapter
+    from app.clients.models import EmailAddress
+    from app.clients.unisender_go_client.models.requests import SendMessageRequest
+    from app.controllers.booking_constraints import BookingConstraintsAnalyzer
+    from app.controllers.booking_rules import BookingRulesEngine
+    from app.controllers.meeting import MeetingController
+    from app.controllers.notification import NotificationController
+    from app.controllers.telegram_templates import TelegramNotificationRenderer
+    from app.controllers.time_zones import TimeZoneService
+    from app.dtos import TriggerEvent
+    from app.routes import validate_mail_signature, validate_signature
+    from benchmarks.booking_constraints import build_case
+
+    cases: dict[str, Case] = {}
+    row = build_booking_row(1)
+    booking = BookingDatabaseAdapter._fill_booking_dto(row)  # noqa: SLF001
+    cases["fill_booking_dto"] = partial(BookingDatabaseAdapter._fill_booking_dto, row)  # noqa: SLF001
+
+    analyzer = BookingConstraintsAnalyzer(rules_engine=BookingRulesEngine())
+    rng = random.Random(0)
+    now = datetime.datetime.now(datetime.UTC)
+    for history_size in HISTORY_SIZES:
+        new_booking, attendee_bookings = build_case(rng, now, history_size)
+        cases[f"analyze_on_create[{history_size}]"] = partial(
+            analyzer.analyze_on_create,
+            booking=new_booking,
+            attendee_bookings=attendee_bookings,
+        )
+
+    time_zone_service = TimeZoneService()
+    # No rendered-text cache: the case measures the render, not an LRU hit.
+    renderer = TelegramNotificationRenderer(settings, time_zone_service, max_size=0)
+    cases["telegram_text"] = partial(
+        renderer.render,
+        booking=booking,
+        time_zone=booking.user.time_zone,
+        meeting_url="https://meet.example.com/room",
+        trigger_event=TriggerEvent.BOOKING_RESCHEDULED,
+    )
+    notification_controller = NotificationController(
+        db=None,
+        bot=None,
+        settings=settings,
+        email_controller=None,
+        booking_rules_engine=BookingRulesEngine(),
+        time_zone_service=time_zone_service,
+        telegram_renderer=renderer,
+        outbox=None,
+    )
+    prepare_email_context = partial(
+        notification_controller._prepare_email_context,  # noqa: SLF001
+        booking=booking,
+        trigger_event=TriggerEvent.BOOKING_CREATED,
+        participant_time_zone=booking.client.time_zone,
+        meeting_url="https://meet.example.com/room",
+        additional_context={"organizer_name": booking.user.name},
+    )
+    cases["prepare_email_context"] = prepare_email_context
+
+    send_message_request = SendMessageRequest(
+        to=[EmailAddress(email="client@example.com")],
+        from_address=EmailAddress(email="bot@example.com", name="Booking"),
+        reply_address=EmailAddress(email="organizer@example.com", name="Organizer"),
+        subject="Booking confirmed",
+        context=prepare_email_context(),
+        template_id="booking-created",
+    )
+    cases["send_message_request_dump"] = send_message_request.model_dump
+
+    chat_adapter = GetStreamAdapter("chat", "chat-secret", "chat-encryption-key")
+    cases["encode_user_id"] = partial(chat_adapter._encode_user_id, user_id="organizer@example.com")  # noqa: SLF001
+
+    meeting_controller = MeetingController(
+        db=None,
+        shortener=None,
+        chat_controller=None,
+        booking_cache=None,
+        settings=settings,
+    )
+    cases["create_jitsi_token"] = partial(
+        meeting_controller._create_jitsi_token,  # noqa: SLF001
+        booking=booking,
+        participant_name="Client",
+        external_id_prefix="client-",
+    )
+
+    class SettingsContainer:
+        async def get(self, _: type) -> Any:
+            return settings
+
+    app = SimpleNamespace(state=SimpleNamespace(dishka_container=SettingsContainer()))
+    for label, size in PAYLOAD_SIZES.items():
+        booking_body = json.dumps(
+            {"triggerEvent": "BOOKING_CREATED", "payload": {"responses": {"notes": "x" * size}}},
+        ).encode()
+        signature = hmac.new(settings.cal_signature.encode(), booking_body, hashlib.sha256).hexdigest()
+
+        def check_booking(body: bytes = booking_body, signature: str = signature) -> bool:
+            return run_sync(validate_signature(signature, build_request(body, app)))
+
+        events = [{"event_name": "transactional_email_status", "event_data": {"email": "client@example.com"}}]
+        mail_body = '{"auth":"%s","events_by_user":[{"events":%s,"padding":"%s"}]}'
+        unsigned = mail_body % (settings.email_api_key, json.dumps(events), "x" * size)
+        auth = hashlib.md5(unsigned.encode()).hexdigest()  # noqa: S324
+        signed_mail_body = (mail_body % (auth, json.dumps(events), "x" * size)).encode()
+
+        def check_mail(body: bytes = signed_mail_body) -> bool:
+            return run_sync(validate_mail_signature(build_request(body, app), settings))
+
+        if not (check_booking() and check_mail()):
+            raise RuntimeError(f"signature fixtures for {label} do not validate")
+        cases[f"validate_signature[{label}]"] = check_booking
+        cases[f"validate_mail_signature[{label}]"] = check_mail
+    return cases
+
+
+def measure(case: Case, repeat: int) -> float:
+    """Best time of one call in microseconds."""
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown over the baseline, 0.25 = 25%%")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from app.settings import Settings
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"python": None, "cases": {}}
+    if baseline["python"] not in {None, platform.python_version()}:
+        print(f"baseline was recorded on Python {baseline['python']}, this is {platform.python_version()}")
+
+    results: dict[str, float] = {}
+    regressions = []
+    print(f"{'case':<34} {'us':>12} {'baseline':>12} {'change':>8}")
+    for name, case in build_cases(Settings()).items():
+        if args.filter not in name:
+            continue
+        results[name] = microseconds = measure(case, args.repeat)
+        expected = baseline["cases"].get(name)
+        if expected is None:
+            print(f"{name:<34} {microseconds:>12.2f} {'-':>12} {'new':>8}")
+            continue
+        change = microseconds / expected - 1
+        print(f"{name:<34} {microseconds:>12.2f} {expected:>12.2f} {change:>+8.0%}")
+        if change > args.threshold:
+            regressions.append(name)
+
+    if args.save:
+        cases = {**baseline["cases"], **{name: round(value, 3) for name, value in results.items()}}
+        args.baseline.parent.mkdir(exist_ok=True)
+        args.baseline.write_text(
+            json.dumps({"python": platform.python_version(), "cases": dict(sorted(cases.items()))}, indent=2) + "\n",
+        )
+        print(f"saved {len(results)} cases to {args.baseline}")
+    elif regressions:
+        print(f"slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Measure the logging cost of processing a booking event under each logging profile.
+
+Every profile runs in its own process (structlog caches configured loggers on first use) and handles the same
+cancellation event through ``BookingController`` with the instant fakes from ``benchmarks.notification_fan_out``.
+Logs are rendered as JSON to a sink that blocks for ``--write-latency-us`` per write, standing in for a slow stdout
+pipe (0 behaves like ``/dev/null``). The ``silent`` profile drops every event and is the baseline.
+
+- ``legacy``: callsite parameters on every event, rendering and writing on the event loop (the former setup).
+- ``callsite_warning``: callsite parameters only at WARNING+, still rendered on the event loop.
+- ``off_loop``: callsite parameters only at WARNING+, rendered and written by a ``QueueListener`` thread.
+
+Usage: python -m benchmarks.logging_overhead [--events 2000] [--write-latency-us 0 100]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+PROFILES = {
+    "silent": None,
+    "legacy": {"callsite_level": logging.NOTSET, "is_off_loop": False},
+    "callsite_warning": {"callsite_level": logging.WARNING, "is_off_loop": False},
+    "off_loop": {"callsite_level": logging.WARNING, "is_off_loop": True},
+}
+
+
+def configure(profile: str) -> None:
+    import structlog
+
+    from app.config.logger import setup_logger
+
+    options = PROFILES[profile]
+    if options is None:
+        structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+        return
+    setup_logger(log_level=logging.DEBUG, console_render=False, **options)
+
+
+class SlowSink:
+    def __init__(self, write_latency_seconds: float) -> None:
+        self.write_latency_seconds = write_latency_seconds
+
+    def write(self, text: str) -> int:
+        if self.write_latency_seconds:
+            time.sleep(self.write_latency_seconds)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+async def handle_events(events: int) -> float:
+    from app.dtos import BookingEventDTO, TriggerEvent
+    from app.settings import Settings
+    from benchmarks import notification_fan_out
+
+    notification_fan_out.LATENCIES_SECONDS.update(dict.fromkeys(notification_fan_out.LATENCIES_SECONDS, 0))
+    controller = notification_fan_out.build_booking_controller(notification_fan_out.FakeCalls(), Settings())
+    booking_event = BookingEventDTO(
+        payload=notification_fan_out.build_booking(),
+        trigger_event=TriggerEvent.BOOKING_CANCELLED,
+    )
+    await controller._background_processing(booking_event)  # noqa: SLF001
+    wait_for_listener()
+
+    started_at = time.perf_counter()
+    for _ in range(events):
+        await controller._background_processing(booking_event)  # noqa: SLF001
+    return started_at
+
+
+def wait_for_listener() -> None:
+    from app.config.logger import OffLoopQueueHandler
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, OffLoopQueueHandler):
+            while not handler.queue.empty():
+                time.sleep(0.001)
+
+
+def run_profile(profile: str, events: int, write_latency_us: float) -> None:
+    sys.stderr = SlowSink(write_latency_us / 1e6)
+    configure(profile)
+    loop = asyncio.new_event_loop()
+    started_at = loop.run_until_complete(handle_events(events))
+    loop_seconds = time.perf_counter() - started_at
+    wait_for_listener()
+    written_seconds = time.perf_counter() - started_at
+    print(json.dumps({"loop_seconds": loop_seconds, "written_seconds": written_seconds}), file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--write-latency-us", type=float, nargs="+", default=[0, 100])
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    if args.profile:
+        run_profile(args.profile, args.events, args.write_latency_us[0])
+        return
+
+    for write_latency_us in args.write_latency_us:
+        print(f"write latency {write_latency_us:g}us:")
+        results = {}
+        for profile in PROFILES:
+            completed = subprocess.run(  # noqa: S603
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.logging_overhead",
+                    f"--profile={profile}",
+                    f"--events={args.events}",
+                    f"--write-latency-us={write_latency_us}",
+                ],
+                stdout=subprocess.PIPE,
+                check=True,
+                text=True,
+            )
+            results[profile] = json.loads(completed.stdout)
+
+        baseline = results["silent"]["loop_seconds"] / args.events
+        for profile, result in results.items():
+            per_event = result["loop_seconds"] / args.events
+            print(
+                f"  {profile:>16}: {per_event * 1e6:6.0f}us per event on the loop "
+                f"(logging {(per_event - baseline) * 1e6:5.0f}us), "
+                f"{result['written_seconds'] / args.events * 1e6:6.0f}us until written",
+            )
+
+
+if __name__ == "__main__":
+    main()
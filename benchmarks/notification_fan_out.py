@@ -0,0 +1,227 @@
+"""Measure ``BookingController._handle_cancelled`` with concurrent notification and cleanup fan-out.
+
+Every external call (Telegram, email, chat deletion, shortener) is a fake that sleeps for a fixed latency. The
+legacy run awaits the same fakes one after another; the fan-out run should take about as long as the slowest call.
+A second scenario makes the organizer email fail and the chat deletion hang past its timeout and checks that the
+other channels are still delivered.
+
+Usage: python -m benchmarks.notification_fan_out [--runs 5]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import time
+from contextlib import nullcontext
+from typing import Any
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+LATENCIES_SECONDS = {
+    "organizer_chat_id": 0.010,
+    "telegram": 0.080,
+    "email": 0.120,
+    "chat": 0.060,
+    "shortener": 0.050,
+}
+
+
+class FakeCalls:
+    def __init__(self, *, failing: frozenset[str] = frozenset(), hanging: frozenset[str] = frozenset()) -> None:
+        self.failing = failing
+        self.hanging = hanging
+        self.calls: list[str] = []
+
+    async def call(self, name: str, latency_key: str | None = None) -> None:
+        if name in self.hanging:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(LATENCIES_SECONDS[latency_key or name])
+        if name in self.failing:
+            msg = f"{name} is down"
+            raise RuntimeError(msg)
+        self.calls.append(name)
+
+
+class FakeDb:
+    def __init__(self, calls: FakeCalls, booking: Any) -> None:
+        self.calls = calls
+        self.booking = booking
+
+    async def get_booking(self, uid: str) -> Any:  # noqa: ARG002
+        return self.booking
+
+    async def get_organizer_chat_id(self, email: str) -> int:  # noqa: ARG002
+        await self.calls.call("organizer_chat_id")
+        return 1
+
+
+class FakeBot:
+    def __init__(self, calls: FakeCalls) -> None:
+        self.calls = calls
+
+    async def send_message(self, **kwargs: Any) -> None:  # noqa: ARG002
+        await self.calls.call("telegram")
+
+
+class FakeEmailController:
+    def __init__(self, calls: FakeCalls) -> None:
+        self.calls = calls
+
+    async def send_email(self, *, to_email: str, context: dict, template_id: str) -> None:  # noqa: ARG002
+        await self.calls.call(f"email:{to_email}", "email")
+
+
+class FakeChatController:
+    def __init__(self, calls: FakeCalls) -> None:
+        self.calls = calls
+
+    async def delete_chat(self, *, channel_id: str) -> None:  # noqa: ARG002
+        await self.calls.call("chat")
+
+
+class FakeMeetingController:
+    def __init__(self, calls: FakeCalls) -> None:
+        self.calls = calls
+
+    async def delete_meeting_url(self, *, booking: Any, external_id_prefix: str = "") -> None:  # noqa: ARG002
+        await self.calls.call(f"shortener:{external_id_prefix or 'organizer'}", "shortener")
+
+
+class NoopCache:
+    async def invalidate(self, uid: str) -> None:
+        pass
+
+    async def apply_cancelled(self, booking: Any) -> None:
+        pass
+
+    async def unschedule(self, booking_uid: str) -> None:
+        pass
+
+
+def build_booking() -> Any:
+    from app.dtos import BookingClientDTO, BookingDTO, UserDTO
+
+    start_time = datetime.datetime(2025, 3, 14, 12, 0, tzinfo=datetime.UTC)
+    return BookingDTO(
+        created_at=start_time,
+        end_time=start_time + datetime.timedelta(minutes=60),
+        ical_sequence=0,
+        id=1,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="cancelled",
+        title="Consultation",
+        uid="booking-uid",
+        user=UserDTO(id=1, name="Organizer", email="organizer@example.com", locked=False, time_zone="Europe/Moscow"),
+        client=BookingClientDTO(name="Client", email="client@example.com", time_zone="Europe/Berlin"),
+    )
+
+
+def build_booking_controller(calls: FakeCalls, settings: Any) -> Any:
+    from app.controllers.booking import BookingController
+    from app.controllers.booking_rules import BookingRulesEngine
+    from app.controllers.notification import NotificationController
+    from app.controllers.telegram_templates import TelegramNotificationRenderer
+    from app.controllers.time_zones import TimeZoneService
+
+    db = FakeDb(calls, build_booking())
+    time_zone_service = TimeZoneService()
+    notification_controller = NotificationController(
+        db=db,
+        bot=FakeBot(calls),
+        settings=settings,
+        email_controller=FakeEmailController(calls),
+        booking_rules_engine=BookingRulesEngine(),
+        time_zone_service=time_zone_service,
+        telegram_renderer=TelegramNotificationRenderer(settings, time_zone_service),
+        outbox=None,
+    )
+    return BookingController(
+        db=db,
+        booking_cache=NoopCache(),
+        shortener=None,
+        chat_controller=FakeChatController(calls),
+        meeting_controller=FakeMeetingController(calls),
+        notification_controller=notification_controller,
+        notification_state_controller=None,
+        booking_constraints_analyzer=None,
+        client_bookings_aggregator=NoopCache(),
+        reminder_scheduler=NoopCache(),
+        unit_of_work=nullcontext,
+        settings=settings,
+    )
+
+
+async def legacy_handle_cancelled(controller: Any, booking_event: Any) -> None:
+    """Await the calls in the former order: organizer Telegram and email, client email, chat, both short links."""
+    notification_controller = controller.notification_controller
+    booking = await controller.db.get_booking(booking_event.payload.uid)
+    await notification_controller.notify_organizer_telegram(booking.user, booking, booking_event.trigger_event)
+    await notification_controller.notify_organizer_email(booking.user, booking, booking_event.trigger_event)
+    await notification_controller.notify_client_email(booking=booking, trigger_event=booking_event.trigger_event)
+    await controller.chat_controller.delete_chat(channel_id=booking.uid)
+    await controller.meeting_controller.delete_meeting_url(booking=booking)
+    await controller.meeting_controller.delete_meeting_url(booking=booking, external_id_prefix="client_")
+
+
+async def run(runs: int) -> None:
+    from app.dtos import BookingEventDTO, TriggerEvent
+    from app.settings import Settings
+
+    settings = Settings()
+    booking_event = BookingEventDTO(payload=build_booking(), trigger_event=TriggerEvent.BOOKING_CANCELLED)
+
+    for name, handle in (
+        ("sequential", legacy_handle_cancelled),
+        ("fan-out", lambda controller, event: controller._handle_cancelled(event)),  # noqa: SLF001
+    ):
+        timings = []
+        for _ in range(runs):
+            calls = FakeCalls()
+            controller = build_booking_controller(calls, settings)
+            started_at = time.perf_counter()
+            await handle(controller, booking_event)
+            timings.append(time.perf_counter() - started_at)
+        print(f"{name}: {min(timings) * 1000:.0f}ms for {len(calls.calls)} calls")
+
+    slowest_call = LATENCIES_SECONDS["email"]
+    if min(timings) > slowest_call * 1.5:
+        print(f"fan-out took longer than 1.5x the slowest call ({slowest_call * 1000:.0f}ms)")
+        raise SystemExit(1)
+
+    chat_timeout = 0.2
+    degraded_settings = settings.model_copy(update={"notification_channel_timeouts": {"chat": chat_timeout}})
+    calls = FakeCalls(failing=frozenset({"email:organizer@example.com"}), hanging=frozenset({"chat"}))
+    controller = build_booking_controller(calls, degraded_settings)
+    started_at = time.perf_counter()
+    await controller._handle_cancelled(booking_event)  # noqa: SLF001
+    elapsed = time.perf_counter() - started_at
+    expected_calls = {
+        "organizer_chat_id",
+        "telegram",
+        "email:client@example.com",
+        "shortener:organizer",
+        "shortener:client_",
+    }
+    print(f"degraded: {elapsed * 1000:.0f}ms, delivered: {sorted(calls.calls)}")
+    if set(calls.calls) != expected_calls or elapsed > chat_timeout * 1.5:
+        print("a failing or hanging channel affected the other channels")
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
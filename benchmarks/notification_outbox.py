@@ -0,0 +1,189 @@
+"""Measure the notification critical path with the transactional outbox and check relay retries.
+
+Providers are the sleeping fakes from ``benchmarks.notification_fan_out``; the outbox is an in-memory implementation
+of ``IOutboxRepository`` with the same semantics as the SQL one (idempotency keys, leases, backoff, dead letters) and a
+fixed insert latency standing in for the Postgres round trip.
+
+1. Critical path: ``notify_organizer`` + ``notify_client`` inline vs enqueued to the outbox.
+2. Outage: every provider call fails twice before succeeding; the relay must deliver every message exactly once,
+   and enqueueing the same notifications again (a redelivered webhook) must not send anything twice.
+
+Usage: python -m benchmarks.notification_outbox [--runs 5]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import time
+from collections import Counter
+from dataclasses import replace
+from typing import Any
+
+from benchmarks.notification_fan_out import FakeBot, FakeCalls, FakeDb, FakeEmailController, build_booking
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+INSERT_LATENCY_SECONDS = 0.002
+
+
+class FlakyCalls(FakeCalls):
+    """Fail the first ``failures_per_call`` attempts of every distinct provider call (the database stays up)."""
+
+    def __init__(self, failures_per_call: int) -> None:
+        super().__init__()
+        self.failures_per_call = failures_per_call
+        self.attempts: Counter[str] = Counter()
+
+    async def call(self, name: str, latency_key: str | None = None) -> None:
+        self.attempts[name] += 1
+        if name != "organizer_chat_id" and self.attempts[name] <= self.failures_per_call:
+            msg = f"{name} is down"
+            raise RuntimeError(msg)
+        await super().call(name, latency_key)
+
+
+class InMemoryOutboxRepository:
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+        self.next_id = 1
+
+    async def ensure_table(self) -> None:
+        pass
+
+    async def enqueue(self, messages: list[Any]) -> int:
+        await asyncio.sleep(INSERT_LATENCY_SECONDS)
+        inserted = 0
+        for message in messages:
+            if message.idempotency_key in self.rows:
+                continue
+            self.rows[message.idempotency_key] = {
+                "message": replace(message, id=self.next_id, created_at=datetime.datetime.now(datetime.UTC)),
+                "status": "pending",
+                "available_at": time.monotonic(),
+            }
+            self.next_id += 1
+            inserted += 1
+        return inserted
+
+    async def claim_batch(self, *, limit: int, lease_seconds: float) -> list[Any]:
+        now = time.monotonic()
+        claimed = []
+        for row in self.rows.values():
+            if len(claimed) == limit:
+                break
+            if row["status"] == "pending" and row["available_at"] <= now:
+                row["message"] = replace(row["message"], attempts=row["message"].attempts + 1)
+                row["available_at"] = now + lease_seconds
+                claimed.append(row["message"])
+        return claimed
+
+    def _get_row(self, message_id: int) -> dict:
+        return next(row for row in self.rows.values() if row["message"].id == message_id)
+
+    async def mark_sent(self, message_ids: list[int]) -> None:
+        for message_id in message_ids:
+            self._get_row(message_id)["status"] = "sent"
+
+    async def mark_failed(self, failures: list[Any]) -> None:
+        for failure in failures:
+            row = self._get_row(failure.message_id)
+            if failure.retry_in_seconds is None:
+                row["status"] = "dead"
+            else:
+                row["available_at"] = time.monotonic() + failure.retry_in_seconds
+
+    async def prune_sent(self, *, older_than_days: int) -> None:
+        pass
+
+    async def get_stats(self) -> Any:
+        from app.dtos import OutboxStatsDTO
+
+        statuses = Counter(row["status"] for row in self.rows.values())
+        return OutboxStatsDTO(pending=statuses["pending"], dead=statuses["dead"], lag_seconds=0.0)
+
+
+def build_notification_controller(calls: FakeCalls, settings: Any, outbox: InMemoryOutboxRepository) -> Any:
+    from app.controllers.booking_rules import BookingRulesEngine
+    from app.controllers.notification import NotificationController
+    from app.controllers.telegram_templates import TelegramNotificationRenderer
+    from app.controllers.time_zones import TimeZoneService
+
+    time_zone_service = TimeZoneService()
+    return NotificationController(
+        db=FakeDb(calls, build_booking()),
+        bot=FakeBot(calls),
+        settings=settings,
+        email_controller=FakeEmailController(calls),
+        booking_rules_engine=BookingRulesEngine(),
+        time_zone_service=time_zone_service,
+        telegram_renderer=TelegramNotificationRenderer(settings, time_zone_service),
+        outbox=outbox,
+    )
+
+
+async def notify_created(controller: Any) -> None:
+    from app.dtos import TriggerEvent
+
+    booking = build_booking()
+    await controller.notify_organizer(booking.user, booking, TriggerEvent.BOOKING_CREATED, "https://meet/room")
+    await controller.notify_client(booking, TriggerEvent.BOOKING_CREATED, "https://meet/room")
+
+
+async def run(runs: int) -> None:
+    from app.controllers.outbox import OutboxRelay
+    from app.settings import Settings
+
+    settings = Settings()
+    for name, is_outbox in (("inline", False), ("outbox", True)):
+        mode_settings = settings.model_copy(update={"is_enable_notification_outbox": is_outbox})
+        timings = []
+        for _ in range(runs):
+            controller = build_notification_controller(FakeCalls(), mode_settings, InMemoryOutboxRepository())
+            started_at = time.perf_counter()
+            await notify_created(controller)
+            timings.append(time.perf_counter() - started_at)
+        print(f"critical path, {name}: {min(timings) * 1000:.1f}ms")
+
+    outage_settings = settings.model_copy(
+        update={"is_enable_notification_outbox": True, "outbox_retry_base_seconds": 0.01, "outbox_max_attempts": 5},
+    )
+    calls = FlakyCalls(failures_per_call=2)
+    outbox = InMemoryOutboxRepository()
+    controller = build_notification_controller(calls, outage_settings, outbox)
+    await notify_created(controller)
+    await notify_created(controller)
+    relay = OutboxRelay(
+        settings=outage_settings, outbox=outbox, bot=controller.bot, email_controller=FakeEmailController(calls)
+    )
+
+    started_at = time.perf_counter()
+    rounds = 0
+    while (await outbox.get_stats()).pending and rounds < 100:
+        rounds += 1
+        if not await relay.relay_once():
+            await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started_at
+    stats = await outbox.get_stats()
+    delivered = Counter(name for name in calls.calls if name != "organizer_chat_id")
+    print(
+        f"outage: {len(outbox.rows)} messages, {sum(delivered.values())} deliveries in {rounds} relay rounds, "
+        f"{elapsed * 1000:.0f}ms, pending {stats.pending}, dead {stats.dead}",
+    )
+    if stats.pending or stats.dead or len(delivered) != len(outbox.rows) or set(delivered.values()) != {1}:
+        print("outbox did not deliver every message exactly once")
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure Telegram text and email context rendering in ``NotificationController``.
+
+"per-render" looks zones and city names up the way ``NotificationController`` did before they were memoized:
+``pytz.timezone`` (whose own zone cache is warm, as it was in a running process) and babel's
+``get_timezone_location`` on every render. "memoized" goes through ``TimeZoneService`` after startup warm up.
+
+Usage: python -m benchmarks.notification_rendering [--renders 5000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import os
+import timeit
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+TIME_ZONES = ("Europe/Moscow", "Europe/Berlin", "Asia/Tbilisi", "America/New_York", "Asia/Almaty", "Europe/Riga")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+    import pytz
+    from babel.dates import get_timezone_location
+
+    from app.controllers.booking_rules import BookingRulesEngine
+    from app.controllers.notification import NotificationController
+    from app.controllers.telegram_templates import TelegramNotificationRenderer
+    from app.controllers.time_zones import TIME_ZONE_LOCALE, TimeZoneService
+    from app.dtos import BookingClientDTO, BookingDTO, TriggerEvent
+    from app.settings import Settings
+
+    class PerRenderTimeZoneService(TimeZoneService):
+        def get_zone(self, time_zone: str) -> datetime.tzinfo:
+            return pytz.timezone(time_zone)
+
+        def get_city(self, time_zone: str) -> str:
+            return get_timezone_location(time_zone, locale=TIME_ZONE_LOCALE, return_city=True)
+
+        def format_time(self, time_zone: str, moment: datetime.datetime, time_format: str) -> str:
+            return moment.astimezone(pytz.timezone(time_zone)).strftime(time_format)
+
+    settings = Settings()
+
+    def build_controller(time_zone_service: TimeZoneService) -> NotificationController:
+        time_zone_service.warm_up(TIME_ZONES)
+        return NotificationController(
+            db=None,
+            bot=None,
+            settings=settings,
+            email_controller=None,
+            booking_rules_engine=BookingRulesEngine(),
+            time_zone_service=time_zone_service,
+            # No rendered-text cache, so every iteration pays for the time zone lookups being measured.
+            telegram_renderer=TelegramNotificationRenderer(settings, time_zone_service, max_size=0),
+            outbox=None,
+        )
+
+    start_time = datetime.datetime(2025, 3, 14, 12, 0, tzinfo=datetime.UTC)
+    bookings = [
+        BookingDTO(
+            created_at=start_time,
+            end_time=start_time + datetime.timedelta(minutes=60),
+            ical_sequence=0,
+            id=index,
+            is_recorded=False,
+            paid=False,
+            responses={},
+            start_time=start_time,
+            status="accepted",
+            title="Consultation",
+            uid=f"booking-{index}",
+            client=BookingClientDTO(name="Client", email="client@example.com", time_zone=time_zone),
+        )
+        for index, time_zone in enumerate(TIME_ZONES)
+    ]
+
+    def render(controller: NotificationController) -> None:
+        for index in range(args.renders):
+            booking = bookings[index % len(bookings)]
+            controller.telegram_renderer.render(
+                booking=booking,
+                time_zone=booking.client.time_zone,
+                meeting_url="https://meet.example.com/room",
+                trigger_event=TriggerEvent.BOOKING_CREATED,
+            )
+            controller._prepare_email_context(  # noqa: SLF001
+                booking=booking,
+                trigger_event=TriggerEvent.BOOKING_CREATED,
+                participant_time_zone=booking.client.time_zone,
+                meeting_url="https://meet.example.com/room",
+                additional_context={},
+            )
+
+    for name, time_zone_service in (("per-render", PerRenderTimeZoneService()), ("memoized", TimeZoneService())):
+        controller = build_controller(time_zone_service)
+        best = min(timeit.repeat(lambda controller=controller: render(controller), number=1, repeat=args.repeat))
+        print(f"{name}: {best / args.renders * 1_000_000:.1f}us per telegram text + email context")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure ``ReminderScheduler.claim_due`` and ``ack`` against schedules of growing size on a real Redis.
+
+For every schedule size the sorted set holds that many future reminders plus one batch of due ones; claiming the
+due batch (moving its scores to the end of the lease) and acknowledging it afterwards should each cost about the
+same regardless of the schedule size (O(M log N)), unlike the former window query over the ``Booking`` table.
+A claimed but unacknowledged reminder must come back once its lease has run out. The scheduler's keys are deleted
+before and after the run, so point ``BENCHMARK_REDIS_URL`` at a scratch database.
+
+Usage: python -m benchmarks.reminder_scheduler [--due 100] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import time
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+SCHEDULE_SIZES = (1_000, 100_000, 1_000_000)
+INSERT_CHUNK_SIZE = 10_000
+
+
+async def run(redis_url: str, due: int, repeat: int) -> None:
+    from redis.asyncio import Redis
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    from app.controllers.reminder_scheduler import REMINDER_LEADER_KEY, REMINDERS_KEY, ReminderScheduler
+    from app.settings import Settings
+
+    client = Redis.from_url(redis_url)
+    try:
+        await client.ping()
+    except RedisConnectionError:
+        print(f"Redis is not reachable at {redis_url}; set BENCHMARK_REDIS_URL")
+        raise SystemExit(1) from None
+
+    scheduler = ReminderScheduler(client=client, settings=Settings())
+    now = datetime.datetime.now(datetime.UTC)
+    future = (now + datetime.timedelta(days=1)).timestamp()
+    try:
+        await client.delete(REMINDERS_KEY, REMINDER_LEADER_KEY)
+        size = 0
+        for schedule_size in SCHEDULE_SIZES:
+            while size < schedule_size:
+                chunk = min(INSERT_CHUNK_SIZE, schedule_size - size)
+                await client.zadd(REMINDERS_KEY, {f"future-{size + index}": future + index for index in range(chunk)})
+                size += chunk
+
+            claim_timings, ack_timings = [], []
+            for attempt in range(repeat):
+                await client.zadd(
+                    REMINDERS_KEY, {f"due-{attempt}-{index}": now.timestamp() - index for index in range(due)}
+                )
+                started_at = time.perf_counter()
+                claimed = await scheduler.claim_due(now=now, limit=due)
+                claim_timings.append(time.perf_counter() - started_at)
+                if len(claimed) != due:
+                    print(f"expected {due} due reminders, claimed {len(claimed)}")
+                    raise SystemExit(1)
+                started_at = time.perf_counter()
+                await scheduler.ack(claimed)
+                ack_timings.append(time.perf_counter() - started_at)
+            print(
+                f"schedule {schedule_size:>9}: claim {due} due in {statistics.median(claim_timings) * 1000:.2f}ms "
+                f"(median), {max(claim_timings) * 1000:.2f}ms (max); ack in "
+                f"{statistics.median(ack_timings) * 1000:.2f}ms (median), {max(ack_timings) * 1000:.2f}ms (max)",
+            )
+
+        if await scheduler.claim_due(now=now, limit=due) or await client.zcard(REMINDERS_KEY) != size:
+            print("future reminders were claimed or acknowledged reminders were left")
+            raise SystemExit(1)
+
+        await client.zadd(REMINDERS_KEY, {"unacknowledged": now.timestamp()})
+        if len(await scheduler.claim_due(now=now, limit=due)) != 1 or await scheduler.claim_due(now=now, limit=due):
+            print("a claimed reminder was claimed again before its lease ended")
+            raise SystemExit(1)
+        if len(await scheduler.claim_due(now=now + scheduler.lease, limit=due)) != 1:
+            print("an unacknowledged reminder was not claimed again after its lease")
+            raise SystemExit(1)
+    finally:
+        await client.delete(REMINDERS_KEY, REMINDER_LEADER_KEY)
+        await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--due", type=int, default=100, help="due reminders per pop")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    asyncio.run(run(os.environ.get("BENCHMARK_REDIS_URL", "redis://localhost:6379/15"), args.due, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
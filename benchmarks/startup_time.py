@@ -0,0 +1,136 @@
+"""Measure the cold import of ``app.main`` against a recorded baseline.
+
+Each run times ``python -c "import app.main"`` in a fresh interpreter by wall clock, the way a new pod pays for it.
+The median is compared with ``benchmarks/baselines/startup_time.json``; a median slower than the baseline by more
+than ``--threshold`` fails the run with 1, so a new eager import is caught before it shows up as slower autoscaling.
+``--save`` rewrites the baseline. Import times only compare on the same machine and Python: re-save the baseline on
+the reference machine rather than trusting numbers from a laptop.
+
+The per-package breakdown comes from separate ``python -X importtime`` runs and is informational only; importtime's
+own bookkeeping inflates the totals it reports.
+
+Usage: python -m benchmarks.startup_time [--runs 5] [--threshold 0.15] [--top 15] [--save]
+"""
+
+import argparse
+import collections
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "startup_time.json"
+
+
+def wall_clock_ms() -> float:
+    """Milliseconds of one cold ``import app.main``, interpreter start and exit included."""
+    started_at = time.perf_counter()
+    # Fixed argv: the running interpreter importing the app, no user input reaches the command line.
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", "import app.main"],
+        env={**BENCHMARK_ENV, **os.environ},
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - started_at) * 1000
+
+
+def import_times() -> dict[str, float]:
+    """Per-package milliseconds of one ``import app.main`` under ``-X importtime``.
+
+    A package imported from ``app`` code is charged its cumulative time, including whatever it pulls in (``aiogram``
+    includes ``aiohttp`` and the ``pydantic`` models it builds); ``app`` is charged the self time of its own modules.
+    """
+    # Fixed argv: the running interpreter importing the app, no user input reaches the command line.
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env={**BENCHMARK_ENV, **os.environ},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    lines = []
+    for line in completed.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            lines.append((int(fields[0]) / 1000, int(fields[1]) / 1000, fields[2]))
+
+    packages: dict[str, float] = collections.defaultdict(float)
+    ancestors: list[str] = []
+    # The log lists a module after its imports; reversed, every module comes right after its importer.
+    for self_ms, cumulative_ms, name in reversed(lines):
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        package = name.strip().split(".")[0]
+        del ancestors[depth:]
+        if package == "app":
+            packages[package] += self_ms
+        elif set(ancestors) <= {"app"}:
+            packages[package] += cumulative_ms
+        ancestors.append(package)
+    return packages
+
+
+def print_breakdown(runs: int, top: int) -> None:
+    by_package = collections.defaultdict(list)
+    for _ in range(runs):
+        for package, milliseconds in import_times().items():
+            by_package[package].append(milliseconds)
+    medians = {package: statistics.median(timings) for package, timings in by_package.items()}
+    print(f"heaviest packages under -X importtime (median of {runs}):")
+    for package, milliseconds in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {package:>24}: {milliseconds:7.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown over the baseline, 0.15 = 15%%")
+    parser.add_argument("--top", type=int, default=15, help="packages in the importtime breakdown, 0 skips it")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write the median as the new baseline")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if baseline and (baseline["python"], baseline["machine"]) != (platform.python_version(), platform.node()):
+        print(
+            f"baseline was recorded on {baseline['machine']} with Python {baseline['python']}, "
+            f"this is {platform.node()} with Python {platform.python_version()}",
+        )
+
+    total = statistics.median(wall_clock_ms() for _ in range(args.runs))
+    if baseline is None:
+        print(f"import app.main: {total:.0f}ms (median of {args.runs}), no baseline")
+    else:
+        change = total / baseline["import_ms"] - 1
+        print(
+            f"import app.main: {total:.0f}ms (median of {args.runs}), "
+            f"baseline {baseline['import_ms']:.0f}ms, {change:+.0%}",
+        )
+    if args.top:
+        print_breakdown(args.runs, args.top)
+
+    if args.save:
+        args.baseline.parent.mkdir(exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {"python": platform.python_version(), "machine": platform.node(), "import_ms": round(total, 1)},
+                indent=2,
+            )
+            + "\n",
+        )
+        print(f"saved the baseline to {args.baseline}")
+    elif baseline is not None and change > args.threshold:
+        print(f"slower than the baseline by more than {args.threshold:.0%}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
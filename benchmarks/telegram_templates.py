@@ -0,0 +1,165 @@
+"""Check and time organizer Telegram texts rendered from precompiled templates.
+
+``legacy_render`` is a copy of the former f-string builder. Every trigger is rendered by both and the texts must
+match byte for byte; the sample meeting URL has a query string, since ``href`` values keep their ``&``. Then both
+are timed, and the renderer is timed again with its rendered-text cache, as for reminder resends. An uncached
+render is not faster than the f-strings, so the speedup depends on the cache hit rate.
+
+Usage: python -m benchmarks.telegram_templates [--renders 20000] [--repeat 5]
+"""
+
+import argparse
+import datetime
+import os
+import timeit
+
+from benchmarks.telegram_updates import BENCHMARK_ENV
+
+
+def legacy_render(controller: object, booking: object, time_zone: str, meeting_url: str, trigger_event: str) -> str:
+    from app.dtos import TriggerEvent
+
+    host_url = controller.settings.booking_host_url
+    organizer_time = controller._get_participant_time(time_zone, booking.start_time)  # noqa: SLF001
+    previous_start_time = booking.previous_booking.start_time if booking.previous_booking else None
+    messages = {}
+    if trigger_event == TriggerEvent.BOOKING_CREATED:
+        messages[TriggerEvent.BOOKING_CREATED] = f"""✅ <b>Новая запись</b>
+
+📅 <b>Время начала:</b> {organizer_time}
+🌍 <b>Часовой пояс:</b> {controller.get_time_zone_city(time_zone=time_zone)}
+
+🔗 <a href="{meeting_url}">Ссылка на встречу</a>
+👤 <a href="{host_url}/booking/{booking.uid}">Информация o клиенте</a>"""
+    if trigger_event == TriggerEvent.BOOKING_RESCHEDULED:
+        previous_time = controller._get_participant_time(time_zone, previous_start_time)  # noqa: SLF001
+        messages[TriggerEvent.BOOKING_RESCHEDULED] = f"""↻ <b>Встреча перенесена</b>
+
+📅 <b>Предыдущее время начала:</b> {previous_time}
+📅 <b>Новое время начала:</b> {organizer_time}
+🌍 <b>Часовой пояс:</b> {controller.get_time_zone_city(time_zone=time_zone)}
+
+🔗 <a href="{meeting_url}">Ссылка на встречу</a>
+👤 <a href="{host_url}/booking/{booking.uid}">Информация o клиенте</a>"""
+    if trigger_event == TriggerEvent.BOOKING_CANCELLED:
+        messages[TriggerEvent.BOOKING_CANCELLED] = f"""❌ <b>Встреча отменена</b>
+
+📅 <b>Время начала:</b> {organizer_time}
+🌍 <b>Часовой пояс:</b> {controller.get_time_zone_city(time_zone=time_zone)}
+👤 <a href="{host_url}/booking/{booking.uid}">Информация o клиенте</a>"""
+    if trigger_event == TriggerEvent.MEET_CLIENT_JOINED:
+        messages[TriggerEvent.MEET_CLIENT_JOINED] = f"""🏃<b>Клиент зашел на встречу</b>
+
+📅 <b>Время начала:</b> {organizer_time}
+🔗 <a href="{meeting_url}">Ссылка на встречу</a>
+👤 <a href="{host_url}/booking/{booking.uid}">Информация o клиенте</a>
+
+⚠️ Если после этого сообщения вы не видите клиента, обновите страницу встречи в браузере и подключитесь снова ⚠️
+"""
+    return messages.get(trigger_event)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from app.controllers.booking_rules import BookingRulesEngine
+    from app.controllers.notification import NotificationController
+    from app.controllers.telegram_templates import TELEGRAM_TEMPLATES, TelegramNotificationRenderer
+    from app.controllers.time_zones import TimeZoneService
+    from app.dtos import BookingDTO
+    from app.settings import Settings
+
+    settings = Settings()
+    time_zone_service = TimeZoneService()
+    uncached = TelegramNotificationRenderer(settings, time_zone_service, max_size=0)
+    cached = TelegramNotificationRenderer(settings, time_zone_service)
+    controller = NotificationController(
+        db=None,
+        bot=None,
+        settings=settings,
+        email_controller=None,
+        booking_rules_engine=BookingRulesEngine(),
+        time_zone_service=time_zone_service,
+        telegram_renderer=uncached,
+        outbox=None,
+    )
+
+    start_time = datetime.datetime(2025, 3, 14, 12, 0, tzinfo=datetime.UTC)
+
+    def build_booking(uid: str, booking_start_time: datetime.datetime) -> BookingDTO:
+        return BookingDTO(
+            created_at=start_time,
+            end_time=booking_start_time + datetime.timedelta(minutes=60),
+            ical_sequence=0,
+            id=0,
+            is_recorded=False,
+            paid=False,
+            responses={},
+            start_time=booking_start_time,
+            status="accepted",
+            title="Consultation",
+            uid=uid,
+        )
+
+    booking = build_booking("booking-uid", start_time)
+    booking.previous_booking = build_booking("previous-uid", start_time - datetime.timedelta(days=2))
+    time_zone, meeting_url = "Europe/Moscow", "https://meet.example.com/booking-uid?jwt=token&lang=ru"
+
+    mismatches = 0
+    for trigger_event in TELEGRAM_TEMPLATES:
+        expected = legacy_render(controller, booking, time_zone, meeting_url, trigger_event)
+        actual = uncached.render(
+            booking=booking,
+            time_zone=time_zone,
+            meeting_url=meeting_url,
+            trigger_event=trigger_event,
+        )
+        if expected != actual:
+            mismatches += 1
+            print(f"mismatch for {trigger_event}:\n{expected!r}\n{actual!r}")
+    print(f"output check: {len(TELEGRAM_TEMPLATES)} triggers, {mismatches} mismatches")
+
+    renderers = {
+        "legacy f-strings": lambda trigger_event: legacy_render(
+            controller,
+            booking,
+            time_zone,
+            meeting_url,
+            trigger_event,
+        ),
+        "templates": lambda trigger_event: uncached.render(
+            booking=booking,
+            time_zone=time_zone,
+            meeting_url=meeting_url,
+            trigger_event=trigger_event,
+        ),
+        "templates, cached": lambda trigger_event: cached.render(
+            booking=booking,
+            time_zone=time_zone,
+            meeting_url=meeting_url,
+            trigger_event=trigger_event,
+        ),
+    }
+    triggers = list(TELEGRAM_TEMPLATES)
+    for name, render in renderers.items():
+        best = min(
+            timeit.repeat(
+                lambda render=render: [render(triggers[index % len(triggers)]) for index in range(args.renders)],
+                number=1,
+                repeat=args.repeat,
+            ),
+        )
+        print(f"{name}: {best / args.renders * 1_000_000:.2f}us per text")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
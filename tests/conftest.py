@@ -0,0 +1,27 @@
+import os
+from collections.abc import Iterator
+
+import pytest
+from redis import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+
+# A throwaway database: every test using it starts and ends with FLUSHDB.
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest.fixture
+def redis_url() -> Iterator[str]:
+    """URL of an empty Redis database; the Lua scripts under test need a real server."""
+    client = Redis.from_url(TEST_REDIS_URL)
+    try:
+        client.ping()
+    except RedisConnectionError:
+        client.close()
+        pytest.skip(f"Redis is not reachable at {TEST_REDIS_URL}")
+    client.flushdb()
+    try:
+        yield TEST_REDIS_URL
+    finally:
+        client.flushdb()
+        client.close()
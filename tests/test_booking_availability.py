@@ -0,0 +1,56 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from app.controllers.booking_availability import BookingAvailabilityController
+from app.controllers.booking_constraints import BookingConstraintsAnalyzer
+from app.controllers.booking_rules import BookingRulesEngine
+from app.controllers.client_bookings import build_client_bookings_aggregate
+from app.dtos import AttendeeBookingDTO, ClientBookingsAggregateDTO
+from app.settings import BookingConstraintsRules
+
+
+class StaticAggregator:
+    def __init__(self, attendee_bookings: list[AttendeeBookingDTO]) -> None:
+        self.aggregate = build_client_bookings_aggregate("client@example.com", attendee_bookings)
+
+    async def get_or_rebuild(self, _: str) -> ClientBookingsAggregateDTO:
+        return self.aggregate
+
+    async def refresh_bad_connections(self, aggregate: ClientBookingsAggregateDTO) -> ClientBookingsAggregateDTO:
+        return aggregate
+
+
+def build_attendee_booking(index: int, start_time: datetime.datetime) -> AttendeeBookingDTO:
+    return AttendeeBookingDTO(
+        booking_id=index,
+        booking_uid=f"booking-{index}",
+        name="Client",
+        email="client@example.com",
+        start_time=start_time,
+        end_time=start_time + datetime.timedelta(hours=1),
+        status="accepted",
+    )
+
+
+def test_aware_start_time_is_checked_in_utc() -> None:
+    now = datetime.datetime.now(datetime.UTC)
+    january = datetime.datetime(now.year + 1, 1, 2, 12, tzinfo=datetime.UTC)
+    controller = BookingAvailabilityController(
+        settings=SimpleNamespace(is_enable_booking_constraints=True),
+        client_bookings_aggregator=StaticAggregator(
+            [build_attendee_booking(index, january + datetime.timedelta(days=10 * index)) for index in range(2)],
+        ),
+        booking_constraints_analyzer=BookingConstraintsAnalyzer(
+            rules_engine=BookingRulesEngine(
+                default_rules=BookingConstraintsRules(months_after_cancellation=None, is_single_active_booking=False),
+            ),
+        ),
+    )
+    # February 1st in Moscow is still January 31st in UTC, where the monthly limit is already reached.
+    start_time = datetime.datetime(now.year + 1, 2, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=3)))
+
+    result = asyncio.run(controller.check(email="client@example.com", start_time=start_time))
+
+    assert result["rejection_type"] == "month_limit"
+    assert result["available_from"] == datetime.datetime(now.year + 1, 2, 1, tzinfo=datetime.UTC)
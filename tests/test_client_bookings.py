@@ -0,0 +1,251 @@
+import asyncio
+import dataclasses
+import datetime
+from collections.abc import Callable
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from redis.asyncio import Redis
+
+from app.controllers.booking import BookingController
+from app.controllers.booking_constraints import BookingConstraintsAnalyzer
+from app.controllers.booking_rules import BookingRulesEngine
+from app.controllers.client_bookings import ClientBookingsAggregator, build_client_bookings_aggregate
+from app.dtos import AttendeeBookingDTO, BookingClientDTO, BookingDTO, ClientBookingsAggregateDTO
+from app.settings import BookingConstraintsRules
+
+
+EMAIL = "client@example.com"
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.attendee_bookings: dict[str, AttendeeBookingDTO] = {}
+        self.on_read: Callable[[], object] | None = None
+        self.checked_uids: list[list[str]] = []
+
+    def put(self, booking: BookingDTO, *, bad_connection: bool = False) -> None:
+        self.attendee_bookings[booking.uid] = AttendeeBookingDTO(
+            booking_id=booking.id,
+            booking_uid=booking.uid,
+            name=booking.client.name,
+            email=booking.client.email,
+            start_time=booking.start_time,
+            end_time=booking.end_time,
+            status=booking.status,
+            bad_connection=bad_connection,
+        )
+
+    def mark_bad_connection(self, booking_uid: str) -> None:
+        self.attendee_bookings[booking_uid] = dataclasses.replace(
+            self.attendee_bookings[booking_uid],
+            bad_connection=True,
+        )
+
+    async def get_attendee_bookings_by_email(self, email: str) -> list[AttendeeBookingDTO]:
+        if self.on_read:
+            await self.on_read()
+        return [
+            attendee_booking for attendee_booking in self.attendee_bookings.values() if attendee_booking.email == email
+        ]
+
+    async def get_bad_connection_booking_uids(self, *, email: str, booking_uids: list[str]) -> list[str]:
+        self.checked_uids.append(booking_uids)
+        return [
+            booking_uid
+            for booking_uid in booking_uids
+            if self.attendee_bookings[booking_uid].email == email and self.attendee_bookings[booking_uid].bad_connection
+        ]
+
+
+def build_booking(index: int, start_time: datetime.datetime, **kwargs) -> BookingDTO:
+    return BookingDTO(
+        created_at=start_time,
+        end_time=start_time + datetime.timedelta(hours=1),
+        ical_sequence=0,
+        id=index,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="accepted",
+        title="Consultation",
+        uid=f"booking-{index}",
+        client=BookingClientDTO(name="Client", email=EMAIL, time_zone="UTC"),
+        **kwargs,
+    )
+
+
+def build_rules_engine() -> BookingRulesEngine:
+    return BookingRulesEngine(
+        default_rules=BookingConstraintsRules(months_after_cancellation=None, is_single_active_booking=False),
+    )
+
+
+def run_with_aggregator(redis_url: str, scenario: Callable) -> None:
+    async def run() -> None:
+        client = Redis.from_url(redis_url)
+        db = FakeDatabase()
+        try:
+            await scenario(db, ClientBookingsAggregator(db=db, client=client, rules_engine=build_rules_engine()))
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_events_keep_aggregate_equal_to_rebuild(redis_url: str) -> None:
+    january = datetime.datetime(datetime.datetime.now(datetime.UTC).year + 1, 1, 2, 12, tzinfo=datetime.UTC)
+
+    async def scenario(db: FakeDatabase, aggregator: ClientBookingsAggregator) -> None:
+        async def rebuild_from_database(now: datetime.datetime) -> ClientBookingsAggregateDTO:
+            return build_client_bookings_aggregate(
+                EMAIL,
+                await db.get_attendee_bookings_by_email(EMAIL),
+                window_start=aggregator.get_window_start(now),
+            )
+
+        async def assert_matches_database() -> None:
+            now = datetime.datetime.now(datetime.UTC)
+            assert await aggregator.get(EMAIL, now=now) == await rebuild_from_database(now)
+
+        assert await aggregator.get(EMAIL) is None
+
+        first, second = build_booking(1, january), build_booking(2, january + datetime.timedelta(days=30))
+        db.put(first)
+        db.put(second)
+        # Nothing stored yet: the aggregate is rebuilt from the database, which already has both bookings.
+        aggregate = await aggregator.apply_created(second)
+        assert aggregate == await rebuild_from_database(datetime.datetime.now(datetime.UTC))
+        await assert_matches_database()
+
+        rescheduled = build_booking(3, january + datetime.timedelta(days=70), from_reschedule=second.uid)
+        del db.attendee_bookings[second.uid]
+        db.put(rescheduled)
+        await aggregator.apply_rescheduled(rescheduled)
+        await assert_matches_database()
+
+        cancelled = dataclasses.replace(first, status="cancelled")
+        db.put(cancelled)
+        await aggregator.apply_cancelled(cancelled)
+        await assert_matches_database()
+
+        created = build_booking(4, january + datetime.timedelta(days=100))
+        db.put(created)
+        await aggregator.apply_created(created)
+        # Applying the same event twice does not count it twice.
+        await aggregator.apply_created(created)
+        await assert_matches_database()
+
+        del db.attendee_bookings[created.uid]
+        await aggregator.apply_deleted(created)
+        await assert_matches_database()
+
+    run_with_aggregator(redis_url, scenario)
+
+
+def test_rebuild_is_retried_when_aggregate_changes_meanwhile(redis_url: str) -> None:
+    start_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=3)
+
+    async def scenario(db: FakeDatabase, aggregator: ClientBookingsAggregator) -> None:
+        booking = build_booking(1, start_time)
+        db.put(booking)
+        counts_key = aggregator._build_keys(EMAIL)[0]  # noqa: SLF001
+
+        async def concurrent_event() -> None:
+            db.on_read = None
+            await aggregator.client.hset(counts_key, "concurrent", 1)
+
+        db.on_read = concurrent_event
+        assert await aggregator._rebuild_once(EMAIL) is None  # noqa: SLF001
+        assert await aggregator.client.hget(counts_key, "concurrent") == b"1"
+
+        aggregate = await aggregator._rebuild_once(EMAIL)  # noqa: SLF001
+        assert aggregate.bookings == list(db.attendee_bookings.values())
+        assert await aggregator.get(EMAIL) == aggregate
+
+    run_with_aggregator(redis_url, scenario)
+
+
+def test_bad_connection_is_only_picked_up_by_rebuild(redis_url: str) -> None:
+    start_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=3)
+
+    async def scenario(db: FakeDatabase, aggregator: ClientBookingsAggregator) -> None:
+        first, second = build_booking(1, start_time), build_booking(2, start_time + datetime.timedelta(days=10))
+        db.put(first)
+        await aggregator.rebuild(EMAIL)
+
+        # Cal.com sets the flag without a booking event; events keep the stored value.
+        db.mark_bad_connection(first.uid)
+        db.put(second)
+        aggregate = await aggregator.apply_created(second)
+        assert not aggregate.bookings[0].bad_connection
+        assert sum(aggregate.yearly_counts.values()) == 2
+
+        aggregate = await aggregator.rebuild(EMAIL)
+        assert aggregate.bookings[0].bad_connection
+        assert sum(aggregate.yearly_counts.values()) == 1
+        assert await aggregator.get(EMAIL) == aggregate
+
+    run_with_aggregator(redis_url, scenario)
+
+
+def test_refresh_flags_only_past_meetings(redis_url: str) -> None:
+    now = datetime.datetime.now(datetime.UTC)
+
+    async def scenario(db: FakeDatabase, aggregator: ClientBookingsAggregator) -> None:
+        past, upcoming = (
+            build_booking(1, now - datetime.timedelta(days=2)),
+            build_booking(2, now + datetime.timedelta(days=5)),
+        )
+        db.put(past)
+        db.put(upcoming)
+        aggregate = await aggregator.rebuild(EMAIL)
+        assert await aggregator.refresh_bad_connections(aggregate, now=now) is aggregate
+
+        db.mark_bad_connection(past.uid)
+        refreshed = await aggregator.refresh_bad_connections(aggregate, now=now)
+
+        assert db.checked_uids == [[past.uid], [past.uid]]
+        assert refreshed == await aggregator.rebuild(EMAIL)
+        assert sum(refreshed.yearly_counts.values()) == 1
+        # Already flagged meetings are not looked up again.
+        assert await aggregator.refresh_bad_connections(refreshed, now=now) is refreshed
+        assert len(db.checked_uids) == 2
+
+    run_with_aggregator(redis_url, scenario)
+
+
+def test_stale_aggregate_rejection_is_refreshed(redis_url: str) -> None:
+    now = datetime.datetime.now(datetime.UTC)
+
+    async def scenario(db: FakeDatabase, aggregator: ClientBookingsAggregator) -> None:
+        controller = BookingController(
+            db=db,
+            booking_cache=None,
+            shortener=None,
+            chat_controller=None,
+            meeting_controller=None,
+            notification_controller=None,
+            notification_state_controller=None,
+            booking_constraints_analyzer=BookingConstraintsAnalyzer(rules_engine=build_rules_engine()),
+            client_bookings_aggregator=aggregator,
+            reminder_scheduler=None,
+            unit_of_work=nullcontext,
+            settings=SimpleNamespace(is_enable_booking_constraints=True),
+        )
+        past = build_booking(1, now - datetime.timedelta(days=2))
+        db.put(past)
+        await aggregator.rebuild(EMAIL)
+
+        # Two days before the new booking, which breaks the minimum interval while the aggregate still counts it.
+        db.mark_bad_connection(past.uid)
+        created = build_booking(2, now + datetime.timedelta(days=3))
+        db.put(created)
+
+        assert await controller._validate_booking_constraints_on_create(booking=created)  # noqa: SLF001
+        aggregate = await aggregator.get(EMAIL)
+        assert aggregate.bookings[0].bad_connection
+        assert sum(aggregate.yearly_counts.values()) == 1
+
+    run_with_aggregator(redis_url, scenario)
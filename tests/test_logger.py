@@ -0,0 +1,12 @@
+import logging
+
+from app.config.logger import add_timestamp
+
+
+def test_stdlib_records_are_stamped_when_logged() -> None:
+    record = logging.LogRecord("aiogram", logging.INFO, __file__, 1, "Update handled", None, None)
+    record.created = 1_700_000_000.25
+
+    event_dict = add_timestamp(None, "info", {"event": "Update handled", "_record": record})
+
+    assert event_dict["timestamp"] == "2023-11-14T22:13:20.250000Z"
@@ -0,0 +1,40 @@
+import time
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+from app.controllers.meet_token import MeetTokenVerifier
+
+
+SIGNING_KEY = "jitsi-signing-key-of-at-least-32-bytes"
+SETTINGS = SimpleNamespace(jitsi_jwt_token=SIGNING_KEY, meeting_jwt_aud="aud", meeting_jwt_iss="iss")
+
+
+def build_token(**claims) -> str:
+    return jwt.encode({"aud": "aud", "iss": "iss", **claims}, SIGNING_KEY, algorithm="HS256")
+
+
+def test_tokens_without_exp_are_not_cached() -> None:
+    verifier = MeetTokenVerifier(settings=SETTINGS)
+
+    assert verifier.verify(build_token(room="room")) == {"aud": "aud", "iss": "iss", "room": "room"}
+    assert not verifier._verified  # noqa: SLF001
+
+
+def test_cache_hit_checks_not_before(monkeypatch: pytest.MonkeyPatch) -> None:
+    verifier = MeetTokenVerifier(settings=SETTINGS)
+    now = time.time()
+    token = build_token(room="room", nbf=int(now), exp=int(now) + 3600)
+    verifier.verify(token)
+    decoded = []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: decoded.append(args) or decode(*args, **kwargs))
+
+    verifier.verify(token)
+    assert not decoded
+
+    # Before `nbf` (a clock stepped back) the cached claims are not trusted and the token is verified again.
+    monkeypatch.setattr(time, "time", lambda: now - 600)
+    verifier.verify(token)
+    assert len(decoded) == 1
@@ -0,0 +1,110 @@
+import asyncio
+import datetime
+from contextlib import nullcontext
+
+from app.controllers.booking_cache import BookingCacheController
+from app.controllers.meet_webhook import MeetWebhookController
+from app.dtos import BookingClientDTO, BookingDTO, MeetWebhookEventDTO, MeetWebhookEventType, UserDTO
+
+
+class FakeCacheController:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:  # noqa: ARG002
+        self.values[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+
+class FakeDatabase:
+    def __init__(self, booking: BookingDTO, user: UserDTO) -> None:
+        self.booking = booking
+        self.users = {user.id: user}
+
+    async def get_booking(self, booking_uid: str) -> BookingDTO | None:
+        return self.booking if booking_uid == self.booking.uid else None
+
+    async def get_user_by_id(self, user_id: int) -> UserDTO | None:
+        return self.users.get(user_id)
+
+
+class FakeNotificationState:
+    async def was_notified(self, room: str, key: str) -> bool:  # noqa: ARG002
+        return False
+
+    async def mark_notified(self, room: str, key: str, ttl_seconds: int) -> None: ...
+
+
+class RecordingNotificationController:
+    def __init__(self) -> None:
+        self.users: list[UserDTO] = []
+
+    async def notify_organizer_telegram(self, *, user: UserDTO, **_) -> None:
+        self.users.append(user)
+
+
+TELEGRAM_TOKEN = "organizer-telegram-token"  # noqa: S105
+
+
+def build_user(telegram_chat_id: int) -> UserDTO:
+    return UserDTO(
+        id=7,
+        name="Organizer",
+        email="organizer@example.com",
+        locked=False,
+        time_zone="Europe/Moscow",
+        telegram_chat_id=telegram_chat_id,
+        telegram_token=TELEGRAM_TOKEN,
+    )
+
+
+def test_cached_booking_resolves_organizer_fresh() -> None:
+    start_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(minutes=5)
+    booking = BookingDTO(
+        created_at=start_time,
+        end_time=start_time + datetime.timedelta(hours=1),
+        ical_sequence=0,
+        id=1,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="accepted",
+        title="Consultation",
+        uid="room",
+        metadata={"videoCallUrl": "https://meet.example.com/room"},
+        user_id=7,
+        user=build_user(telegram_chat_id=1),
+        client=BookingClientDTO(name="Client", email="client@example.com", time_zone="UTC"),
+    )
+    cache_controller = FakeCacheController()
+    booking_cache = BookingCacheController(cache_controller=cache_controller)
+    db = FakeDatabase(booking, booking.user)
+    notification_controller = RecordingNotificationController()
+    controller = MeetWebhookController(
+        db=db,
+        booking_cache=booking_cache,
+        notification_controller=notification_controller,
+        notification_state_controller=FakeNotificationState(),
+        unit_of_work=nullcontext,
+    )
+
+    asyncio.run(booking_cache.set(booking))
+    assert TELEGRAM_TOKEN not in cache_controller.values["booking:room"]
+    assert asyncio.run(booking_cache.get("room")).user is None
+
+    # The organizer changes their Telegram chat after the booking was cached.
+    db.users[7] = build_user(telegram_chat_id=2)
+    event = MeetWebhookEventDTO(
+        event=MeetWebhookEventType.VIDEO_CONFERENCE_JOINED,
+        jwt="",
+        claims={"room": "room", "context": {"user": {"role": "client"}}},
+    )
+    asyncio.run(controller.handle_webhook(event))
+
+    assert [user.telegram_chat_id for user in notification_controller.users] == [2]
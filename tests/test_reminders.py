@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+from collections.abc import Callable
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from redis.asyncio import Redis
+
+from app.controllers.booking import BookingController
+from app.controllers.reminder_scheduler import REMINDER_LEADER_KEY, REMINDERS_KEY, ReminderScheduler
+from app.dtos import DueReminderDTO
+
+
+class FakeDatabase:
+    def __init__(self, bookings: dict) -> None:
+        self.bookings = bookings
+
+    async def get_booking(self, booking_uid: str) -> SimpleNamespace | None:
+        if booking_uid == "unreachable":
+            raise ConnectionError("database is down")
+        return self.bookings.get(booking_uid)
+
+
+class FakeReminderScheduler:
+    def __init__(self) -> None:
+        self.acknowledged: list[str] = []
+
+    async def ack(self, due_reminders: list[DueReminderDTO]) -> None:
+        self.acknowledged.extend(due_reminder.booking_uid for due_reminder in due_reminders)
+
+
+def build_booking(uid: str, start_time: datetime.datetime, status: str = "accepted") -> SimpleNamespace:
+    return SimpleNamespace(
+        uid=uid,
+        status=status,
+        start_time=start_time,
+        user=SimpleNamespace(email="organizer@example.com"),
+        client=SimpleNamespace(email="client@example.com"),
+    )
+
+
+def test_only_handled_reminders_are_acknowledged() -> None:
+    now = datetime.datetime.now(datetime.UTC)
+    tomorrow = now + datetime.timedelta(days=1)
+    scheduler = FakeReminderScheduler()
+    controller = BookingController(
+        db=FakeDatabase(
+            {
+                "sent": build_booking("sent", tomorrow),
+                "failing": build_booking("failing", tomorrow),
+                "cancelled": build_booking("cancelled", tomorrow, status="cancelled"),
+                "started": build_booking("started", now - datetime.timedelta(minutes=5)),
+            },
+        ),
+        booking_cache=None,
+        shortener=None,
+        chat_controller=None,
+        meeting_controller=None,
+        notification_controller=None,
+        notification_state_controller=None,
+        booking_constraints_analyzer=None,
+        client_bookings_aggregator=None,
+        reminder_scheduler=scheduler,
+        unit_of_work=nullcontext,
+        settings=None,
+    )
+    sent = []
+
+    async def send_reminder(booking) -> bool:
+        if booking.uid == "failing":
+            raise TimeoutError
+        sent.append(booking.uid)
+        return True
+
+    controller._send_reminder = send_reminder  # noqa: SLF001
+    uids = ["unreachable", "sent", "failing", "cancelled", "started", "deleted"]
+    due_reminders = [
+        DueReminderDTO(booking_uid=uid, fire_at=now, claimed_until=now + datetime.timedelta(minutes=5)) for uid in uids
+    ]
+
+    assert asyncio.run(controller.send_due_reminders(due_reminders)) == 1
+    assert sent == ["sent"]
+    assert scheduler.acknowledged == ["sent", "cancelled", "started", "deleted"]
+
+
+def run_with_schedulers(redis_url: str, scenario: Callable, *, count: int = 1) -> None:
+    settings = SimpleNamespace(
+        booking_reminder_offset_hours=24,
+        reminder_leader_ttl_seconds=15,
+        reminder_lease_seconds=300,
+    )
+
+    async def run() -> None:
+        client = Redis.from_url(redis_url)
+        try:
+            await scenario(*(ReminderScheduler(client=client, settings=settings) for _ in range(count)))
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_claimed_reminder_is_claimed_again_only_after_lease(redis_url: str) -> None:
+    now = datetime.datetime.now(datetime.UTC)
+
+    async def scenario(scheduler: ReminderScheduler) -> None:
+        assert await scheduler.schedule(build_booking("booking", now + datetime.timedelta(days=1, minutes=1)), now=now)
+        assert await scheduler.claim_due(now=now) == []
+
+        due_at = now + datetime.timedelta(minutes=2)
+        [claimed] = await scheduler.claim_due(now=due_at)
+        assert claimed.booking_uid == "booking"
+        assert claimed.claimed_until == due_at + scheduler.lease
+
+        assert await scheduler.claim_due(now=claimed.claimed_until - datetime.timedelta(seconds=1)) == []
+        [reclaimed] = await scheduler.claim_due(now=claimed.claimed_until)
+        assert reclaimed.booking_uid == "booking"
+        assert reclaimed.fire_at == claimed.claimed_until
+
+        await scheduler.ack([reclaimed])
+        assert await scheduler.client.zscore(REMINDERS_KEY, "booking") is None
+
+    run_with_schedulers(redis_url, scenario)
+
+
+def test_ack_keeps_reminder_rescheduled_while_sending(redis_url: str) -> None:
+    now = datetime.datetime.now(datetime.UTC)
+
+    async def scenario(scheduler: ReminderScheduler) -> None:
+        await scheduler.schedule(build_booking("booking", now + datetime.timedelta(days=1)), now=now)
+        await scheduler.schedule(build_booking("other", now + datetime.timedelta(days=1)), now=now)
+        claimed = await scheduler.claim_due(now=now)
+        assert {due_reminder.booking_uid for due_reminder in claimed} == {"booking", "other"}
+
+        rescheduled_fire_at = now + datetime.timedelta(days=2)
+        await scheduler.schedule(build_booking("booking", rescheduled_fire_at + scheduler.offset), now=now)
+        await scheduler.ack(claimed)
+
+        assert await scheduler.client.zscore(REMINDERS_KEY, "other") is None
+        assert await scheduler.client.zscore(REMINDERS_KEY, "booking") == rescheduled_fire_at.timestamp()
+
+    run_with_schedulers(redis_url, scenario)
+
+
+def test_leadership_is_renewed_and_released_only_by_owner(redis_url: str) -> None:
+    async def scenario(leader: ReminderScheduler, follower: ReminderScheduler) -> None:
+        assert await leader.acquire_leadership()
+        assert not await follower.acquire_leadership()
+
+        await leader.client.pexpire(REMINDER_LEADER_KEY, 1_000)
+        assert not await follower.acquire_leadership()
+        assert await leader.client.pttl(REMINDER_LEADER_KEY) <= 1_000
+        await follower.release_leadership()
+        assert await leader.client.get(REMINDER_LEADER_KEY) == leader.owner.encode()
+
+        # Renewing keeps the leadership and extends it to the full TTL.
+        assert await leader.acquire_leadership()
+        assert await leader.client.pttl(REMINDER_LEADER_KEY) > 1_000
+
+        await leader.release_leadership()
+        assert await follower.acquire_leadership()
+        assert not await leader.acquire_leadership()
+
+    run_with_schedulers(redis_url, scenario, count=2)
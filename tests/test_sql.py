@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.adapters.sql import SqlExecutor
+
+
+class FakeSession:
+    def __init__(self, log: list[str], index: int) -> None:
+        self.log = log
+        self.index = index
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        self.log.append(f"close {self.index}")
+
+    async def execute(self, query, _: dict) -> SimpleNamespace:
+        if str(query) == "fail":
+            raise RuntimeError(query)
+        self.log.append(f"{query} {self.index}")
+        return SimpleNamespace(mappings=lambda: SimpleNamespace(first=lambda: None, all=list), rowcount=1)
+
+    async def commit(self) -> None:
+        self.log.append(f"commit {self.index}")
+
+    async def rollback(self) -> None:
+        self.log.append(f"rollback {self.index}")
+
+
+class FakeSessionmaker:
+    def __init__(self) -> None:
+        self.log: list[str] = []
+        self.sessions = 0
+
+    def __call__(self) -> FakeSession:
+        self.sessions += 1
+        return FakeSession(self.log, self.sessions)
+
+    @asynccontextmanager
+    async def begin(self):
+        async with self() as session:
+            yield session
+            await session.commit()
+
+
+def test_unit_of_work_shares_one_session() -> None:
+    sessionmaker = FakeSessionmaker()
+    sql = SqlExecutor(sessionmaker)
+
+    async def run() -> None:
+        async with sql.unit_of_work():
+            await sql.fetch_one("select", {})
+            await sql.execute("update", {})
+            # Nested blocks join the outer one.
+            async with sql.unit_of_work():
+                await sql.fetch_all("select", {})
+            with pytest.raises(RuntimeError):
+                await sql.execute("fail", {})
+            await sql.fetch_one("select", {})
+
+    asyncio.run(run())
+
+    assert sessionmaker.sessions == 1
+    assert sessionmaker.log == [
+        "select 1",
+        "update 1",
+        "commit 1",
+        "select 1",
+        "rollback 1",
+        "select 1",
+        "close 1",
+    ]
+
+
+def test_spawned_tasks_and_calls_outside_use_own_sessions() -> None:
+    sessionmaker = FakeSessionmaker()
+    sql = SqlExecutor(sessionmaker)
+
+    async def run() -> None:
+        await sql.fetch_one("select", {})
+        async with sql.unit_of_work():
+            # An AsyncSession does not allow concurrent statements, so concurrent tasks do not join the block.
+            await asyncio.gather(sql.fetch_one("select", {}), sql.execute("update", {}))
+            await sql.fetch_one("select", {})
+
+    asyncio.run(run())
+
+    assert sessionmaker.sessions == 4
+    assert sessionmaker.log.count("close 2") == 1
+    assert sessionmaker.log[-2:] == ["select 2", "close 2"]
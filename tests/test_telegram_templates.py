@@ -0,0 +1,35 @@
+import datetime
+from types import SimpleNamespace
+
+from app.controllers.telegram_templates import TelegramNotificationRenderer
+from app.controllers.time_zones import TimeZoneService
+from app.dtos import BookingDTO, TriggerEvent
+
+
+def test_href_values_only_escape_quotes() -> None:
+    settings = SimpleNamespace(booking_host_url="https://cal.example.com")
+    renderer = TelegramNotificationRenderer(settings, TimeZoneService())
+    start_time = datetime.datetime(2025, 3, 14, 12, tzinfo=datetime.UTC)
+    booking = BookingDTO(
+        created_at=start_time,
+        end_time=start_time + datetime.timedelta(hours=1),
+        ical_sequence=0,
+        id=0,
+        is_recorded=False,
+        paid=False,
+        responses={},
+        start_time=start_time,
+        status="accepted",
+        title="Consultation",
+        uid='uid"><b>',
+    )
+
+    text = renderer.render(
+        booking=booking,
+        time_zone="Europe/Moscow",
+        meeting_url="https://meet.example.com/room?jwt=token&lang=ru",
+        trigger_event=TriggerEvent.BOOKING_CREATED,
+    )
+
+    assert '<a href="https://meet.example.com/room?jwt=token&lang=ru">' in text
+    assert '<a href="https://cal.example.com/booking/uid&quot;><b>">' in text